@@ -4,4 +4,5 @@ class AccountsConfig(AppConfig):
     name = 'accounts'
 
     def ready(self):
-        import accounts.models
\ No newline at end of file
+        import accounts.models
+        import accounts.signals
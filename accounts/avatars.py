@@ -0,0 +1,182 @@
+"""
+Profile picture pipeline.
+
+An upload is stored as-is by the form, then, once the transaction
+commits, handed to a small thread pool (off the request path):
+
+    1. the original is re-encoded in place: EXIF (GPS, camera, ...)
+       dropped, orientation applied, longest side bounded to MAX_SIDE,
+       written in the format its file extension names (the row keeps
+       the name, so the bytes must match it);
+    2. square variants are written for every size in SIZES, as WebP and
+       as JPEG (for browsers without WebP):
+
+           profile_pics/variants/<original file name>/<size>.webp|.jpg
+
+When a picture is replaced or cleared, or the profile is deleted, the
+old original and its variants are removed once the change commits
+(accounts/signals.py).
+
+Pages never wait for this: the {% avatar %} tag (templatetags/avatar_tags.py)
+serves the original until the variants exist. Pillow releases the GIL
+while decoding, resizing and encoding, so the pool (and the parallel
+backfill_avatars command) really does use several cores.
+"""
+import logging
+import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+SIZES = (48, 128, 512)
+FORMATS = (
+    ("webp", "WEBP", {"quality": 82, "method": 4}),
+    ("jpg", "JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+)
+# Longest side of the stored original
+MAX_SIDE = 1024
+# What ProfileForm accepts: extension -> Pillow format
+UPLOAD_FORMATS = {"jpg": "JPEG", "jpeg": "JPEG", "png": "PNG", "webp": "WEBP"}
+WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variants_dir(name):
+    folder, filename = posixpath.split(name)
+    return posixpath.join(folder, "variants", filename)
+
+
+def variant_name(name, size, ext):
+    return posixpath.join(variants_dir(name), f"{size}.{ext}")
+
+
+def pick_size(size):
+    """Smallest variant at least `size` pixels wide (the largest if none)."""
+    return next((s for s in SIZES if s >= size), SIZES[-1])
+
+
+def encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def flatten(image):
+    """RGB on white (JPEG has no alpha channel)."""
+    if image.mode != "RGBA":
+        return image.convert("RGB")
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def original_format(name):
+    """
+    The Pillow format named by `name`'s extension. Uploads are limited
+    to UPLOAD_FORMATS; older pictures (.gif, .bmp, ...) keep their own
+    format. ValueError when Pillow cannot write it.
+    """
+    ext = posixpath.splitext(name)[1].lower()
+    fmt = Image.registered_extensions().get(ext)
+    if fmt is None or fmt not in Image.SAVE:
+        raise ValueError(f"Cannot re-encode {name!r}: unsupported extension")
+    return fmt
+
+
+def sanitized_original(image, fmt):
+    """The upload re-encoded as `fmt`: no EXIF or text chunks, bounded size."""
+    image.thumbnail((MAX_SIDE, MAX_SIDE), Image.Resampling.LANCZOS)
+    if fmt == "JPEG":
+        return encode(flatten(image), "JPEG", quality=90, optimize=True)
+    if fmt == "WEBP":
+        return encode(image, "WEBP", quality=90)
+    if fmt == "PNG":
+        return encode(image, "PNG", optimize=True)
+    return encode(image, fmt)
+
+
+def process(name, storage=default_storage):
+    """
+    Sanitize the original stored at `name` and write its variants.
+    Only touches storage, never the database, so it is safe in any
+    thread.
+    """
+    fmt = original_format(name)
+
+    with storage.open(name, "rb") as source:
+        image = Image.open(source)
+        # Apply the EXIF orientation before the EXIF block is dropped
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    # 1. Original, re-encoded in place (same name: the model row is untouched)
+    with storage.open(name, "wb") as target:
+        target.write(sanitized_original(image.copy(), fmt))
+
+    # 2. Square variants, largest first so each resize starts smaller
+    current = image
+    for size in sorted(SIZES, reverse=True):
+        current = ImageOps.fit(current, (size, size), Image.Resampling.LANCZOS)
+        for ext, variant_fmt, options in FORMATS:
+            frame = current if variant_fmt == "WEBP" else flatten(current)
+            path = variant_name(name, size, ext)
+            if storage.exists(path):
+                storage.delete(path)
+            storage.save(path, ContentFile(encode(frame, variant_fmt, **options)))
+
+
+def delete_variants(name, storage=default_storage):
+    for size in SIZES:
+        for ext, _, _ in FORMATS:
+            path = variant_name(name, size, ext)
+            if storage.exists(path):
+                storage.delete(path)
+
+    # Storage has no directory API; remove the emptied folder when local
+    try:
+        os.rmdir(storage.path(variants_dir(name)))
+    except (NotImplementedError, OSError):
+        pass
+
+
+def delete_picture(name, storage=default_storage):
+    """Remove a replaced or cleared original together with its variants."""
+    delete_variants(name, storage)
+    if storage.exists(name):
+        storage.delete(name)
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="avatars")
+        return _executor
+
+
+def _log_failure(name):
+    def callback(future):
+        error = future.exception()
+        if error is not None:
+            logger.error("Processing profile picture %s failed", name, exc_info=error)
+    return callback
+
+
+def schedule(name):
+    """Process `name` in the background; returns the Future."""
+    future = executor().submit(process, name)
+    future.add_done_callback(_log_failure(name))
+    return future
@@ -1,4 +1,6 @@
 from django import forms
+
+from . import avatars
 from .models import Profile
 
 class ProfileForm(forms.ModelForm):
@@ -17,6 +19,18 @@ class ProfileForm(forms.ModelForm):
             "favourite_tags": forms.CheckboxSelectMultiple,
         }
 
+    def clean_profile_pic(self):
+        picture = self.cleaned_data.get("profile_pic")
+        # forms.ImageField sets .image on new uploads only
+        image = getattr(picture, "image", None)
+        if image is not None:
+            ext = picture.name.rpartition(".")[2].lower()
+            if ext not in avatars.UPLOAD_FORMATS or image.format not in avatars.UPLOAD_FORMATS.values():
+                raise forms.ValidationError(
+                    "Upload a JPEG, PNG or WebP image."
+                )
+        return picture
+
     def clean_favourite_tags(self):
         tags = self.cleaned_data.get("favourite_tags")
         if tags and tags.count() > 5:
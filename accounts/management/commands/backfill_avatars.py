@@ -0,0 +1,61 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import SIZES, process, variant_name
+from accounts.models import Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Sanitize every stored profile picture (EXIF stripped, size "
+        "bounded) and write its WebP/JPEG variants, several at a time. "
+        "Pictures that already have variants are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Reprocess pictures that already have variants.",
+        )
+
+    def handle(self, *args, **options):
+        began = time.perf_counter()
+        names = (
+            Profile.objects.exclude(profile_pic="")
+            .exclude(profile_pic__isnull=True)
+            .order_by()
+            .values_list("profile_pic", flat=True)
+            .distinct()
+        )
+
+        pending, missing = [], 0
+        for name in names:
+            if not default_storage.exists(name):
+                missing += 1
+            elif options["force"] or not default_storage.exists(
+                variant_name(name, SIZES[0], "jpg")
+            ):
+                pending.append(name)
+
+        # Storage only in the workers; Pillow releases the GIL while it works
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = {pool.submit(process, name): name for name in pending}
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    done += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {error}")
+
+        self.stdout.write(
+            f"{done} picture(s) processed, {failed} failed, {missing} missing file(s) "
+            f"with {options['workers']} worker(s) in {time.perf_counter() - began:.1f}s"
+        )
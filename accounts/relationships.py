@@ -0,0 +1,124 @@
+"""
+Per-user relationship sets for list decoration.
+
+For every signed-in user we cache four integer sets: the ids of the
+events and communities they joined or created. Role filters
+(created / joined / not_joined) and CREATOR / MEMBER badges on list
+pages read them instead of querying the membership tables on each
+request. Detail pages ask the database about their one row.
+
+Entries live in the "shared" cache (settings.CACHES; every worker sees
+the same entries, see events/checks.py), each stamped with the user's
+current stamp. Once a join, leave or create commits (accounts/signals.py)
+the user gets a new random stamp, which orphans the entry in every
+process at once. Only a write of a fresh value is needed, no atomic
+read-modify-write: a reader that loaded just before the commit stores
+its entry under the old stamp, and nobody uses it again.
+"""
+import uuid
+from array import array
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.connection import ConnectionProxy
+
+from communities.models import Community, CommunityMember
+from events.models import Event, EventRegistration
+
+
+RELATIONSHIP_CACHE_VERSION = 2  # bump whenever the stored layout changes
+RELATIONSHIP_CACHE_TTL = 60 * 60  # seconds
+
+cache = ConnectionProxy(caches, "shared")
+
+KINDS = (
+    "joined_events",
+    "created_events",
+    "joined_communities",
+    "created_communities",
+)
+
+
+class Relationships:
+    """Read-only view of one user's sets (frozensets of ids)."""
+
+    __slots__ = KINDS
+
+    def __init__(self, **ids):
+        for kind in KINDS:
+            setattr(self, kind, frozenset(ids.get(kind, ())))
+
+
+EMPTY = Relationships()
+
+
+def _key(user_id):
+    return f"relationships:{user_id}"
+
+
+def _stamp_key(user_id):
+    return f"relationships:{user_id}:stamp"
+
+
+def _pack(ids):
+    # Sorted unsigned ints: a few bytes per id once pickled
+    return array("L", sorted(ids))
+
+
+def _load(user_id):
+    return {
+        "joined_events": EventRegistration.objects.filter(
+            user_id=user_id
+        ).values_list("event_id", flat=True),
+        "created_events": Event.objects.filter(
+            created_by_id=user_id
+        ).values_list("id", flat=True),
+        "joined_communities": CommunityMember.objects.filter(
+            user_id=user_id
+        ).values_list("community_id", flat=True),
+        "created_communities": Community.objects.filter(
+            created_by_id=user_id
+        ).values_list("id", flat=True),
+    }
+
+
+def get_relationships(user):
+    """Relationships for `user`; EMPTY for anonymous visitors."""
+    if not user.is_authenticated:
+        return EMPTY
+
+    key, stamp_key = _key(user.pk), _stamp_key(user.pk)
+    found = cache.get_many([key, stamp_key], version=RELATIONSHIP_CACHE_VERSION)
+    stamp = found.get(stamp_key)
+    if stamp is None:
+        stamp = uuid.uuid4().hex
+        cache.add(stamp_key, stamp, None, version=RELATIONSHIP_CACHE_VERSION)
+        stamp = cache.get(stamp_key, stamp, version=RELATIONSHIP_CACHE_VERSION)
+
+    entry = found.get(key)
+    if entry is not None and entry[0] == stamp:
+        return Relationships(**entry[1])
+
+    # Read the stamp before the tables: a write committing meanwhile
+    # replaces it, so this entry can never pass for the newer state
+    packed = {kind: _pack(ids) for kind, ids in _load(user.pk).items()}
+    cache.set(
+        key, (stamp, packed), RELATIONSHIP_CACHE_TTL, version=RELATIONSHIP_CACHE_VERSION
+    )
+
+    return Relationships(**packed)
+
+
+def forget_relationships(user_id):
+    """Orphan `user_id`'s cached entry in every process."""
+    cache.set(
+        _stamp_key(user_id), uuid.uuid4().hex, None, version=RELATIONSHIP_CACHE_VERSION
+    )
+
+
+def record_relationship(user_id):
+    """
+    `user_id` joined, left or created something: orphan the cached entry
+    once the write commits, so no reader re-caches the old state.
+    """
+    transaction.on_commit(lambda: forget_relationships(user_id))
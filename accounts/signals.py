@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from communities.models import Community, CommunityMember
+from events.models import Event, EventRegistration, waitlist_promoted
+
+from . import avatars
+from .models import Profile
+from .relationships import record_relationship
+
+
+# 👤 Keep the cached relationship sets in step (see relationships.py)
+
+def relationship_receivers(model, kind, user_field):
+    def on_save(sender, instance, **kwargs):
+        record_relationship(getattr(instance, user_field))
+
+    def on_delete(sender, instance, **kwargs):
+        record_relationship(getattr(instance, user_field))
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"relationships_save_{kind}")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"relationships_delete_{kind}")
+
+
+relationship_receivers(EventRegistration, "joined_events", "user_id")
+relationship_receivers(Event, "created_events", "created_by_id")
+relationship_receivers(CommunityMember, "joined_communities", "user_id")
+relationship_receivers(Community, "created_communities", "created_by_id")
+
+
+def record_promotions(sender, event_id, user_ids, **kwargs):
+    for user_id in user_ids:
+        record_relationship(user_id)
+
+
+waitlist_promoted.connect(record_promotions, dispatch_uid="relationships_waitlist_promoted")
+
+
+# 🖼 Profile pictures: sanitized and resized off the request path (see avatars.py)
+
+def note_new_picture(sender, instance, **kwargs):
+    # Before FileField.pre_save() commits it, a fresh upload is uncommitted
+    picture = instance.profile_pic
+    instance._new_picture = bool(picture) and not picture._committed
+
+    # Replaced or cleared: remember the stored file so it can be removed
+    instance._old_picture = None
+    if instance.pk and (instance._new_picture or not picture):
+        instance._old_picture = (
+            Profile.objects.filter(pk=instance.pk)
+            .values_list("profile_pic", flat=True)
+            .first()
+        )
+
+
+def remove_picture_when_unused(name):
+    def remove():
+        if not Profile.objects.filter(profile_pic=name).exists():
+            avatars.delete_picture(name)
+    transaction.on_commit(remove)
+
+
+def process_new_picture(sender, instance, **kwargs):
+    if getattr(instance, "_new_picture", False):
+        name = instance.profile_pic.name
+        transaction.on_commit(lambda: avatars.schedule(name))
+
+    if getattr(instance, "_old_picture", None):
+        remove_picture_when_unused(instance._old_picture)
+
+
+def remove_deleted_picture(sender, instance, **kwargs):
+    if instance.profile_pic:
+        remove_picture_when_unused(instance.profile_pic.name)
+
+
+pre_save.connect(note_new_picture, sender=Profile, dispatch_uid="avatars_note_upload")
+post_save.connect(process_new_picture, sender=Profile, dispatch_uid="avatars_process_upload")
+post_delete.connect(remove_deleted_picture, sender=Profile, dispatch_uid="avatars_remove_deleted")
@@ -0,0 +1,41 @@
+from django import template
+from django.core.files.storage import default_storage
+
+from accounts.avatars import pick_size, variant_name
+
+
+register = template.Library()
+
+
+@register.inclusion_tag("accounts/_avatar.html")
+def avatar(profile, size=128, css_class=""):
+    """
+    {% avatar user.profile 110 "profile-avatar" %}
+
+    The smallest square variant covering `size` CSS pixels (and 2x for
+    high-density screens), WebP with a JPEG fallback. Until the
+    background job has written the variants, the original is served.
+    """
+    context = {"size": size, "css_class": css_class, "src": None}
+
+    picture = profile.profile_pic if profile is not None else None
+    if not picture:
+        return context
+
+    one_x, two_x = pick_size(size), pick_size(size * 2)
+    if not default_storage.exists(variant_name(picture.name, one_x, "jpg")):
+        context["src"] = picture.url
+        return context
+
+    def srcset(ext):
+        urls = [f"{default_storage.url(variant_name(picture.name, one_x, ext))} 1x"]
+        if two_x != one_x:
+            urls.append(f"{default_storage.url(variant_name(picture.name, two_x, ext))} 2x")
+        return ", ".join(urls)
+
+    context.update(
+        src=default_storage.url(variant_name(picture.name, one_x, "jpg")),
+        jpeg_srcset=srcset("jpg"),
+        webp_srcset=srcset("webp"),
+    )
+    return context
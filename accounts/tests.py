@@ -1,3 +1,259 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from communities.models import Community, CommunityMember
+from events.models import (
+    FULL,
+    Event,
+    EventRegistration,
+    join_waitlist,
+    promote_waitlist,
+    register_user,
+)
+
+from . import avatars
+from .models import Profile
+from . import relationships
+from .relationships import get_relationships
+
+
+class RelationshipCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        relationships.cache.clear()
+        self.user = User.objects.create_user("member")
+        self.creator = User.objects.create_user("creator")
+        start = timezone.localtime() + timedelta(days=1)
+        self.event = Event.objects.create(
+            title="Meetup",
+            interest="Tech",
+            location="Hall A",
+            date=start.date(),
+            start_time=start.time().replace(microsecond=0),
+            created_by=self.creator,
+        )
+        self.community = Community.objects.create(
+            name="Readers", interest="Books", description="Weekly", created_by=self.creator
+        )
+
+    def test_warm_entry_only_reads_the_shared_cache(self):
+        get_relationships(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            found = get_relationships(self.user)
+
+        self.assertEqual(found.joined_events, frozenset())
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('"shared_cache"', queries.captured_queries[0]["sql"])
+
+    def test_join_leave_and_create_replace_the_warm_entry(self):
+        get_relationships(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            register_user(self.event, self.user)
+            CommunityMember.objects.create(user=self.user, community=self.community)
+            own = Community.objects.create(
+                name="Mine", interest="Books", description="", created_by=self.user
+            )
+
+        found = get_relationships(self.user)
+        self.assertEqual(found.joined_events, {self.event.id})
+        self.assertEqual(found.joined_communities, {self.community.id})
+        self.assertEqual(found.created_communities, {own.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EventRegistration.objects.filter(user=self.user).delete()
+            CommunityMember.objects.filter(user=self.user).delete()
+
+        found = get_relationships(self.user)
+        self.assertEqual(found.joined_events, frozenset())
+        self.assertEqual(found.joined_communities, frozenset())
+
+    def test_entry_loaded_before_a_commit_is_never_served(self):
+        get_relationships(self.user)
+        stale_load = relationships._load
+
+        def load_then_commit_a_join(user_id):
+            # Another worker's join commits between our load and our set
+            loaded = {kind: list(ids) for kind, ids in stale_load(user_id).items()}
+            with self.captureOnCommitCallbacks(execute=True):
+                register_user(self.event, self.user)
+            return loaded
+
+        relationships.forget_relationships(self.user.pk)
+        with mock.patch.object(relationships, "_load", load_then_commit_a_join):
+            self.assertEqual(get_relationships(self.user).joined_events, frozenset())
+
+        self.assertEqual(get_relationships(self.user).joined_events, {self.event.id})
+
+    def test_waitlist_promotion_is_recorded(self):
+        self.event.max_participants = 1
+        self.event.save()
+        register_user(self.event, self.creator)
+        self.assertEqual(register_user(self.event, self.user), FULL)
+        join_waitlist(self.event, self.user)
+        get_relationships(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EventRegistration.objects.filter(user=self.creator).delete()
+            Event.objects.filter(pk=self.event.pk).update(registration_count=0)
+            promote_waitlist(self.event.id)
+
+        self.assertIn(self.event.id, get_relationships(self.user).joined_events)
+
+
+def photo_with_exif(size=(3000, 1000)):
+    image = Image.new("RGB", size, "teal")
+    exif = Image.Exif()
+    exif[0x010F] = "SpyCam"  # Make
+    exif[0x0112] = 6  # Orientation: rotate 90° clockwise
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+class AvatarPipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.user = User.objects.create_user("member")
+
+    def render_avatar(self, size):
+        profile = User.objects.get(pk=self.user.pk).profile
+        return Template("{% load avatar_tags %}{% avatar profile size %}").render(
+            Context({"profile": profile, "size": size})
+        )
+
+    def test_process_strips_exif_bounds_and_writes_variants(self):
+        name = default_storage.save("profile_pics/photo.jpg", ContentFile(photo_with_exif()))
+
+        avatars.process(name)
+
+        with default_storage.open(name) as stored:
+            original = Image.open(stored)
+            self.assertFalse(original.getexif())
+            # Orientation applied before the EXIF block went away
+            self.assertEqual(original.size, (341, 1024))
+        for size in avatars.SIZES:
+            for ext in ("webp", "jpg"):
+                with default_storage.open(avatars.variant_name(name, size, ext)) as variant:
+                    self.assertEqual(Image.open(variant).size, (size, size))
+
+    def test_original_is_rewritten_in_the_format_its_name_says(self):
+        gif = BytesIO()
+        Image.new("RGB", (40, 40), "teal").save(gif, "GIF")
+        for filename, content, expected in [
+            ("legacy.gif", gif.getvalue(), "GIF"),
+            ("renamed.png", photo_with_exif(), "PNG"),  # JPEG bytes
+        ]:
+            name = default_storage.save(f"profile_pics/{filename}", ContentFile(content))
+
+            avatars.process(name)
+
+            with default_storage.open(name) as stored:
+                self.assertEqual(Image.open(stored).format, expected, filename)
+
+    def test_upload_must_be_jpeg_png_or_webp(self):
+        self.client.force_login(self.user)
+        gif = BytesIO()
+        Image.new("RGB", (40, 40), "teal").save(gif, "GIF")
+
+        for filename, content in [
+            ("me.gif", gif.getvalue()),
+            ("me.jpg", gif.getvalue()),  # GIF under a JPEG name
+        ]:
+            response = self.client.post("/profile/", {
+                "profile_pic": SimpleUploadedFile(filename, content, "image/gif"),
+            })
+            self.assertEqual(
+                response.context["form"].errors["profile_pic"],
+                ["Upload a JPEG, PNG or WebP image."],
+                filename,
+            )
+
+        self.assertFalse(User.objects.get(pk=self.user.pk).profile.profile_pic)
+
+    def test_upload_is_processed_after_commit_and_tag_picks_variant(self):
+        self.client.force_login(self.user)
+        futures = []
+        schedule = avatars.schedule
+
+        with mock.patch.object(avatars, "schedule", side_effect=lambda name: futures.append(schedule(name))):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post("/profile/", {
+                    "profile_pic": SimpleUploadedFile("me.jpg", photo_with_exif(), "image/jpeg"),
+                })
+        name = User.objects.get(pk=self.user.pk).profile.profile_pic.name
+        self.assertIn(f'src="/media/{name}"', self.render_avatar(48))
+
+        futures[0].result(timeout=30)
+
+        html = self.render_avatar(48)
+        self.assertIn(f"/media/{avatars.variant_name(name, 48, 'webp')} 1x", html)
+        self.assertIn(f"/media/{avatars.variant_name(name, 128, 'jpg')} 2x", html)
+
+    def test_replaced_cleared_and_deleted_pictures_are_removed(self):
+        profile = User.objects.get(pk=self.user.pk).profile
+
+        def upload(filename):
+            with mock.patch.object(avatars, "schedule", side_effect=avatars.process):
+                with self.captureOnCommitCallbacks(execute=True):
+                    profile.profile_pic = SimpleUploadedFile(filename, photo_with_exif(), "image/jpeg")
+                    profile.save()
+            return profile.profile_pic.name
+
+        def stored(name):
+            return [
+                path for path in [name, avatars.variant_name(name, 48, "jpg")]
+                if default_storage.exists(path)
+            ]
+
+        first = upload("first.jpg")
+        self.assertEqual(len(stored(first)), 2)
+
+        second = upload("second.jpg")
+        self.assertEqual(stored(first), [])
+        self.assertFalse(default_storage.exists(avatars.variants_dir(first)))
+        self.assertEqual(len(stored(second)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.profile_pic = None
+            profile.save()
+        self.assertEqual(stored(second), [])
+
+        third = upload("third.jpg")
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.delete()
+        self.assertEqual(stored(third), [])
+
+    def test_backfill_processes_existing_pictures_once(self):
+        name = default_storage.save("profile_pics/old.jpg", ContentFile(photo_with_exif()))
+        Profile.objects.filter(user=self.user).update(profile_pic=name)
+
+        first, second = StringIO(), StringIO()
+        call_command("backfill_avatars", "--workers", "2", stdout=first)
+        call_command("backfill_avatars", stdout=second)
+
+        self.assertIn("1 picture(s) processed", first.getvalue())
+        self.assertIn("0 picture(s) processed", second.getvalue())
+        self.assertTrue(default_storage.exists(avatars.variant_name(name, 512, "webp")))
@@ -0,0 +1,97 @@
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from events.api import (
+    BadFields,
+    bad_request,
+    attach_tags,
+    json_page,
+    json_response,
+    not_modified,
+    projection,
+    sparse_fields,
+    strong_etag,
+)
+
+from events.models import InvalidTag, tag_id_param
+
+from .models import Community
+from .search import COMMUNITY_INDEX
+
+
+COMMUNITY_FIELDS = {
+    "id": None,
+    "name": None,
+    "interest": None,
+    "description": None,
+    "rules": None,
+    "created_at": None,
+    "updated_at": None,
+    "version": None,
+    "creator": F("created_by__username"),
+    "member_count": None,
+    "tags": None,
+}
+COMMUNITY_DEFAULT_FIELDS = ["id", "name", "interest", "member_count", "tags"]
+
+COMMUNITY_SORT_ORDERINGS = {
+    "newest": ("-created_at", "-id"),
+    "popular": ("-member_count", "-id"),
+    "relevance": ("search_rank", "id"),
+}
+
+
+@require_GET
+def community_list_api(request):
+    try:
+        fields = sparse_fields(request, COMMUNITY_FIELDS, COMMUNITY_DEFAULT_FIELDS)
+    except BadFields as error:
+        return bad_request(error)
+
+    try:
+        tag_id = tag_id_param(request.GET.get('tag'))
+    except InvalidTag as error:
+        return bad_request(error)
+
+    query = request.GET.get('q')
+    sort = request.GET.get('sort') or ('relevance' if query else 'newest')
+
+    qs = Community.objects.all()
+
+    if query and sort != 'relevance':
+        qs = COMMUNITY_INDEX.filter(qs, query)  # annotate_rank matches otherwise
+    if tag_id is not None:
+        qs = qs.filter(tags__id=tag_id)
+
+    if sort == 'relevance' and query:
+        qs = COMMUNITY_INDEX.annotate_rank(qs, query)
+    elif sort not in COMMUNITY_SORT_ORDERINGS or sort == 'relevance':
+        sort = 'newest'
+
+    return json_page(
+        request, qs, COMMUNITY_SORT_ORDERINGS[sort], f"api:{sort}",
+        fields, COMMUNITY_FIELDS, Community,
+    )
+
+
+@require_GET
+def community_detail_api(request, community_id):
+    try:
+        fields = sparse_fields(request, COMMUNITY_FIELDS, COMMUNITY_FIELDS)
+    except BadFields as error:
+        return bad_request(error)
+
+    community = Community.objects.filter(pk=community_id)
+    version = get_object_or_404(community.values_list('version', flat=True))
+
+    etag = strong_etag('community', community_id, version, fields)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    row = projection(community, fields, COMMUNITY_FIELDS).get()
+    if 'tags' in fields:
+        attach_tags([row], Community)
+
+    return json_response(row, etag)
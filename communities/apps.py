@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CommunitiesConfig(AppConfig):
     name = 'communities'
+
+    def ready(self):
+        import communities.signals
@@ -0,0 +1,76 @@
+"""
+Native async versions of the community list and detail pages, served
+over ASGI (see event_community_board/asgi_urls.py). Same querysets as
+views.py; independent queries go out together via asyncio.gather().
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+
+from events.async_views import alist, arelationships, arender
+from events.models import Tag
+from events.page_cache import cache_anonymous_page
+
+from . import views
+from .models import Community
+
+
+@cache_anonymous_page(scopes=lambda request: ["communities"])
+async def community_list(request):
+    user = await request.auser()
+
+    relationships, tags = await asyncio.gather(
+        arelationships(user),
+        alist(Tag.objects.all()),
+    )
+
+    communities, selections = views.build_community_list(
+        request.GET, relationships, user.is_authenticated
+    )
+    communities = await alist(communities)
+    views.decorate_community_cards(communities, relationships)
+
+    return await arender(
+        request,
+        'communities/community_list.html',
+        {
+            'communities': communities,
+            'tags': tags,
+            **selections,
+        }
+    )
+
+
+@cache_anonymous_page(
+    scopes=lambda request, community_id: [f"community:{community_id}", "tags"]
+)
+async def community_detail(request, community_id):
+    user = await request.auser()
+
+    community, relationships, similar = await asyncio.gather(
+        Community.objects.select_related('created_by').prefetch_related('tags')
+        .filter(pk=community_id).afirst(),
+        arelationships(user),
+        sync_to_async(views.similar_community_cards)(community_id),
+    )
+    if community is None:
+        raise Http404("No Community matches the given query.")
+
+    status = None
+    if user.is_authenticated:
+        if community.created_by_id == user.id:
+            status = "CREATOR"
+        elif community.id in relationships.joined_communities:
+            status = "MEMBER"
+
+    return await arender(
+        request,
+        'communities/community_detail.html',
+        {
+            'community': community,
+            'status': status,
+            'member_count': community.member_count,
+            'similar_communities': similar,
+        }
+    )
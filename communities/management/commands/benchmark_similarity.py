@@ -0,0 +1,168 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from communities.models import Community, CommunityBand, CommunityMember, CommunitySignature
+from communities.similarity import (
+    BANDS,
+    ROWS,
+    add_element,
+    member_element,
+    rebuild_signatures,
+    similar_communities,
+)
+
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[18]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N communities and M memberships (users cluster around shared "
+        "topics), then compare top-K similar communities from MinHash/LSH "
+        "against exact Jaccard over the membership table: latency, "
+        "recall, signature build time and incremental join cost. All "
+        "benchmark rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--communities", type=int, default=10_000)
+        parser.add_argument("--memberships", type=int, default=1_000_000)
+        parser.add_argument("--per-user", type=int, default=10)
+        parser.add_argument("--topics", type=int, default=500)
+        parser.add_argument("--queries", type=int, default=100)
+        parser.add_argument("--top-k", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        n_communities = options["communities"]
+        per_user = options["per_user"]
+        n_users = options["memberships"] // per_user
+        k = options["top_k"]
+
+        self.stdout.write(f"Seeding {n_communities} communities, {n_users * per_user} memberships...")
+        creator = User.objects.create_user("bench_similarity")
+        Community.objects.bulk_create(
+            (
+                Community(name=f"Similarity bench {i}", interest="Bench", description="", created_by=creator)
+                for i in range(n_communities)
+            ),
+            batch_size=5000,
+        )
+        community_ids = list(
+            Community.objects.filter(created_by=creator).order_by("id").values_list("id", flat=True)
+        )
+        topics = [community_ids[i::options["topics"]] for i in range(options["topics"])]
+
+        User.objects.bulk_create(
+            (User(username=f"bench_sim_{i}") for i in range(n_users)), batch_size=5000
+        )
+        user_ids = list(
+            User.objects.filter(username__startswith="bench_sim_").values_list("id", flat=True)
+        )
+
+        def memberships():
+            for user_id in user_ids:
+                # Mostly from two favourite topics, a few at random
+                pool = rng.choice(topics) + rng.choice(topics)
+                joined = set(rng.sample(pool, min(per_user - 2, len(pool))))
+                while len(joined) < per_user:
+                    joined.add(rng.choice(community_ids))
+                for community_id in joined:
+                    yield CommunityMember(user_id=user_id, community_id=community_id)
+
+        # bulk_create skips the per-row signals; signatures are built below
+        CommunityMember.objects.bulk_create(memberships(), batch_size=10_000)
+
+        try:
+            began = time.perf_counter()
+            rebuild_signatures(community_ids)
+            self.stdout.write(f"signature build: {time.perf_counter() - began:.1f}s")
+
+            sizes = dict(
+                CommunityMember.objects.filter(community_id__in=community_ids)
+                .values_list("community_id")
+                .annotate(n=Count("id"))
+            )
+
+            def exact(community_id):
+                members = CommunityMember.objects.filter(community_id=community_id).values("user_id")
+                shared = (
+                    CommunityMember.objects.filter(user_id__in=members)
+                    .exclude(community_id=community_id)
+                    .values_list("community_id")
+                    .annotate(n=Count("id"))
+                )
+                own = sizes.get(community_id, 0)
+                scored = [(pk, n / (own + sizes[pk] - n)) for pk, n in shared]
+                scored.sort(key=lambda item: (-item[1], item[0]))
+                return scored[:k]
+
+            def candidate_count(community_id):
+                # Communities sharing at least one band (what the LSH query reads)
+                return (
+                    CommunityBand.objects.filter(
+                        bucket__in=CommunityBand.objects.filter(community_id=community_id).values("bucket")
+                    )
+                    .exclude(community_id=community_id)
+                    .values("community_id")
+                    .distinct()
+                    .count()
+                )
+
+            lsh_ms, exact_ms, recall, candidates = [], [], [], []
+            for community_id in rng.sample(community_ids, options["queries"]):
+                began = time.perf_counter()
+                approx = similar_communities(community_id, k=k)
+                lsh_ms.append((time.perf_counter() - began) * 1000)
+                candidates.append(candidate_count(community_id))
+
+                began = time.perf_counter()
+                truth = exact(community_id)
+                exact_ms.append((time.perf_counter() - began) * 1000)
+
+                if truth:
+                    hits = {pk for pk, _ in approx} & {pk for pk, _ in truth}
+                    recall.append(len(hits) / len(truth))
+
+            for label, samples in [("exact Jaccard (SQL)", exact_ms), ("MinHash + LSH", lsh_ms)]:
+                self.stdout.write(
+                    f"top-{k} {label}: p50={statistics.median(samples):.2f} ms "
+                    f"p95={p95(samples):.2f} ms"
+                )
+            self.stdout.write(f"LSH recall@{k} vs exact: {statistics.mean(recall):.2f}")
+            self.stdout.write(
+                f"LSH candidates per query ({BANDS} bands x {ROWS} rows): "
+                f"p50={statistics.median(candidates):.0f} p95={p95(candidates):.0f} "
+                f"of {n_communities}"
+            )
+
+            join_ms = []
+            for _ in range(200):
+                community_id = rng.choice(community_ids)
+                began = time.perf_counter()
+                add_element(community_id, member_element(rng.choice(user_ids)))
+                join_ms.append((time.perf_counter() - began) * 1000)
+            self.stdout.write(
+                f"incremental join update: p50={statistics.median(join_ms):.2f} ms "
+                f"p95={p95(join_ms):.2f} ms"
+            )
+        finally:
+            self.stdout.write("Cleaning up...")
+            # Raw deletes: a million per-row delete signals would take ages
+            for qs in [
+                CommunityBand.objects.filter(community_id__in=community_ids),
+                CommunitySignature.objects.filter(pk__in=community_ids),
+                CommunityMember.objects.filter(community_id__in=community_ids),
+                Community.tags.through.objects.filter(community_id__in=community_ids),
+                Community.objects.filter(pk__in=community_ids),
+                User.objects.filter(username__startswith="bench_sim_"),
+            ]:
+                qs._raw_delete(connection.alias)
+            creator.delete()
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from communities.models import Community
+from communities.similarity import rebuild_signatures
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every community's MinHash signature and LSH bands from "
+        "the membership and tag tables (joins/leaves keep them current "
+        "afterwards)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        community_ids = list(Community.objects.order_by("id").values_list("id", flat=True))
+        rebuild_signatures(community_ids, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Signed {len(community_ids)} communities."))
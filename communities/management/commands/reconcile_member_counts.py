@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from communities.models import Community, CommunityMember
+from events.models import with_new_version
+from events.page_cache import bump_on_commit
+
+
+def actual_member_counts():
+    """Correlated COUNT(*) of CommunityMember rows per Community."""
+    counts = (
+        CommunityMember.objects
+        .filter(community=OuterRef("pk"))
+        .order_by()
+        .values("community")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Community.member_count with the CommunityMember table, "
+        "one chunk of communities at a time, and repair the rows that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report communities whose stored count has drifted.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        dry_run = options["dry_run"]
+        checked = repaired = 0
+        last_id = 0
+
+        # Walk the primary key in short transactions so joins/leaves on
+        # other communities are never held up behind one big UPDATE
+        while True:
+            chunk = list(
+                Community.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            checked += len(chunk)
+
+            with transaction.atomic():
+                drifted = list(
+                    Community.objects.filter(pk__in=chunk)
+                    .annotate(actual=actual_member_counts())
+                    .exclude(member_count=F("actual"))
+                    .values_list("id", "member_count", "actual")
+                )
+                if not drifted:
+                    continue
+
+                for community_id, stored, actual in drifted:
+                    self.stdout.write(f"community {community_id}: stored={stored} actual={actual}")
+
+                if not dry_run:
+                    drifted_ids = [community_id for community_id, _, _ in drifted]
+                    # Recounted inside the UPDATE, not from the values read above
+                    Community.objects.filter(pk__in=drifted_ids).update(
+                        **with_new_version(member_count=actual_member_counts())
+                    )
+                    bump_on_commit("communities", *(f"community:{pk}" for pk in drifted_ids))
+                repaired += len(drifted)
+
+        if dry_run:
+            self.stdout.write(f"{repaired} of {checked} communities out of sync.")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Checked {checked} communities, repaired {repaired}.")
+            )
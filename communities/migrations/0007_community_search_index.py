@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+def create_community_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    Community = apps.get_model('communities', 'Community')
+
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS communities_community_fts USING fts5("
+        "name, interest, description, tags, "
+        "tokenize='porter unicode61 remove_diacritics 2')"
+    )
+
+    tag_names = {}
+    for community_id, name in Community.tags.through.objects.values_list('community_id', 'tag__name'):
+        tag_names.setdefault(community_id, []).append(name)
+
+    rows = [
+        (c.id, c.name, c.interest, c.description, ' '.join(tag_names.get(c.id, [])))
+        for c in Community.objects.only('id', 'name', 'interest', 'description').iterator()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO communities_community_fts (rowid, name, interest, description, tags) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_community_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS communities_community_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0006_alter_community_id_alter_communitymember_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_community_fts, drop_community_fts),
+    ]
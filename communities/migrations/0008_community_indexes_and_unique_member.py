@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def dedupe_members(apps, schema_editor):
+    """Keep the oldest row of every duplicated (user, community) pair."""
+    CommunityMember = apps.get_model('communities', 'CommunityMember')
+
+    duplicates = (
+        CommunityMember.objects
+        .values('user_id', 'community_id')
+        .annotate(keep_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+    )
+
+    for row in duplicates.iterator():
+        CommunityMember.objects.filter(
+            user_id=row['user_id'],
+            community_id=row['community_id'],
+        ).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0007_community_search_index'),
+        ('events', '0019_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_members, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['created_at'], name='community_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='communitymember',
+            constraint=models.UniqueConstraint(fields=('user', 'community'), name='unique_community_member'),
+        ),
+    ]
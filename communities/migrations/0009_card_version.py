@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0008_community_indexes_and_unique_member'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0009_card_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunitySignature',
+            fields=[
+                ('community', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='communities.community')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CommunityBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='communities.community')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='community_lsh_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('community', 'band'), name='unique_community_band')],
+            },
+        ),
+    ]
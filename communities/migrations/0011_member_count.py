@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:17
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_member_counts(apps, schema_editor):
+    Community = apps.get_model('communities', 'Community')
+    CommunityMember = apps.get_model('communities', 'CommunityMember')
+
+    counts = (
+        CommunityMember.objects
+        .filter(community=OuterRef('pk'))
+        .order_by()
+        .values('community')
+        .annotate(c=Count('id'))
+        .values('c')
+    )
+    Community.objects.update(member_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0010_similarity_signatures'),
+        ('events', '0023_recommendations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['member_count', 'id'], name='community_popular_idx'),
+        ),
+        migrations.RunPython(fill_member_counts, migrations.RunPython.noop),
+    ]
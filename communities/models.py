@@ -1,9 +1,10 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.utils import timezone
-from events.models import Tag
+from events.models import Tag, VersionedModel, with_new_version
 
-class Community(models.Model):
+class Community(VersionedModel):
     name = models.CharField(max_length=100)
     interest = models.CharField(max_length=50)  # legacy
     description = models.TextField()
@@ -27,13 +28,97 @@ class Community(models.Model):
         blank=True
     )
 
+    # Denormalized CommunityMember count — only ever changed through
+    # adjust_member_count() (or reconcile_member_counts)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # "Newest" sort
+            models.Index(fields=["created_at"], name="community_created_idx"),
+            # "Most popular" sort: ORDER BY member_count DESC, id DESC
+            models.Index(fields=["member_count", "id"], name="community_popular_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
 
+def adjust_member_count(community_id, delta):
+    """
+    Atomically shift Community.member_count by `delta` in SQL
+    (UPDATE ... SET member_count = member_count + delta).
+    Call it inside the same transaction that adds/removes members.
+    """
+    if delta:
+        Community.objects.filter(pk=community_id).update(**with_new_version(
+            member_count=F("member_count") + delta
+        ))
+
+
 class CommunityMember(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     community = models.ForeignKey(Community, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "community"],
+                name="unique_community_member",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} joined {self.community.name}"
+
+
+def add_member(community, user):
+    """
+    Race-free join: insert the row and let the unique (user, community)
+    constraint reject a duplicate (double click, two tabs). Returns
+    False when the user was already a member.
+    """
+    try:
+        with transaction.atomic():
+            CommunityMember.objects.create(user=user, community=community)
+    except IntegrityError:
+        return False
+    return True
+
+
+class CommunitySignature(models.Model):
+    """
+    MinHash signature of a community's members + tags (see
+    similarity.py), kept current on join/leave/tag changes.
+    """
+
+    community = models.OneToOneField(
+        Community,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="signature"
+    )
+    minhash = models.BinaryField()
+
+    def __str__(self):
+        return f"Signature of community {self.community_id}"
+
+
+class CommunityBand(models.Model):
+    """One LSH bucket per (community, band); similar communities collide."""
+
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name="+")
+    band = models.PositiveSmallIntegerField()
+    # Hash of (band, the band's rows): equal buckets mean equal bands
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["community", "band"], name="unique_community_band"),
+        ]
+        indexes = [
+            models.Index(fields=["bucket"], name="community_lsh_bucket_idx"),
+        ]
+
     def __str__(self):
-        return f"{self.user.username} joined {self.community.name}"
\ No newline at end of file
+        return f"Community {self.community_id} band {self.band}"
@@ -0,0 +1,11 @@
+from events.search import FTSIndex, register
+
+from .models import Community
+
+
+COMMUNITY_INDEX = register(FTSIndex(
+    Community,
+    table="communities_community_fts",
+    columns=["name", "interest", "description", "tags"],
+    weights=[10.0, 4.0, 1.0, 5.0],
+))
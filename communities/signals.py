@@ -0,0 +1,106 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from events.page_cache import bump_on_commit
+from events.search import watch
+from events.versioning import watch_versions
+
+from . import similarity
+from .models import Community, CommunityMember, adjust_member_count
+from .search import COMMUNITY_INDEX
+
+
+# 🔎 Keep the FTS index in step with Community rows and their tags
+watch(COMMUNITY_INDEX)
+
+# 🃏 Bump Community.version when its tags change
+watch_versions(Community)
+
+
+# 👥 Community.member_count follows every CommunityMember insert/delete
+# (views, admin, cascades); adjust_member_count() also bumps the version.
+# Runs inside the caller's transaction, so row and counter commit together.
+
+def count_new_member(sender, instance, created, **kwargs):
+    if created:
+        adjust_member_count(instance.community_id, 1)
+
+
+def count_removed_member(sender, instance, **kwargs):
+    adjust_member_count(instance.community_id, -1)
+
+
+post_save.connect(count_new_member, sender=CommunityMember, dispatch_uid="community_member_count_save")
+post_delete.connect(count_removed_member, sender=CommunityMember, dispatch_uid="community_member_count_delete")
+
+
+# 🗄 Anonymous page cache invalidation (see events/page_cache.py)
+
+def invalidate_community_pages(sender, instance, **kwargs):
+    bump_on_commit("communities", f"community:{instance.pk}")
+
+
+def invalidate_membership_pages(sender, instance, **kwargs):
+    bump_on_commit("communities", f"community:{instance.community_id}")
+
+
+def invalidate_community_tag_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        bump_on_commit("communities", f"community:{instance.pk}")
+    elif pk_set:
+        bump_on_commit("communities", *(f"community:{pk}" for pk in pk_set))
+    else:
+        bump_on_commit("communities", "tags")
+
+
+for model, receiver in [
+    (Community, invalidate_community_pages),
+    (CommunityMember, invalidate_membership_pages),
+]:
+    post_save.connect(receiver, sender=model, dispatch_uid=f"page_cache_save_{model.__name__}")
+    post_delete.connect(receiver, sender=model, dispatch_uid=f"page_cache_delete_{model.__name__}")
+
+m2m_changed.connect(
+    invalidate_community_tag_pages,
+    sender=Community.tags.through,
+    dispatch_uid="page_cache_community_tags",
+)
+
+
+# 🧬 MinHash signatures for "similar communities" (see similarity.py)
+
+def update_signature_on_join(sender, instance, created, **kwargs):
+    if created:
+        element = similarity.member_element(instance.user_id)
+        transaction.on_commit(lambda: similarity.add_element(instance.community_id, element))
+
+
+def update_signature_on_leave(sender, instance, **kwargs):
+    element = similarity.member_element(instance.user_id)
+    transaction.on_commit(lambda: similarity.remove_element(instance.community_id, element))
+
+
+def update_signature_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        # Tag side: rebuild the communities it was added to / removed from
+        community_ids = list(pk_set or [])
+    else:
+        community_ids = [instance.pk]
+
+    if community_ids:
+        transaction.on_commit(lambda: similarity.rebuild_signatures(community_ids))
+
+
+post_save.connect(update_signature_on_join, sender=CommunityMember, dispatch_uid="similarity_member_save")
+post_delete.connect(update_signature_on_leave, sender=CommunityMember, dispatch_uid="similarity_member_delete")
+m2m_changed.connect(
+    update_signature_on_tags,
+    sender=Community.tags.through,
+    dispatch_uid="similarity_community_tags",
+)
@@ -1,3 +1,305 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.relationships import get_relationships
+from events.models import Tag
+from events.tests import QueryPlanMixin, fts_row, run_in_threads
+
+from . import similarity
+from .search import COMMUNITY_INDEX
+from .models import Community, CommunityBand, CommunityMember, CommunitySignature, add_member
+
+
+class CommunityQueryPlanTests(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("planner")
+        cls.tag = Tag.objects.create(name="Books")
+
+        for i in range(5):
+            community = Community.objects.create(
+                name=f"Club {i}",
+                interest="Reading",
+                description="Weekly meetups",
+                created_by=cls.user,
+            )
+            community.tags.add(cls.tag)
+            CommunityMember.objects.create(user=cls.user, community=community)
+        cls.community = community
+
+    def test_community_pages_use_indexes(self):
+        self.client.force_login(self.user)
+
+        for url in [
+            "/communities/",
+            "/communities/?sort=popular",
+            "/communities/?q=club",
+            f"/communities/?tag={self.tag.id}",
+            "/communities/?role=joined",
+            f"/communities/{self.community.id}/",
+            "/communities/my/",
+            "/communities/api/",
+            "/profile/",
+        ]:
+            self.assertNoFullScans(url)
+
+
+class CommunityListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("browser")
+        self.tags = [Tag.objects.create(name=f"Tag {i}") for i in range(3)]
+        self.client.force_login(self.user)
+        cache.clear()
+        get_relationships(self.user)
+
+    def add_communities(self, n):
+        # Commit hooks patch the warm relationship cache, as in production
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(n):
+                community = Community.objects.create(
+                    name=f"Club {i}",
+                    interest="Reading",
+                    description="Weekly meetups",
+                    created_by=self.user,
+                )
+                community.tags.set(self.tags)
+                CommunityMember.objects.create(user=self.user, community=community)
+
+    def test_card_count_does_not_change_query_count(self):
+        for url in ["/communities/", "/communities/?sort=popular", "/communities/my/"]:
+            self.add_communities(2)
+            with CaptureQueriesContext(connection) as few:
+                self.client.get(url)
+
+            self.add_communities(8)
+            with CaptureQueriesContext(connection) as many:
+                self.client.get(url)
+
+            self.assertEqual(len(few), len(many), url)
+
+
+class CommunityJsonApiTests(TestCase):
+    def test_member_join_changes_etag(self):
+        creator = User.objects.create_user("creator")
+        community = Community.objects.create(
+            name="Readers", interest="Books", description="Weekly", created_by=creator
+        )
+        first = self.client.get("/communities/api/", {"sort": "popular"})
+        self.assertEqual(first.json()["results"][0]["member_count"], 0)
+
+        CommunityMember.objects.create(user=creator, community=community)
+
+        second = self.client.get(
+            "/communities/api/", {"sort": "popular"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["results"][0]["member_count"], 1)
+
+
+class MemberCountTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.user = User.objects.create_user("member")
+        self.client.force_login(self.user)
+        self.community = Community.objects.create(
+            name="Readers", interest="Books", description="Weekly", created_by=self.creator
+        )
+
+    def test_join_then_leave_keeps_count_in_sync(self):
+        self.client.get(f"/communities/join/{self.community.id}/")
+        self.client.get(f"/communities/join/{self.community.id}/")
+        self.community.refresh_from_db()
+        self.assertEqual(self.community.member_count, 1)
+
+        self.client.get(f"/communities/leave/{self.community.id}/")
+        self.community.refresh_from_db()
+        self.assertEqual(self.community.member_count, 0)
+
+    def test_creator_is_counted(self):
+        self.client.post("/communities/create/", {
+            "name": "Hikers", "description": "Weekends",
+            "rules": "Be kind",
+        })
+
+        self.assertEqual(Community.objects.get(name="Hikers").member_count, 1)
+
+    def test_popular_sort_reads_the_column(self):
+        busy = Community.objects.create(
+            name="Busy", interest="x", description="", created_by=self.creator
+        )
+        CommunityMember.objects.create(user=self.user, community=busy)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/communities/", {"sort": "popular"})
+
+        self.assertEqual(
+            [c.name for c in response.context["communities"]], ["Busy", "Readers"]
+        )
+        # The shared cache culls with its own COUNT; only app tables matter
+        self.assertFalse(any(
+            "COUNT(" in q["sql"] and '"shared_cache"' not in q["sql"]
+            for q in queries.captured_queries
+        ))
+
+    def test_reconcile_repairs_drift_in_chunks(self):
+        CommunityMember.objects.create(user=self.user, community=self.community)
+        other = Community.objects.create(
+            name="Chess", interest="x", description="", created_by=self.creator
+        )
+        Community.objects.filter(pk=self.community.pk).update(member_count=7)
+        Community.objects.filter(pk=other.pk).update(member_count=2)
+
+        out = StringIO()
+        call_command("reconcile_member_counts", "--dry-run", stdout=out)
+        self.assertIn("2 of 2 communities out of sync", out.getvalue())
+        self.assertEqual(Community.objects.get(pk=other.pk).member_count, 2)
+
+        call_command("reconcile_member_counts", "--chunk-size", "1", stdout=StringIO())
+        self.assertEqual(
+            dict(Community.objects.values_list("name", "member_count")),
+            {"Readers": 1, "Chess": 0},
+        )
+
+
+class JoinCommunityConcurrencyTests(TransactionTestCase):
+    def test_double_click_creates_one_membership(self):
+        creator = User.objects.create_user("creator")
+        user = User.objects.create_user("member")
+        community = Community.objects.create(
+            name="Readers", interest="Books", description="Weekly", created_by=creator
+        )
+
+        results = run_in_threads(add_member, [(community, user)] * 16)
+
+        community.refresh_from_db()
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(CommunityMember.objects.filter(community=community).count(), 1)
+        self.assertEqual(community.member_count, 1)
+
+
+class MembershipDeltaTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.user = User.objects.create_user("member")
+        self.client.force_login(self.user)
+        self.community = Community.objects.create(
+            name="Readers", interest="Books", description="Weekly", created_by=self.creator
+        )
+        self.ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+    def test_ajax_join_and_leave_answer_with_json(self):
+        url = f"/communities/join/{self.community.id}/"
+        first = self.client.get(url, **self.ajax)
+        again = self.client.get(url, **self.ajax)
+        left = self.client.get(f"/communities/leave/{self.community.id}/", **self.ajax)
+
+        delta = {"community": self.community.id, "joined": True, "changed": True, "member_count": 1}
+        self.assertEqual(first.json(), delta)
+        self.assertEqual(again.json(), {**delta, "changed": False})
+        self.assertEqual(left.json(), {**delta, "joined": False, "member_count": 0})
+
+    def test_plain_click_still_redirects(self):
+        response = self.client.get(f"/communities/join/{self.community.id}/")
+
+        self.assertRedirects(response, "/communities/", fetch_redirect_response=False)
+
+
+class AsyncCommunityViewsTests(TestCase):
+    async def test_detail_over_asgi(self):
+        creator = await User.objects.acreate(username="creator")
+        community = await Community.objects.acreate(
+            name="Readers", interest="Books", description="Weekly", created_by=creator
+        )
+        await CommunityMember.objects.acreate(user=creator, community=community)
+        await self.async_client.aforce_login(creator)
+
+        detail = await self.async_client.get(f"/communities/{community.id}/")
+        listing = await self.async_client.get("/communities/")
+
+        self.assertEqual(detail.context["status"], "CREATOR")
+        self.assertEqual(detail.context["member_count"], 1)
+        self.assertContains(listing, "Readers")
+
+
+class CommunitySearchIndexTests(TestCase):
+    def test_index_follows_community_and_tag_changes(self):
+        creator = User.objects.create_user("creator")
+        community = Community.objects.create(
+            name="Readers", interest="Books", description="Weekly", created_by=creator
+        )
+        tag = Tag.objects.create(name="Poetry")
+        community.tags.add(tag)
+        self.assertEqual(fts_row(COMMUNITY_INDEX, community.id)["tags"], "Poetry")
+
+        community.name = "Night readers"
+        community.save()
+        tag.name = "Verse"
+        tag.save()
+        self.assertEqual(
+            fts_row(COMMUNITY_INDEX, community.id),
+            {"name": "Night readers", "interest": "Books", "description": "Weekly", "tags": "Verse"},
+        )
+
+        tag.community_set.clear()
+        self.assertEqual(fts_row(COMMUNITY_INDEX, community.id)["tags"], "")
+
+        results = self.client.get("/communities/api/", {"q": "weekly"}).json()["results"]
+        self.assertEqual([row["id"] for row in results], [community.id])
+
+        community_id = community.id
+        community.delete()
+        self.assertIsNone(fts_row(COMMUNITY_INDEX, community_id))
+
+
+class SimilarCommunitiesTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.users = [User.objects.create_user(f"reader{i}") for i in range(20)]
+        self.novels, self.poetry, self.chess = (
+            Community.objects.create(name=name, interest="x", description="", created_by=self.creator)
+            for name in ("Novels", "Poetry", "Chess")
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in self.users[:12]:
+                CommunityMember.objects.create(user=user, community=self.novels)
+            for user in self.users[2:14]:
+                CommunityMember.objects.create(user=user, community=self.poetry)
+            for user in self.users[14:]:
+                CommunityMember.objects.create(user=user, community=self.chess)
+
+    def signature(self, community):
+        return similarity.decode(CommunitySignature.objects.get(pk=community.pk).minhash)
+
+    def test_overlapping_members_are_found_via_shared_buckets(self):
+        ranked = similarity.similar_communities(self.novels.id)
+
+        self.assertEqual([pk for pk, _ in ranked], [self.poetry.id])
+        # True Jaccard is 10/14; 128 slots estimate it closely
+        self.assertAlmostEqual(ranked[0][1], 10 / 14, delta=0.2)
+
+    def test_incremental_updates_match_a_full_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CommunityMember.objects.create(user=self.users[15], community=self.novels)
+            CommunityMember.objects.filter(user=self.users[0], community=self.novels).delete()
+            self.novels.tags.add(Tag.objects.create(name="Fiction"))
+        incremental = self.signature(self.novels)
+        bands = set(CommunityBand.objects.filter(community=self.novels).values_list("band", "bucket"))
+
+        similarity.rebuild_signatures([self.novels.id])
+
+        self.assertEqual(incremental, self.signature(self.novels))
+        self.assertEqual(
+            bands, set(CommunityBand.objects.filter(community=self.novels).values_list("band", "bucket"))
+        )
+
+    def test_detail_page_lists_people_also_joined(self):
+        response = self.client.get(f"/communities/{self.novels.id}/")
+
+        self.assertEqual(response.context["similar_communities"], [self.poetry])
+        self.assertContains(response, "People who joined this also joined")
@@ -8,6 +8,7 @@ from .views import (
     my_communities,
     community_detail,
 )
+from .api import community_detail_api, community_list_api
 
 
 urlpatterns = [
@@ -22,6 +23,10 @@ urlpatterns = [
     path('leave/<int:community_id>/', leave_community, name='leave_community'),
     path('my/', my_communities, name='my_communities'),
 
+    # 📡 READ-ONLY JSON API
+    path('api/', community_list_api, name='community_list_api'),
+    path('api/<int:community_id>/', community_detail_api, name='community_detail_api'),
+
     # 🔹 DETAIL (ALWAYS LAST)
     path('<int:community_id>/', community_detail, name='community_detail'),
 ]
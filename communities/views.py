@@ -1,120 +1,142 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .models import Community, CommunityMember
-
-from django.db.models import Count
-from .models import Community, CommunityMember
-from events.models import Tag
+from .models import Community, CommunityMember, add_member
+from events.models import Tag, tag_id_param
 
 from .forms import CommunityForm
+from .search import COMMUNITY_INDEX
+from .similarity import similar_communities
+from events.page_cache import cache_anonymous_page
+from events.pagination import paginate_keyset
+from events.views import is_ajax
+from accounts.relationships import get_relationships
 
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse
+from django.db import transaction
 
 
-from django.db.models import Count
+from django.db.models import Case, CharField, Exists, OuterRef, Q, Value, When
 
-def community_list(request):
-    query = request.GET.get('q')
-    tag_id = request.GET.get('tag')
-    sort = request.GET.get('sort', 'newest')
-    role = request.GET.get('role', 'all')
+
+def build_community_list(params, relationships, authenticated):
+    """
+    The filtered, sorted community list for the GET `params`, shared by
+    community_list and its async twin. Returns (queryset, selections).
+    """
+    query = params.get('q')
+    tag_id = tag_id_param(params.get('tag'))  # InvalidTag -> 400
+    sort = params.get('sort') or ('relevance' if query else 'newest')
+    role = params.get('role', 'all')
 
     communities = Community.objects.all()
 
-    # 🔍 search
-    if query:
-        communities = communities.filter(name__icontains=query)
+    # 🔍 search (FTS5 over name, interest, description, tags);
+    # a relevance sort matches and ranks in one go in annotate_rank below
+    if query and sort != 'relevance':
+        communities = COMMUNITY_INDEX.filter(communities, query)
 
     # 🏷️ tag filter
-    if tag_id:
+    if tag_id is not None:
         communities = communities.filter(tags__id=tag_id)
 
     # 📊 sorting
-    if sort == 'popular':
-        communities = communities.annotate(
-            member_count=Count('communitymember')
-        ).order_by('-member_count')
+    if sort == 'relevance' and query:
+        communities = COMMUNITY_INDEX.annotate_rank(
+            communities, query
+        ).order_by('search_rank', 'id')
+    elif sort == 'popular':
+        # walks community_popular_idx (member_count is a maintained column)
+        communities = communities.order_by('-member_count', '-id')
     else:  # newest
+        sort = 'newest'
         communities = communities.order_by('-created_at')
 
-    joined_ids = set()
-    created_ids = set()
-
-    if request.user.is_authenticated:
-        joined_ids = set(
-            CommunityMember.objects.filter(user=request.user)
-            .values_list('community_id', flat=True)
-        )
+    # tags for every card in one extra query
+    communities = communities.prefetch_related('tags')
 
-        created_ids = set(
-            Community.objects.filter(created_by=request.user)
-            .values_list('id', flat=True)
-        )
+    # 👤 cached per-user relationship sets (no queries when warm)
+    joined_ids = relationships.joined_communities
+    created_ids = relationships.created_communities
 
+    if authenticated:
         # 🎯 ROLE FILTER
         if role == 'created':
-            communities = communities.filter(created_by=request.user)
+            communities = communities.filter(id__in=created_ids)
 
         elif role == 'joined':
-            communities = communities.filter(id__in=joined_ids).exclude(
-                created_by=request.user
-            )
+            communities = communities.filter(id__in=joined_ids - created_ids)
 
         elif role == 'not_joined':
-            communities = communities.exclude(
-                id__in=joined_ids
-            ).exclude(
-                created_by=request.user
-            )
+            communities = communities.exclude(id__in=joined_ids | created_ids)
 
-    # attach member_count + status
+    return communities, {
+        'query': query,
+        'selected_tag': params.get('tag'),
+        'selected_sort': sort,
+        'selected_role': role,
+    }
+
+
+def decorate_community_cards(communities, relationships):
     for c in communities:
-        c.member_count = CommunityMember.objects.filter(
-            community=c
-        ).count()
-
-        if request.user.is_authenticated:
-            if c.id in created_ids:
-                c.status = "CREATOR"
-            elif c.id in joined_ids:
-                c.status = "MEMBER"
-            else:
-                c.status = None
+        if c.id in relationships.created_communities:
+            c.status = "CREATOR"
+        elif c.id in relationships.joined_communities:
+            c.status = "MEMBER"
         else:
             c.status = None
 
-    tags = Tag.objects.all()
+
+@cache_anonymous_page(scopes=lambda request: ["communities"])
+def community_list(request):
+    relationships = get_relationships(request.user)
+
+    communities, selections = build_community_list(
+        request.GET, relationships, request.user.is_authenticated
+    )
+    communities = list(communities)
+
+    # attach status
+    decorate_community_cards(communities, relationships)
 
     return render(
         request,
         'communities/community_list.html',
         {
             'communities': communities,
-            'tags': tags,
-            'query': query,
-            'selected_tag': tag_id,
-            'selected_sort': sort,
-            'selected_role': role,
+            'tags': Tag.objects.all(),
+            **selections,
         }
     )
 
 
 
+def membership_delta(community_id, joined, changed):
+    """
+    What a Join/Leave click changed, for the page to patch in place
+    instead of reloading the whole list.
+    """
+    member_count = Community.objects.filter(
+        pk=community_id
+    ).values_list('member_count', flat=True).first()
+
+    return JsonResponse({
+        'community': community_id,
+        'joined': joined,
+        'changed': changed,
+        'member_count': member_count,
+    })
+
+
 @login_required
 def join_community(request, community_id):
     community = get_object_or_404(Community, id=community_id)
 
-    already_joined = CommunityMember.objects.filter(
-        user=request.user,
-        community=community
-    ).exists()
-
-    if not already_joined:
-        CommunityMember.objects.create(
-            user=request.user,
-            community=community
-        )
+    # One INSERT; member row and member_count (see signals.py) commit together
+    joined = add_member(community, request.user)
 
+    if is_ajax(request):
+        return membership_delta(community.id, joined=True, changed=joined)
     return redirect('/communities/')
 
 
@@ -122,58 +144,63 @@ def join_community(request, community_id):
 def leave_community(request, community_id):
     community = get_object_or_404(Community, id=community_id)
 
-    CommunityMember.objects.filter(
-        user=request.user,
-        community=community
-    ).delete()
+    with transaction.atomic():
+        removed, _ = CommunityMember.objects.filter(
+            user=request.user,
+            community=community
+        ).delete()
 
+    if is_ajax(request):
+        return membership_delta(community.id, joined=False, changed=bool(removed))
     return redirect('/communities/')
 
+MY_COMMUNITIES_PAGE_SIZE = 20
+MY_COMMUNITIES_ORDERING = ('-created_at', '-id')
+
+
 @login_required
 def my_communities(request):
     filter_by = request.GET.get('filter', 'all')
-
-    created_communities = Community.objects.filter(
-        created_by=request.user
-    )
-
-    joined_communities = Community.objects.filter(
-        communitymember__user=request.user
+    user = request.user
+
+    # 🎯 One query per page: role comes back annotated, member_count is a column
+    memberships = CommunityMember.objects.filter(user=user)
+
+    communities = Community.objects.filter(
+        Q(created_by=user) | Q(pk__in=memberships.values('community_id'))
+    ).annotate(
+        is_member=Exists(memberships.filter(community=OuterRef('pk'))),
+        status=Case(
+            When(created_by=user, then=Value("CREATOR")),
+            When(is_member=True, then=Value("MEMBER")),
+            default=Value(None),
+            output_field=CharField(null=True),
+        ),
     )
 
     if filter_by == 'created':
-        communities = created_communities
+        communities = communities.filter(created_by=user)
 
     elif filter_by == 'joined':
-        communities = joined_communities.exclude(
-            created_by=request.user
-        )
+        communities = communities.filter(is_member=True).exclude(created_by=user)
 
     else:  # all
-        communities = (created_communities | joined_communities).distinct()
-
-    joined_ids = set(
-        CommunityMember.objects.filter(user=request.user)
-        .values_list('community_id', flat=True)
+        filter_by = 'all'
+
+    page = paginate_keyset(
+        communities.prefetch_related('tags'),
+        MY_COMMUNITIES_ORDERING,
+        cursor=request.GET.get('cursor'),
+        page_size=MY_COMMUNITIES_PAGE_SIZE,
+        key=f"my:{filter_by}",
     )
 
-    for community in communities:
-        community.member_count = CommunityMember.objects.filter(
-            community=community
-        ).count()
-
-        if community.created_by == request.user:
-            community.status = "CREATOR"
-        elif community.id in joined_ids:
-            community.status = "MEMBER"
-        else:
-            community.status = ""
-
     return render(
         request,
         'communities/my_communities.html',
         {
-            'communities': communities,
+            'communities': page.items,
+            'page': page,
             'selected_filter': filter_by
         }
     )
@@ -181,47 +208,62 @@ def my_communities(request):
 
 
 
+@cache_anonymous_page(
+    scopes=lambda request, community_id: [f"community:{community_id}", "tags"]
+)
 def community_detail(request, community_id):
     community = get_object_or_404(Community, id=community_id)
 
     status = None
 
     if request.user.is_authenticated:
-        if community.created_by == request.user:
+        if community.created_by_id == request.user.id:
             status = "CREATOR"
         elif CommunityMember.objects.filter(
-            user=request.user,
-            community=community
+            user=request.user, community=community
         ).exists():
             status = "MEMBER"
 
-    member_count = CommunityMember.objects.filter(
-        community=community
-    ).count()
-
     return render(
         request,
         'communities/community_detail.html',
         {
             'community': community,
             'status': status,
-            'member_count': member_count,
+            'member_count': community.member_count,
+            'similar_communities': similar_community_cards(community.id),
         }
     )
 
+
+SIMILAR_COMMUNITIES_SHOWN = 5
+
+
+def similar_community_cards(community_id):
+    """Communities for the "people also joined" box, best match first."""
+    ranked = similar_communities(community_id, k=SIMILAR_COMMUNITIES_SHOWN)
+    if not ranked:
+        return []
+
+    by_id = Community.objects.in_bulk([pk for pk, _ in ranked])
+    cards = []
+    for pk, score in ranked:
+        if pk in by_id:
+            by_id[pk].similarity = score
+            cards.append(by_id[pk])
+    return cards
+
 @login_required
 def create_community(request):
     if request.method == 'POST':
         form = CommunityForm(request.POST)
         if form.is_valid():
-            community = form.save(commit=False)
-            community.created_by = request.user
-            community.save()
-            form.save_m2m()
-            CommunityMember.objects.create(
-                user=request.user,
-                community=community
-        )
+            with transaction.atomic():
+                community = form.save(commit=False)
+                community.created_by = request.user
+                community.save()
+                form.save_m2m()
+                add_member(community, request.user)
         return redirect('/communities/')
     else:
         form = CommunityForm()
@@ -0,0 +1,31 @@
+"""
+URLconf for requests served over ASGI (see middleware.AsyncViewsMiddleware):
+the regular ROOT_URLCONF with the read-heavy pages swapped for their
+native async versions, plus the ASGI-only live stream. The swapped
+routes come first so they win.
+"""
+from django.urls import path
+
+from communities import async_views as community_async_views
+from events import async_views as event_async_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+
+urlpatterns = [
+    path('events/', event_async_views.events_list, name='events_list'),
+    path('events/<int:event_id>/', event_async_views.event_detail, name='event_detail'),
+    # Long-lived stream: only offered over ASGI, one held thread per
+    # viewer would exhaust a WSGI worker
+    path(
+        'events/<int:event_id>/stream/',
+        event_async_views.event_stream,
+        name='event_stream'
+    ),
+    path('communities/', community_async_views.community_list, name='community_list'),
+    path(
+        'communities/<int:community_id>/',
+        community_async_views.community_detail,
+        name='community_detail'
+    ),
+] + sync_urlpatterns
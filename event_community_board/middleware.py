@@ -0,0 +1,33 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+
+class AsyncViewsMiddleware:
+    """
+    Requests that arrive over ASGI resolve against ASYNC_URLCONF, which
+    swaps the read-heavy pages for their native async versions. WSGI
+    requests keep ROOT_URLCONF and the sync views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def route(self, request):
+        if isinstance(request, ASGIRequest):
+            request.urlconf = settings.ASYNC_URLCONF
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.route(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.route(request)
+        return await self.get_response(request)
@@ -26,6 +26,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('events/', include('events.urls')),
     path('communities/', include('communities.urls')),
+    path('notifications/', include('notifications.urls')),
     path('accounts/', include('django.contrib.auth.urls')),
     path('', include('accounts.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
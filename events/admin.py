@@ -1,13 +1,68 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
 from .models import Event, EventRegistration, Tag
 from .models import EventVisibilitySettings
+from .models import EventWaitlistEntry
+from .models import adjust_registration_count, promote_waitlist
+from .visibility import visibility_cache_stats
 
 admin.site.register(Event)
-admin.site.register(EventRegistration)
 admin.site.register(Tag)
 
+
+@admin.register(EventRegistration)
+class EventRegistrationAdmin(admin.ModelAdmin):
+    """
+    Adds and deletes are counted by the EventRegistration signals; an
+    edit that moves a registration to another event is counted here.
+    """
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if change and "event" in form.changed_data:
+                adjust_registration_count(form.initial["event"], -1)
+                adjust_registration_count(obj.event_id, 1)
+
+            super().save_model(request, obj, form, change)
+
+            EventWaitlistEntry.objects.filter(
+                event_id=obj.event_id,
+                user_id=obj.user_id
+            ).delete()
+
+        if change and "event" in form.changed_data:
+            promote_waitlist(form.initial["event"])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        promote_waitlist(obj.event_id)
+
+    def delete_queryset(self, request, queryset):
+        event_ids = set(queryset.values_list("event_id", flat=True))
+        super().delete_queryset(request, queryset)
+
+        for event_id in event_ids:
+            promote_waitlist(event_id)
+
+
+@admin.register(EventWaitlistEntry)
+class EventWaitlistEntryAdmin(admin.ModelAdmin):
+    def get_readonly_fields(self, request, obj=None):
+        # Tickets number one event's queue; moving an entry would break them
+        return ("event",) if obj else ()
+
+
 @admin.register(EventVisibilitySettings)
 class EventVisibilitySettingsAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         # Only ONE settings row allowed
-        return not EventVisibilitySettings.objects.exists()
\ No newline at end of file
+        return not EventVisibilitySettings.objects.exists()
+
+    def changelist_view(self, request, extra_context=None):
+        stats = visibility_cache_stats()
+        messages.info(
+            request,
+            f"Settings cache (this worker): {stats['hits']} hits, "
+            f"{stats['misses']} misses, version {stats['version']}."
+        )
+        return super().changelist_view(request, extra_context)
@@ -0,0 +1,267 @@
+"""
+Read-only JSON API (list, detail, announcements).
+
+- ?fields=id,title,...   sparse field selection (400 on unknown names)
+- ?cursor=...            keyset pagination, same cursors as the HTML lists
+- ?tag=<id>              tag filter (400 unless an integer)
+- ETag / If-None-Match   strong ETag over the (id, version) pairs of the
+                         rows being returned. An unchanged poll is
+                         answered 304 after one narrow query, before any
+                         row is loaded or serialized.
+
+Rows are read with .values() projections, never model instances.
+"""
+import hashlib
+
+from django.db.models import F
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from .models import Event, EventAnnouncement, InvalidTag, tag_id_param
+from .pagination import InvalidCursor, paginate_keyset
+from .search import EVENT_INDEX
+from .views import ANNOUNCEMENT_ORDERING, EVENT_SORT_ORDERINGS, EVENTS_PAGE_SIZE
+from .visibility import get_visibility_settings
+
+
+API_MAX_PAGE_SIZE = 100
+
+# Public name -> .values() expression (None = the model field itself)
+EVENT_FIELDS = {
+    "id": None,
+    "title": None,
+    "interest": None,
+    "description": None,
+    "age_criteria": None,
+    "mode": None,
+    "venue_or_link": None,
+    "location": None,
+    "date": None,
+    "start_time": None,
+    "end_time": None,
+    "start_at": None,
+    "end_at": None,
+    "max_participants": None,
+    "registration_count": None,
+    "event_state": None,
+    "cancellation_reason": None,
+    "version": None,
+    "updated_at": None,
+    "creator": F("created_by__username"),
+    "tags": None,  # filled in from one extra query, see attach_tags()
+}
+EVENT_DEFAULT_FIELDS = [
+    "id", "title", "interest", "location", "start_at", "end_at",
+    "event_state", "registration_count", "max_participants", "tags",
+]
+
+ANNOUNCEMENT_FIELDS = {
+    "id": None,
+    "message": None,
+    "created_at": None,
+    "updated_at": None,
+    "version": None,
+    "author": F("created_by__username"),
+}
+
+
+class BadFields(Exception):
+    pass
+
+
+def sparse_fields(request, available, default):
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(default)
+
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise BadFields(f"Unknown field(s): {', '.join(unknown)}")
+
+    return list(dict.fromkeys(["id", *fields]))
+
+
+def projection(qs, fields, available):
+    """qs.values() for the requested public field names."""
+    plain = [name for name in fields if available[name] is None and name != "tags"]
+    exprs = {name: available[name] for name in fields if available[name] is not None}
+    return qs.values(*plain, **exprs)
+
+
+def attach_tags(rows, model):
+    """rows[i]["tags"] = [tag names], one query for the whole page."""
+    through = model.tags.through
+    fk = f"{model._meta.model_name}_id"
+
+    names = {row["id"]: [] for row in rows}
+    for pk, name in through.objects.filter(
+        **{f"{fk}__in": list(names)}
+    ).values_list(fk, "tag__name").order_by(fk, "tag__name"):
+        names[pk].append(name)
+
+    for row in rows:
+        row["tags"] = names[row["id"]]
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get("limit", EVENTS_PAGE_SIZE))
+    except ValueError:
+        size = EVENTS_PAGE_SIZE
+    return max(1, min(size, API_MAX_PAGE_SIZE))
+
+
+def strong_etag(*parts):
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request, etag):
+    """A 304 response when If-None-Match matches `etag`, else None."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response["ETag"] = etag
+    return response
+
+
+def json_response(data, etag, status=200):
+    response = JsonResponse(data, status=status)
+    response["ETag"] = etag
+    # Clients may keep a copy but must revalidate (cheap 304s)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def json_page(request, qs, ordering, key, fields, available, model=None):
+    """
+    Keyset page as JSON. The first query only reads the ordering
+    columns plus id/version; that is enough for the ETag, so a 304 costs
+    that single query. Otherwise one more .values() query projects the
+    requested fields (plus one for tags if asked for). A bad cursor is
+    a 400, not page 1.
+    """
+    order_names = [field.lstrip("-") for field in ordering]
+    try:
+        page = paginate_keyset(
+            qs.values("id", "version", *order_names),
+            ordering,
+            cursor=request.GET.get("cursor"),
+            page_size=page_size(request),
+            key=key,
+        )
+    except InvalidCursor as error:
+        return bad_request(error)
+
+    etag = strong_etag(
+        key,
+        fields,
+        [(row["id"], row["version"]) for row in page.items],
+        page.next_cursor,
+        page.prev_cursor,
+    )
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    ids = [row["id"] for row in page.items]
+    by_id = {
+        row["id"]: row
+        for row in projection(qs.model.objects.filter(pk__in=ids), fields, available)
+    }
+    rows = [by_id[pk] for pk in ids if pk in by_id]
+
+    if "tags" in fields and model is not None:
+        attach_tags(rows, model)
+
+    return json_response(
+        {
+            "results": rows,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        },
+        etag,
+    )
+
+
+def bad_request(error):
+    return JsonResponse({"error": str(error)}, status=400)
+
+
+# 📅 EVENTS
+
+@require_GET
+def event_list_api(request):
+    try:
+        fields = sparse_fields(request, EVENT_FIELDS, EVENT_DEFAULT_FIELDS)
+    except BadFields as error:
+        return bad_request(error)
+
+    try:
+        tag_id = tag_id_param(request.GET.get("tag"))
+    except InvalidTag as error:
+        return bad_request(error)
+
+    query = request.GET.get("q")
+    sort = request.GET.get("sort") or ("relevance" if query else "upcoming")
+
+    qs = Event.objects.visible(get_visibility_settings())
+
+    if query and sort != "relevance":
+        qs = EVENT_INDEX.filter(qs, query)  # annotate_rank matches otherwise
+    if tag_id is not None:
+        qs = qs.filter(tags__id=tag_id)
+    if request.GET.get("lifecycle"):
+        qs = qs.for_lifecycle(request.GET["lifecycle"])
+
+    if sort == "relevance" and query:
+        qs = EVENT_INDEX.annotate_rank(qs, query)
+    elif sort not in EVENT_SORT_ORDERINGS or sort == "relevance":
+        sort = "upcoming"
+
+    return json_page(
+        request, qs, EVENT_SORT_ORDERINGS[sort], f"api:{sort}", fields, EVENT_FIELDS, Event
+    )
+
+
+@require_GET
+def event_detail_api(request, event_id):
+    try:
+        fields = sparse_fields(request, EVENT_FIELDS, EVENT_FIELDS)
+    except BadFields as error:
+        return bad_request(error)
+
+    event = Event.objects.filter(pk=event_id)
+    version = get_object_or_404(event.values_list("version", flat=True))
+
+    etag = strong_etag("event", event_id, version, fields)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    row = projection(event, fields, EVENT_FIELDS).get()
+    if "tags" in fields:
+        attach_tags([row], Event)
+
+    return json_response(row, etag)
+
+
+@require_GET
+def event_announcements_api(request, event_id):
+    try:
+        fields = sparse_fields(request, ANNOUNCEMENT_FIELDS, ANNOUNCEMENT_FIELDS)
+    except BadFields as error:
+        return bad_request(error)
+
+    get_object_or_404(Event.objects.values_list("id"), pk=event_id)
+
+    return json_page(
+        request,
+        EventAnnouncement.objects.filter(event_id=event_id),
+        ANNOUNCEMENT_ORDERING,
+        f"api:announcements:{event_id}",
+        fields,
+        ANNOUNCEMENT_FIELDS,
+    )
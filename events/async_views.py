@@ -0,0 +1,167 @@
+"""
+Native async versions of the read-heavy event pages.
+
+Served instead of their sync twins in views.py when the request comes
+in over ASGI (see event_community_board/asgi_urls.py). They build the
+same querysets through the shared helpers in views.py, fetch with the
+async ORM and issue the queries that do not depend on each other
+together with asyncio.gather(). Rendering happens once every row is in
+memory; it runs in a worker thread because context processors and
+{% cache %} still do blocking I/O.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from accounts.relationships import EMPTY, get_relationships
+
+from . import live, views
+from .models import Event, EventRegistration, EventWaitlistEntry, Tag, waitlist_position
+from .page_cache import cache_anonymous_page, seconds_until
+from .pagination import apaginate_keyset
+from .visibility import get_visibility_settings
+
+
+arender = sync_to_async(render)
+
+
+async def alist(qs):
+    return [obj async for obj in qs]
+
+
+async def arelationships(user):
+    if not user.is_authenticated:
+        return EMPTY
+    return await sync_to_async(get_relationships)(user)
+
+
+@cache_anonymous_page(
+    scopes=lambda request: ["events"],
+    ttl=views.events_list_ttl,
+)
+async def events_list(request):
+    user = await request.auser()
+
+    settings, relationships, tags = await asyncio.gather(
+        sync_to_async(get_visibility_settings)(),
+        arelationships(user),
+        alist(Tag.objects.all()),
+    )
+
+    qs, selections = views.build_events_list(
+        request.GET, settings, relationships, timezone.now()
+    )
+
+    sort = selections["selected_sort"]
+    page = await apaginate_keyset(
+        qs,
+        views.EVENT_SORT_ORDERINGS[sort],
+        cursor=request.GET.get("cursor"),
+        page_size=views.EVENTS_PAGE_SIZE,
+        key=sort,
+    )
+    views.decorate_event_cards(page.items, relationships)
+
+    return await arender(
+        request,
+        "events/events_list.html",
+        {
+            "events": page.items,
+            "page": page,
+            "tags": tags,
+            **selections,
+        }
+    )
+
+
+async def _is_registered(user, event_id):
+    if not user.is_authenticated:
+        return False
+    return await EventRegistration.objects.filter(user=user, event_id=event_id).aexists()
+
+
+async def _waitlist_entry(user, event_id):
+    if not user.is_authenticated:
+        return None
+    return await EventWaitlistEntry.objects.filter(user=user, event_id=event_id).afirst()
+
+
+@cache_anonymous_page(
+    scopes=lambda request, event_id: [f"event:{event_id}", "tags"],
+    ttl=lambda request, event_id: seconds_until(
+        Event.objects.filter(pk=event_id).next_transition()
+    ),
+)
+async def event_detail(request, event_id):
+    if request.method == "POST":
+        # Posting an announcement is a write; keep it on the sync path
+        return await sync_to_async(views.event_detail)(request, event_id=event_id)
+
+    user = await request.auser()
+
+    # The event, the viewer's registration/waitlist rows and the
+    # announcements only need event_id, so fetch them together
+    event, registered, waitlist_entry, announcements = await asyncio.gather(
+        Event.objects.select_related("created_by").prefetch_related("tags")
+        .filter(pk=event_id).afirst(),
+        _is_registered(user, event_id),
+        _waitlist_entry(user, event_id),
+        apaginate_keyset(
+            views.announcement_timeline(event_id),
+            views.ANNOUNCEMENT_ORDERING,
+            page_size=views.ANNOUNCEMENTS_PAGE_SIZE,
+            key=f"announcements:{event_id}",
+        ),
+    )
+    if event is None:
+        raise Http404("No Event matches the given query.")
+
+    event.lifecycle = views.compute_event_lifecycle(event)
+
+    status = None
+    position = None
+    if user.is_authenticated:
+        if event.created_by_id == user.id:
+            status = "CREATOR"
+        elif registered:
+            status = "MEMBER"
+        elif waitlist_entry:
+            status = "WAITLISTED"
+            position = await waitlist_position(waitlist_entry.id).afirst()
+
+    return await arender(
+        request,
+        "events/event_detail.html",
+        {
+            "event": event,
+            "status": status,
+            "join_count": event.registration_count,
+            "is_full": bool(
+                event.max_participants
+                and event.registration_count >= event.max_participants
+            ),
+            "waitlist_position": position,
+            "announcements": announcements.items,
+            "announcements_page": announcements,
+            "can_manage_announcements": views.can_manage_announcements(event, status),
+        }
+    )
+
+
+# 📡 LIVE UPDATES (Server-Sent Events, see live.py)
+
+async def event_stream(request, event_id):
+    if not await Event.objects.filter(pk=event_id).aexists():
+        raise Http404("No Event matches the given query.")
+
+    response = StreamingHttpResponse(
+        live.stream(event_id, request.headers.get("Last-Event-ID")),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx & co. from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
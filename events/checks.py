@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from .page_cache import PAGE_CACHE_ALIAS
+
+
+# Backends whose entries only exist inside one process
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+@register()
+def check_shared_page_cache(app_configs, **kwargs):
+    """
+    Page cache generations are bumped by whichever process wrote (a web
+    worker, run_lifecycle_scheduler); a per-process cache would never
+    see the other processes' bumps.
+    """
+    config = settings.CACHES.get(PAGE_CACHE_ALIAS)
+    if config is None:
+        return [Error(
+            f"CACHES has no {PAGE_CACHE_ALIAS!r} alias for the anonymous page cache.",
+            hint="Point it at a cache every process shares (database, Redis, memcached).",
+            id="events.E001",
+        )]
+    if config.get("BACKEND") in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"CACHES[{PAGE_CACHE_ALIAS!r}] is process-local; page cache "
+            "invalidation would not reach other workers or the scheduler.",
+            hint="Use DatabaseCache, Redis or memcached.",
+            id="events.E002",
+        )]
+    return []
@@ -0,0 +1,93 @@
+"""
+Persisted event lifecycle.
+
+Event.event_state stores UPCOMING / ONGOING / COMPLETED / CANCELLED.
+save() sets it from the clock for the row it writes; after that only
+the clock moves it forward, at start_at (UPCOMING -> ONGOING) and at
+end_at (-> COMPLETED). advance_lifecycles() applies every transition
+that is due with bulk UPDATEs over the (event_state, start_at/end_at)
+indexes, and `manage.py run_lifecycle_scheduler` calls it whenever the
+next boundary on its min-heap comes up.
+"""
+import heapq
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Event, with_new_version
+
+
+# Sent once per flipped event, after its UPDATE:
+#   sender=Event, event_id, old_state, new_state, at
+lifecycle_changed = Signal()
+
+
+def _due_transitions(now):
+    """(new_state, queryset of rows that must move to it), in apply order."""
+    return [
+        # COMPLETED first: an event whose whole slot passed while the
+        # scheduler was down goes straight there, in one transition
+        (
+            "COMPLETED",
+            Event.objects.filter(
+                event_state__in=["UPCOMING", "ONGOING"], end_at__lt=now
+            ),
+        ),
+        (
+            "ONGOING",
+            Event.objects.filter(event_state="UPCOMING", start_at__lte=now),
+        ),
+    ]
+
+
+def advance_lifecycles(now=None):
+    """
+    Flip every overdue event in one UPDATE per target state.
+    Safe to call at any time and from several processes: each UPDATE
+    only touches rows still in the old state. Returns the transitions
+    as (event_id, old_state, new_state).
+    """
+    now = now or timezone.now()
+    transitions = []
+
+    with transaction.atomic():
+        for new_state, due in _due_transitions(now):
+            rows = list(due.values_list("id", "event_state"))
+            if not rows:
+                continue
+
+            due.filter(pk__in=[pk for pk, _ in rows]).update(
+                **with_new_version(event_state=new_state)
+            )
+
+            transitions.extend((pk, old, new_state) for pk, old in rows)
+
+    for event_id, old_state, new_state in transitions:
+        lifecycle_changed.send(
+            sender=Event,
+            event_id=event_id,
+            old_state=old_state,
+            new_state=new_state,
+            at=now,
+        )
+
+    return transitions
+
+
+def upcoming_boundaries(now, until):
+    """
+    Min-heap of the distinct start/end moments in (now, until] that
+    will move some event_state.
+    """
+    starts = Event.objects.filter(
+        event_state="UPCOMING", start_at__gt=now, start_at__lte=until
+    ).values_list("start_at", flat=True)
+
+    ends = Event.objects.filter(
+        event_state__in=["UPCOMING", "ONGOING"], end_at__gte=now, end_at__lte=until
+    ).values_list("end_at", flat=True)
+
+    heap = list({*starts, *ends})
+    heapq.heapify(heap)
+    return heap
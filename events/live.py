@@ -0,0 +1,228 @@
+"""
+Live updates for event_detail over Server-Sent Events.
+
+One Hub per worker process. Every open stream subscribes to the hub
+with a small bounded queue; the hub runs ONE poller for the whole
+worker, which asks the database, once per POLL_INTERVAL, for
+announcements and participant counts that changed on the events that
+currently have listeners (two indexed queries, however many
+connections are open). Each change is encoded once and the same bytes
+are handed to every listener of that event.
+
+Polling (rather than signals) is what makes writes from other workers
+and the WSGI process show up too.
+
+Frames:
+
+    id: <updated_at in microseconds>
+    event: announcement | count
+    data: {...json...}
+
+A reconnecting browser sends the last id back as Last-Event-ID; the
+stream replays announcements changed since then (minus a small overlap
+for late commits, the client de-duplicates on id + version) and the
+current count, then carries on live.
+
+Memory per idle connection is one generator and one bounded queue. A
+listener that falls QUEUE_SIZE messages behind is dropped and simply
+reconnects/resumes from its Last-Event-ID.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Event, EventAnnouncement
+
+
+POLL_INTERVAL = 1  # seconds
+HEARTBEAT_INTERVAL = 15  # seconds, keeps proxies from closing idle streams
+QUEUE_SIZE = 32
+# Re-read this far behind the watermark so a transaction that committed
+# late (older updated_at than rows already seen) is still picked up
+COMMIT_LAG = timedelta(seconds=2)
+RETRY_MS = 3000
+
+ANNOUNCEMENT_FIELDS = ("id", "event_id", "message", "created_at", "updated_at", "version")
+
+
+def to_event_id(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def from_event_id(value):
+    try:
+        micros = int(value)
+    except (TypeError, ValueError):
+        return None
+    return datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc)
+
+
+def frame(kind, moment, payload):
+    data = json.dumps(payload, cls=DjangoJSONEncoder)
+    return f"id: {to_event_id(moment)}\nevent: {kind}\ndata: {data}\n\n".encode()
+
+
+def announcement_frame(row):
+    return frame("announcement", row["updated_at"], row)
+
+
+def count_frame(row):
+    return frame(
+        "count",
+        row["updated_at"],
+        {
+            "join_count": row["registration_count"],
+            "max_participants": row["max_participants"],
+        },
+    )
+
+
+def announcements_since(event_ids, since):
+    return (
+        EventAnnouncement.objects.filter(event_id__in=event_ids, updated_at__gt=since)
+        .values(*ANNOUNCEMENT_FIELDS, author=F("created_by__username"))
+        .order_by("updated_at", "id")
+    )
+
+
+def counts_for(event_ids):
+    return Event.objects.filter(pk__in=event_ids).values(
+        "id", "registration_count", "max_participants", "updated_at"
+    )
+
+
+class Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = False
+
+
+class Topic:
+    """Listeners of one event plus what has been sent for it."""
+
+    __slots__ = ("subscribers", "join_count", "sent")
+
+    def __init__(self):
+        self.subscribers = set()
+        self.join_count = None
+        # announcement id -> (version, updated_at), only inside COMMIT_LAG
+        self.sent = {}
+
+
+class Hub:
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.topics = {}
+        self.watermark = None
+        self._poller = None
+
+    def subscribe(self, event_id):
+        subscriber = Subscriber()
+        self.topics.setdefault(event_id, Topic()).subscribers.add(subscriber)
+
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self.watermark = timezone.now()
+            self._poller = loop.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, event_id, subscriber):
+        topic = self.topics.get(event_id)
+        if topic is None:
+            return
+        topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            del self.topics[event_id]
+
+    def publish(self, event_id, message):
+        topic = self.topics.get(event_id)
+        if topic is None:
+            return
+        for subscriber in list(topic.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: cut it loose, it will resume from the DB
+                subscriber.dropped = True
+                topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            del self.topics[event_id]
+
+    async def _run(self):
+        while self.topics:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except DatabaseError:
+                # Transient (e.g. locked SQLite); try again next tick
+                continue
+
+    async def poll(self):
+        event_ids = list(self.topics)
+        if not event_ids:
+            return
+
+        started = timezone.now()
+        since = self.watermark - COMMIT_LAG
+
+        async for row in announcements_since(event_ids, since):
+            topic = self.topics.get(row["event_id"])
+            if topic is None:
+                continue
+            if topic.sent.get(row["id"], (None,))[0] == row["version"]:
+                continue
+            topic.sent[row["id"]] = (row["version"], row["updated_at"])
+            self.publish(row["event_id"], announcement_frame(row))
+
+        async for row in counts_for(event_ids).filter(updated_at__gt=since):
+            topic = self.topics.get(row["id"])
+            if topic is None or topic.join_count == row["registration_count"]:
+                continue
+            topic.join_count = row["registration_count"]
+            self.publish(row["id"], count_frame(row))
+
+        self.watermark = started
+        horizon = started - COMMIT_LAG
+        for topic in self.topics.values():
+            topic.sent = {
+                pk: seen for pk, seen in topic.sent.items() if seen[1] > horizon
+            }
+
+
+hub = Hub()
+
+
+async def stream(event_id, last_event_id=None, hub=hub):
+    """The body of one SSE response (an async iterator of bytes)."""
+    # Subscribe before reading the backlog so nothing falls in between
+    subscriber = hub.subscribe(event_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+
+        resume_from = from_event_id(last_event_id)
+        if resume_from is not None:
+            async for row in announcements_since([event_id], resume_from - COMMIT_LAG):
+                yield announcement_frame(row)
+
+        row = await counts_for([event_id]).afirst()
+        if row is not None:
+            yield count_frame(row)
+
+        while not subscriber.dropped or not subscriber.queue.empty():
+            try:
+                yield await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                if subscriber.dropped:
+                    break
+                yield b": keepalive\n\n"
+    finally:
+        hub.unsubscribe(event_id, subscriber)
@@ -0,0 +1,105 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.utils import timezone
+
+from events.models import Event, EventAnnouncement
+# The anonymous page cache, cleared so every request renders
+from events.page_cache import cache
+
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[18]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the event list/detail pages through the WSGI handler (sync "
+        "views, thread pool) and the ASGI handler (async views, one event "
+        "loop) at the same concurrency and report req/s and p50/p95 "
+        "latency. The page cache is cleared before every request so each "
+        "one reaches the database. All benchmark rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--events", type=int, default=30)
+
+    def handle(self, *args, **options):
+        n_requests = options["requests"]
+        concurrency = options["concurrency"]
+
+        creator = User.objects.create_user("bench_asgi")
+        start = timezone.localtime() + timedelta(days=1)
+        events = []
+        for i in range(options["events"]):
+            event = Event.objects.create(
+                title=f"ASGI benchmark {i}",
+                interest="Benchmark",
+                description="Lorem ipsum dolor sit amet. " * 10,
+                location="Nowhere",
+                date=start.date(),
+                start_time=start.time().replace(microsecond=0),
+                max_participants=100,
+                created_by=creator,
+            )
+            EventAnnouncement.objects.create(
+                event=event, message="Benchmark announcement", created_by=creator
+            )
+            events.append(event)
+
+        paths = ["/events/"] + [f"/events/{event.id}/" for event in events]
+        urls = [paths[i % len(paths)] for i in range(n_requests)]
+
+        try:
+            results = [
+                ("wsgi (sync views)", self.run_wsgi(urls, concurrency)),
+                ("asgi (async views)", asyncio.run(self.run_asgi(urls, concurrency))),
+            ]
+            for label, (elapsed, samples) in results:
+                self.stdout.write(
+                    f"{label}: {len(samples) / elapsed:.1f} req/s "
+                    f"p50={statistics.median(samples):.2f} ms "
+                    f"p95={p95(samples):.2f} ms "
+                    f"({len(samples)} requests, concurrency {concurrency})"
+                )
+        finally:
+            cache.clear()
+            Event.objects.filter(created_by=creator).delete()
+            creator.delete()
+
+    def run_wsgi(self, urls, concurrency):
+        def fetch(url):
+            cache.clear()
+            began = time.perf_counter()
+            response = Client().get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            return (time.perf_counter() - began) * 1000
+
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(fetch, urls))
+        return time.perf_counter() - began, samples
+
+    async def run_asgi(self, urls, concurrency):
+        gate = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def fetch(url):
+            async with gate:
+                await cache.aclear()
+                began = time.perf_counter()
+                response = await client.get(url)
+                assert response.status_code == 200, (url, response.status_code)
+                return (time.perf_counter() - began) * 1000
+
+        began = time.perf_counter()
+        samples = await asyncio.gather(*(fetch(url) for url in urls))
+        return time.perf_counter() - began, samples
@@ -0,0 +1,95 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from events.models import Event, Tag
+
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[18]
+
+
+class Command(BaseCommand):
+    help = (
+        "Render a page of event cards repeatedly, first with cold card "
+        "fragments (every card re-rendered, the old behaviour) and then "
+        "with warm ones, and report p50/p95 render time. All benchmark "
+        "rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cards", type=int, default=50)
+        parser.add_argument("--runs", type=int, default=200)
+
+    def handle(self, *args, **options):
+        n_cards = options["cards"]
+        runs = options["runs"]
+
+        creator = User.objects.create_user("bench_cards")
+        tags = [Tag.objects.create(name=f"bench_tag_{i}") for i in range(4)]
+
+        start = timezone.localtime() + timedelta(days=1)
+        for i in range(n_cards):
+            event = Event.objects.create(
+                title=f"Card benchmark {i}",
+                interest="Benchmark",
+                description="Lorem ipsum dolor sit amet. " * 10,
+                location="Nowhere",
+                date=start.date(),
+                start_time=start.time().replace(microsecond=0),
+                max_participants=100,
+                created_by=creator,
+            )
+            event.tags.set(tags)
+
+        fragment_keys = []
+        try:
+            events = list(
+                Event.objects.filter(created_by=creator)
+                .with_lifecycle()
+                .prefetch_related("tags")
+            )
+            for i, event in enumerate(events):
+                event.join_count = event.registration_count
+                event.status = "MEMBER" if i % 3 == 0 else None
+
+            fragment_keys = [
+                make_template_fragment_key("event_card", [event.id, event.version])
+                for event in events
+            ]
+
+            request = RequestFactory().get("/events/")
+            request.user = creator
+            context = {"events": events, "tags": tags, "selected_sort": "upcoming"}
+
+            def render():
+                began = time.perf_counter()
+                render_to_string("events/events_list.html", context, request=request)
+                return (time.perf_counter() - began) * 1000
+
+            cold = []
+            for _ in range(runs):
+                cache.delete_many(fragment_keys)
+                cold.append(render())
+
+            render()
+            warm = [render() for _ in range(runs)]
+
+            for label, samples in [("before (cold cards)", cold), ("after (warm cards)", warm)]:
+                self.stdout.write(
+                    f"{label}: p50={statistics.median(samples):.2f} ms "
+                    f"p95={p95(samples):.2f} ms over {runs} renders of {n_cards} cards"
+                )
+        finally:
+            cache.delete_many(fragment_keys)
+            Event.objects.filter(created_by=creator).delete()
+            Tag.objects.filter(pk__in=[tag.pk for tag in tags]).delete()
+            creator.delete()
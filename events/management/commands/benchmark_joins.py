@@ -0,0 +1,106 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from events.models import FULL, JOINED, Event, EventRegistration, register_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Flash-crowd benchmark for register_user(): N threads join one "
+        "capped event, then report joins/sec and check for overbooking. "
+        "Runs against a throwaway copy of the schema (the TEST database), "
+        "in WAL mode on SQLite; the real database is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--capacity", type=int, default=500)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        n_users = options["users"]
+        n_threads = options["threads"]
+        capacity = options["capacity"]
+
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                mode = cursor.fetchone()[0]
+            self.stdout.write(f"SQLite journal_mode={mode}")
+
+        creator = User.objects.create_user("bench_creator")
+        users = User.objects.bulk_create(
+            [User(username=f"bench_user_{i}") for i in range(n_users)]
+        )
+
+        start = timezone.localtime() + timedelta(days=1)
+        event = Event.objects.create(
+            title="Join benchmark",
+            interest="Benchmark",
+            location="Nowhere",
+            date=start.date(),
+            start_time=start.time().replace(microsecond=0),
+            max_participants=capacity,
+            created_by=creator,
+        )
+
+        results = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(n_threads + 1)
+
+        def worker(chunk):
+            local = []
+            try:
+                barrier.wait()
+                for user in chunk:
+                    local.append(register_user(event, user))
+            finally:
+                connection.close()
+                with lock:
+                    results.extend(local)
+
+        threads = [
+            threading.Thread(target=worker, args=(users[i::n_threads],))
+            for i in range(n_threads)
+        ]
+
+        for t in threads:
+            t.start()
+
+        barrier.wait()
+        began = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - began
+
+        event.refresh_from_db()
+        rows = EventRegistration.objects.filter(event=event).count()
+
+        self.stdout.write(
+            f"{len(results)} join attempts in {elapsed:.2f}s "
+            f"→ {len(results) / elapsed:.0f} attempts/sec "
+            f"({results.count(JOINED)} joined, {results.count(FULL)} full)"
+        )
+        self.stdout.write(
+            f"capacity={capacity} rows={rows} registration_count={event.registration_count}"
+        )
+
+        if rows > capacity or rows != event.registration_count:
+            self.stderr.write(self.style.ERROR("OVERBOOKED / COUNT DRIFT"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No overbooking."))
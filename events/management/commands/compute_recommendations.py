@@ -0,0 +1,33 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from events.recommendations import TOP_K, USER_BATCH_SIZE, compute_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-user top-K 'recommended for you' table from "
+        "favourite tags and registration history. Run periodically "
+        "(e.g. hourly from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=TOP_K)
+        parser.add_argument("--batch-size", type=int, default=USER_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        began = time.perf_counter()
+        user_ids = list(
+            User.objects.filter(is_active=True).order_by("id").values_list("id", flat=True)
+        )
+
+        written = compute_recommendations(
+            user_ids, top_k=options["top_k"], batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            f"{written} recommendation(s) for {len(user_ids)} user(s) "
+            f"in {time.perf_counter() - began:.1f}s"
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from events.search import SEARCH_INDEXES, fts_enabled
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 search tables (events, communities) from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tables",
+            nargs="*",
+            help=f"Only rebuild these tables (default: all of {', '.join(sorted(SEARCH_INDEXES))}).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError("Full-text search needs SQLite with FTS5.")
+
+        tables = options["tables"] or sorted(SEARCH_INDEXES)
+        unknown = set(tables) - set(SEARCH_INDEXES)
+        if unknown:
+            raise CommandError(f"Unknown search table(s): {', '.join(sorted(unknown))}")
+
+        for table in tables:
+            with transaction.atomic():
+                total = SEARCH_INDEXES[table].rebuild(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{table}: indexed {total} row(s)."))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from events.models import Event, EventRegistration, with_new_version
+from events.page_cache import bump_on_commit
+
+
+def actual_registration_counts():
+    """Correlated COUNT(*) of EventRegistration rows per Event."""
+    counts = (
+        EventRegistration.objects
+        .filter(event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = "Rebuild Event.registration_count from the EventRegistration table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report events whose stored count has drifted.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Event.objects
+            .annotate(actual=actual_registration_counts())
+            .exclude(registration_count=F("actual"))
+        )
+
+        with transaction.atomic():
+            if options["dry_run"]:
+                drift_count = drifted.count()
+                for event_id, stored, actual in drifted.values_list(
+                    "id", "registration_count", "actual"
+                )[:50]:
+                    self.stdout.write(f"event {event_id}: stored={stored} actual={actual}")
+                self.stdout.write(f"{drift_count} event(s) out of sync.")
+                return
+
+            drifted_ids = list(drifted.values_list("id", flat=True))
+
+            # One UPDATE for the whole table, no rows pulled into Python
+            Event.objects.update(registration_count=actual_registration_counts())
+
+            if drifted_ids:
+                Event.objects.filter(pk__in=drifted_ids).update(**with_new_version())
+                bump_on_commit("events", *(f"event:{pk}" for pk in drifted_ids))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt registration counts ({len(drifted_ids)} event(s) were out of sync).")
+        )
@@ -0,0 +1,79 @@
+import heapq
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from events.lifecycle import advance_lifecycles, upcoming_boundaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep Event.event_state current: sweep overdue transitions on "
+        "startup, then sleep until the next start/end boundary on a "
+        "min-heap and flip every due event in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Sweep overdue transitions and exit (e.g. from cron).",
+        )
+        parser.add_argument(
+            "--horizon",
+            type=int,
+            default=3600,
+            help="Seconds of upcoming boundaries to keep on the heap.",
+        )
+        parser.add_argument(
+            "--refresh",
+            type=int,
+            default=30,
+            help="Reload the heap this often (seconds) to pick up new or edited events.",
+        )
+
+    def sweep(self):
+        transitions = advance_lifecycles()
+        for event_id, old_state, new_state in transitions:
+            self.stdout.write(f"event {event_id}: {old_state} -> {new_state}")
+        return transitions
+
+    def handle(self, *args, **options):
+        horizon = timedelta(seconds=options["horizon"])
+        refresh = timedelta(seconds=options["refresh"])
+
+        # 🩹 Catch up on everything that came due while we were down
+        recovered = self.sweep()
+        self.stdout.write(f"Startup sweep: {len(recovered)} overdue transition(s).")
+
+        if options["once"]:
+            return
+
+        heap = []
+        reload_at = timezone.now()
+
+        while True:
+            now = timezone.now()
+
+            if now >= reload_at:
+                close_old_connections()
+                heap = upcoming_boundaries(now, now + horizon)
+                reload_at = now + refresh
+
+            wake_at = min(heap[0], reload_at) if heap else reload_at
+            delay = (wake_at - timezone.now()).total_seconds()
+            if delay > 0:
+                # COMPLETED is "end_at < now", so land just past the boundary
+                time.sleep(delay + 0.01)
+
+            now = timezone.now()
+            due = False
+            while heap and heap[0] <= now:
+                heapq.heappop(heap)
+                due = True
+
+            if due:
+                self.sweep()
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:20
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def event_bounds(date, start_time, end_time):
+    # Frozen copy of events.models.event_bounds as of this migration
+    tz = timezone.get_default_timezone()
+
+    start_at = timezone.make_aware(datetime.combine(date, start_time), tz)
+
+    end_at = None
+    if end_time:
+        end_at = timezone.make_aware(datetime.combine(date, end_time), tz)
+
+    return start_at, end_at
+
+
+def fill_event_bounds(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+
+    batch = []
+    for event in Event.objects.only('id', 'date', 'start_time', 'end_time').iterator(chunk_size=2000):
+        event.start_at, event.end_at = event_bounds(
+            event.date, event.start_time, event.end_time
+        )
+        batch.append(event)
+
+        if len(batch) >= 2000:
+            Event.objects.bulk_update(batch, ['start_at', 'end_at'])
+            batch = []
+
+    if batch:
+        Event.objects.bulk_update(batch, ['start_at', 'end_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_alter_event_id_alter_eventannouncement_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='end_at',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='start_at',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_event_bounds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_registration_counts(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+
+    counts = (
+        EventRegistration.objects
+        .filter(event=OuterRef('pk'))
+        .order_by()
+        .values('event')
+        .annotate(c=Count('id'))
+        .values('c')
+    )
+    Event.objects.update(registration_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_event_start_at_event_end_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='registration_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['registration_count', 'id'], name='event_popular_idx'),
+        ),
+        migrations.RunPython(fill_registration_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def dedupe_registrations(apps, schema_editor):
+    """
+    Keep the oldest row of every duplicated (user, event) pair, then
+    recount the affected events.
+    """
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+
+    duplicates = (
+        EventRegistration.objects
+        .values('user_id', 'event_id')
+        .annotate(keep_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+    )
+
+    event_ids = set()
+    for row in duplicates.iterator():
+        EventRegistration.objects.filter(
+            user_id=row['user_id'],
+            event_id=row['event_id'],
+        ).exclude(id=row['keep_id']).delete()
+        event_ids.add(row['event_id'])
+
+    if event_ids:
+        counts = (
+            EventRegistration.objects
+            .filter(event=OuterRef('pk'))
+            .order_by()
+            .values('event')
+            .annotate(c=Count('id'))
+            .values('c')
+        )
+        Event.objects.filter(id__in=event_ids).update(
+            registration_count=Coalesce(Subquery(counts), 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_event_registration_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_registrations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='eventregistration',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_event_registration'),
+        ),
+    ]
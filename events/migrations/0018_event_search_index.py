@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+def create_event_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    Event = apps.get_model('events', 'Event')
+
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS events_event_fts USING fts5("
+        "title, interest, description, location, tags, "
+        "tokenize='porter unicode61 remove_diacritics 2')"
+    )
+
+    tag_names = {}
+    for event_id, name in Event.tags.through.objects.values_list('event_id', 'tag__name'):
+        tag_names.setdefault(event_id, []).append(name)
+
+    rows = [
+        (e.id, e.title, e.interest, e.description, e.location, ' '.join(tag_names.get(e.id, [])))
+        for e in Event.objects.only('id', 'title', 'interest', 'description', 'location').iterator()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO events_event_fts (rowid, title, interest, description, location, tags) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_event_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS events_event_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0017_eventwaitlistentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_event_fts, drop_event_fts),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0018_event_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'start_time'], name='event_date_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventannouncement',
+            index=models.Index(fields=['event', 'created_at'], name='announcement_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['event', 'user'], name='registration_event_user_idx'),
+        ),
+    ]
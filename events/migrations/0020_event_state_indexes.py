@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def fill_event_state(apps, schema_editor):
+    # Until now only CANCELLED was stored; derive the rest from the clock
+    Event = apps.get_model('events', 'Event')
+    now = timezone.now()
+
+    pending = Event.objects.exclude(event_state='CANCELLED')
+    pending.filter(end_at__lt=now).update(event_state='COMPLETED')
+    pending.filter(start_at__gt=now).update(event_state='UPCOMING')
+    pending.filter(start_at__lte=now).filter(
+        Q(end_at__isnull=True) | Q(end_at__gte=now)
+    ).update(event_state='ONGOING')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0019_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_event_state, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_state', 'start_at'], name='event_state_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_state', 'end_at'], name='event_state_end_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0021_card_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventannouncement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='eventannouncement',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def number_waitlists(apps, schema_editor):
+    EventWaitlistEntry = apps.get_model('events', 'EventWaitlistEntry')
+
+    # Each entry's rank in its event's queue (runs once)
+    ranks = (
+        EventWaitlistEntry.objects
+        .filter(event=OuterRef('event'), id__lte=OuterRef('pk'))
+        .order_by()
+        .values('event')
+        .annotate(c=Count('id'))
+        .values('c')
+    )
+    EventWaitlistEntry.objects.update(ticket=Subquery(ranks))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0023_recommendations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventwaitlistentry',
+            name='ticket',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='eventwaitlistentry',
+            index=models.Index(fields=['event', 'ticket'], name='event_waitlist_ticket_idx'),
+        ),
+        migrations.RunPython(number_waitlists, migrations.RunPython.noop),
+    ]
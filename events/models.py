@@ -1,5 +1,49 @@
-from django.db import models
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case, Exists, F, Min, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.core.exceptions import BadRequest
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .page_cache import bump_on_commit
+
+
+def with_new_version(**fields):
+    """UPDATE kwargs that also bump a VersionedModel's card version."""
+    return {**fields, "version": F("version") + 1, "updated_at": timezone.now()}
+
+
+class VersionedModel(models.Model):
+    """
+    `version` goes up on every change that shows on the row's list card:
+    the row itself (save()), its tags and its counters (bulk UPDATEs go
+    through with_new_version()). Card fragments are cached per version.
+    """
+
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        bump = not self._state.adding
+        if bump:
+            self.version = F("version") + 1
+
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version", "updated_at"}
+
+        super().save(*args, **kwargs)
+
+        if bump:
+            self.refresh_from_db(fields=["version"])
 
 
 class Tag(models.Model):
@@ -9,7 +53,208 @@ class Tag(models.Model):
         return self.name
 
 
-class Event(models.Model):
+class InvalidTag(BadRequest):
+    """A ?tag= filter that is not a tag id. Django answers with a 400."""
+
+
+def tag_id_param(value):
+    """The ?tag= filter as an int id, None when it is absent."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidTag(f"tag must be an integer id, not {value!r}") from None
+
+
+def event_bounds(date, start_time, end_time):
+    """
+    Turn the local (date, start_time, end_time) triple into aware
+    start/end datetimes. end is None when the event has no end time.
+    """
+    tz = timezone.get_default_timezone()
+
+    start_at = timezone.make_aware(datetime.combine(date, start_time), tz)
+
+    end_at = None
+    if end_time:
+        end_at = timezone.make_aware(datetime.combine(date, end_time), tz)
+
+    return start_at, end_at
+
+
+def lifecycle_state_at(start_at, end_at, now=None):
+    """
+    The clock-driven event_state for these bounds (never CANCELLED).
+    save() stores it; run_lifecycle_scheduler moves it forward.
+    """
+    now = now or timezone.now()
+
+    if end_at and now > end_at:
+        return "COMPLETED"
+    if now < start_at:
+        return "UPCOMING"
+    return "ONGOING"
+
+
+LIFECYCLE_STATES = ("UPCOMING", "ONGOING", "COMPLETED", "CANCELLED")
+
+
+def lifecycle_q(lifecycle, now=None, prefix=""):
+    """
+    Q for events in `lifecycle` ("upcoming", ...) at `now`, by the time
+    rules of lifecycle_state_at(): a stored UPCOMING/ONGOING is not
+    trusted, so the answer stays right while run_lifecycle_scheduler is
+    stopped or behind. `prefix` reaches the event through a relation
+    ("event__"). Rows without start_at keep their stored state.
+    """
+    now = now or timezone.now()
+    state = lifecycle.upper()
+
+    def q(**lookups):
+        return Q(**{f"{prefix}{name}": value for name, value in lookups.items()})
+
+    if state == "CANCELLED":
+        return q(event_state="CANCELLED")
+
+    not_ended = q(end_at__isnull=True) | q(end_at__gte=now)
+    by_time = {
+        "COMPLETED": q(end_at__lt=now),
+        "UPCOMING": q(start_at__gt=now) & not_ended,
+        "ONGOING": q(start_at__lte=now) & not_ended,
+    }[state]
+
+    return ~q(event_state="CANCELLED") & (
+        by_time | q(start_at__isnull=True, event_state=state)
+    )
+
+
+class EventQuerySet(models.QuerySet):
+    """
+    Lifecycle + visibility rules expressed in SQL, so list pages only
+    load the rows they are going to show.
+
+    The lifecycle follows compute_event_lifecycle():
+    1. CANCELLED always wins (the stored event_state)
+    2. COMPLETED once end_at has passed
+    3. UPCOMING / ONGOING by start_at
+    The stored UPCOMING / ONGOING / COMPLETED only count for rows without
+    start_at, so a stopped or late lifecycle scheduler never leaves an
+    event looking upcoming after it has started.
+    """
+
+    def with_lifecycle(self, now=None):
+        now = now or timezone.now()
+
+        return self.annotate(
+            lifecycle=Case(
+                When(event_state="CANCELLED", then=Value("cancelled")),
+                *(
+                    When(start_at__isnull=True, event_state=state, then=Value(state.lower()))
+                    for state in LIFECYCLE_STATES
+                ),
+                When(end_at__lt=now, then=Value("completed")),
+                When(start_at__gt=now, then=Value("upcoming")),
+                default=Value("ongoing"),
+                output_field=models.CharField(),
+            )
+        )
+
+    def for_lifecycle(self, lifecycle, now=None):
+        if lifecycle.upper() in LIFECYCLE_STATES:
+            return self.filter(lifecycle_q(lifecycle, now))
+
+        return self
+
+    def involving(self, user):
+        """Events `user` created or is registered for."""
+        return self.filter(
+            Q(created_by=user)
+            | Q(pk__in=EventRegistration.objects.filter(user=user).values("event_id"))
+        )
+
+    def with_role(self, user):
+        """
+        Annotate `status` for `user`: "CREATOR", "MEMBER" or None, plus
+        `is_member` (registered, creators included). One indexed
+        EXISTS per row instead of a lookup per card.
+        """
+        return self.annotate(
+            is_member=Exists(
+                EventRegistration.objects.filter(event=OuterRef("pk"), user=user)
+            ),
+            status=Case(
+                When(created_by=user, then=Value("CREATOR")),
+                When(is_member=True, then=Value("MEMBER")),
+                default=Value(None),
+                output_field=models.CharField(null=True),
+            ),
+        )
+
+    def visible(self, settings=None, now=None):
+        """
+        Public list visibility:
+        - upcoming / ongoing are always visible
+        - completed stay visible for hide_completed_after_days after end_at
+        - cancelled stay visible for hide_cancelled_after_days after start_at
+        (0 days → hidden straight away)
+        """
+        now = now or timezone.now()
+        hide_completed_days = settings.hide_completed_after_days if settings else 0
+        hide_cancelled_days = settings.hide_cancelled_after_days if settings else 0
+
+        if hide_completed_days:
+            end_cutoff = now - timedelta(days=hide_completed_days)
+        else:
+            end_cutoff = now
+
+        active = ~Q(event_state="CANCELLED") & (
+            Q(end_at__isnull=True) | Q(end_at__gte=end_cutoff)
+        )
+
+        if hide_cancelled_days:
+            active |= Q(
+                event_state="CANCELLED",
+                start_at__gte=now - timedelta(days=hide_cancelled_days),
+            )
+
+        return self.filter(active)
+
+    def next_transition(self, settings=None, now=None):
+        """
+        The next moment anything in this queryset changes lifecycle
+        (start_at / end_at) or drops out of the visible() window.
+        Each candidate is one MIN() over an indexed range. None when
+        nothing is scheduled.
+        """
+        now = now or timezone.now()
+        hide_completed_days = settings.hide_completed_after_days if settings else 0
+        hide_cancelled_days = settings.hide_cancelled_after_days if settings else 0
+
+        candidates = [
+            self.filter(start_at__gt=now).aggregate(t=Min("start_at"))["t"],
+            self.filter(end_at__gt=now).aggregate(t=Min("end_at"))["t"],
+        ]
+
+        if hide_completed_days:
+            window = timedelta(days=hide_completed_days)
+            oldest = self.filter(
+                end_at__gt=now - window, end_at__lte=now
+            ).aggregate(t=Min("end_at"))["t"]
+            candidates.append(oldest and oldest + window)
+
+        if hide_cancelled_days:
+            window = timedelta(days=hide_cancelled_days)
+            oldest = self.filter(
+                event_state="CANCELLED", start_at__gt=now - window
+            ).aggregate(t=Min("start_at"))["t"]
+            candidates.append(oldest and oldest + window)
+
+        candidates = [t for t in candidates if t]
+        return min(candidates) if candidates else None
+
+
+class Event(VersionedModel):
     EVENT_STATES = [
         ('UPCOMING', 'Upcoming'),
         ('ONGOING', 'Ongoing'),
@@ -46,6 +291,10 @@ class Event(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField(null=True, blank=True)
 
+    # Aware copies of date + start/end time, kept in sync by save()
+    start_at = models.DateTimeField(null=True, editable=False, db_index=True)
+    end_at = models.DateTimeField(null=True, editable=False, db_index=True)
+
     max_participants = models.PositiveIntegerField(
         null=True,
         blank=True,
@@ -54,7 +303,15 @@ class Event(models.Model):
 
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    # Denormalized EventRegistration count — kept by the post_save/post_delete
+    # receivers in events/signals.py (views, admin, cascades), plus
+    # adjust_registration_count() for bulk_create; reconcile_registration_counts
+    # repairs drift
+    registration_count = models.PositiveIntegerField(default=0, editable=False)
+
     # ✅ Phase 3.3 — Cancellation support
+    # UPCOMING / ONGOING / COMPLETED are written by save() and then
+    # advanced by run_lifecycle_scheduler; CANCELLED is set by hand
     event_state = models.CharField(
         max_length=20,
         default="",
@@ -66,19 +323,278 @@ class Event(models.Model):
         blank=True
     )
 
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # "Most popular" sort: ORDER BY registration_count DESC, id DESC
+            models.Index(
+                fields=["registration_count", "id"],
+                name="event_popular_idx",
+            ),
+            models.Index(
+                fields=["date", "start_time"],
+                name="event_date_start_idx",
+            ),
+            # Lifecycle filter + scheduler sweeps (UPCOMING by start_at,
+            # UPCOMING/ONGOING by end_at)
+            models.Index(
+                fields=["event_state", "start_at"],
+                name="event_state_start_idx",
+            ),
+            models.Index(
+                fields=["event_state", "end_at"],
+                name="event_state_end_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Accept strings too (fixtures, shell), like Django itself does
+        for name in ("date", "start_time", "end_time"):
+            field = self._meta.get_field(name)
+            setattr(self, name, field.to_python(getattr(self, name)))
+
+        self.start_at, self.end_at = event_bounds(
+            self.date, self.start_time, self.end_time
+        )
+
+        if self.event_state != "CANCELLED":
+            self.event_state = lifecycle_state_at(self.start_at, self.end_at)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields, "start_at", "end_at", "event_state"
+            }
+
+        super().save(*args, **kwargs)
+
+
+def adjust_registration_count(event_id, delta):
+    """
+    Atomically shift Event.registration_count by `delta` in SQL
+    (UPDATE ... SET registration_count = registration_count + delta).
+    Call it inside the same transaction that adds/removes registrations.
+    """
+    if delta:
+        Event.objects.filter(pk=event_id).update(**with_new_version(
+            registration_count=F("registration_count") + delta
+        ))
+
+
+def over_capacity(event_id):
+    """
+    True when the event holds more registrations than seats. Checked
+    right after the insert's counter UPDATE in the same transaction: that
+    UPDATE holds the row/DB write lock until commit, so no concurrent
+    join can slip in between the increment and this check.
+    """
+    return Event.objects.filter(
+        pk=event_id,
+        max_participants__gt=0,  # NULL / 0 have always meant "no limit"
+        registration_count__gt=F("max_participants"),
+    ).exists()
+
+
+class EventFull(Exception):
+    pass
+
+
+# register_user() outcomes
+JOINED = "joined"
+ALREADY_JOINED = "already_joined"
+FULL = "full"
+
+
+def register_user(event, user):
+    """
+    Race-free join: insert the registration (the unique (user, event)
+    constraint rejects duplicates; post_save bumps registration_count)
+    and check capacity in one transaction. If that took a seat that was
+    not there, the whole transaction rolls back.
+    """
+    try:
+        with transaction.atomic():
+            EventRegistration.objects.create(user=user, event=event)
+
+            # Freed seats belong to the waitlist, not to whoever clicks first
+            if event.max_participants and EventWaitlistEntry.objects.filter(
+                event_id=event.pk
+            ).exists():
+                raise EventFull
+
+            if over_capacity(event.pk):
+                raise EventFull
+    except IntegrityError:
+        return ALREADY_JOINED
+    except EventFull:
+        return FULL
+
+    return JOINED
+
 
 class EventRegistration(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "event"],
+                name="unique_event_registration",
+            ),
+        ]
+        indexes = [
+            # "Who is registered for this event" without touching the table
+            models.Index(fields=["event", "user"], name="registration_event_user_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} joined {self.event.title}"
 
 
-class EventAnnouncement(models.Model):
+class EventWaitlistEntry(models.Model):
+    """
+    FIFO waitlist for capped events. Queue order is the (event, id) index,
+    so enqueue/dequeue are single index inserts/deletes and the head of
+    the queue is an index seek.
+
+    `ticket` numbers each event's queue densely in that same order, so a
+    place in the queue is the ticket minus the head's ticket: two index
+    seeks however long the queue is (see waitlist_position()). Promotion
+    takes entries off the head and renumbers nothing; leaving from the
+    middle moves the entries ahead up one ticket (signals.py).
+    """
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="waitlist"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    ticket = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "user"],
+                name="unique_event_waitlist_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["event", "id"], name="event_waitlist_queue_idx"),
+            models.Index(fields=["event", "ticket"], name="event_waitlist_ticket_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} waiting for {self.event.title}"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding:
+            # Next ticket, computed inside the INSERT itself
+            last = EventWaitlistEntry.objects.filter(
+                event_id=self.event_id
+            ).order_by("-ticket").values("ticket")[:1]
+            self.ticket = Coalesce(Subquery(last), 0) + 1
+
+        super().save(*args, **kwargs)
+
+        if adding:
+            self.refresh_from_db(fields=["ticket"])
+
+    @property
+    def position(self):
+        """1-based place in the queue; one query per access, read it once."""
+        return waitlist_position(self.pk).first()
+
+
+def waitlist_position(entry_id):
+    """
+    The 1-based queue position of waitlist entry `entry_id`, as a
+    one-value queryset (.first() / .afirst()): its ticket minus the
+    head ticket of its event, each an index seek.
+    """
+    head = EventWaitlistEntry.objects.filter(
+        event_id=OuterRef("event_id")
+    ).order_by("ticket").values("ticket")[:1]
+
+    return EventWaitlistEntry.objects.filter(pk=entry_id).values_list(
+        F("ticket") - Subquery(head) + 1, flat=True
+    )
+
+
+def join_waitlist(event, user):
+    """Queue `user` for `event` (idempotent). Returns the entry."""
+    try:
+        with transaction.atomic():
+            # Joiners of one event take tickets one at a time
+            Event.objects.select_for_update().filter(pk=event.pk).first()
+            return EventWaitlistEntry.objects.create(event=event, user=user)
+    except IntegrityError:
+        return EventWaitlistEntry.objects.get(event=event, user=user)
+
+
+# bulk_create sends no post_save, so promote_waitlist() announces the
+# new registrations itself: sender=Event, event_id, user_ids
+waitlist_promoted = Signal()
+
+
+def promote_waitlist(event_id):
+    """
+    Fill every free seat from the head of the waitlist in ONE transaction:
+    one bulk INSERT of registrations, one DELETE of the promoted entries
+    and one counter UPDATE, however many seats were freed. (The entries'
+    post_delete gap closing has no one ahead of the head to move.)
+    Returns the promoted user ids.
+    """
+    with transaction.atomic():
+        event = (
+            Event.objects
+            .select_for_update()
+            .filter(pk=event_id)
+            .first()
+        )
+        if event is None or event.event_state in ("CANCELLED", "COMPLETED"):
+            return []
+        if event.end_at and event.end_at < timezone.now():
+            return []
+
+        queue = EventWaitlistEntry.objects.filter(event_id=event_id).order_by("id")
+
+        if event.max_participants:
+            free = event.max_participants - event.registration_count
+            if free <= 0:
+                return []
+            queue = queue[:free]
+
+        head = list(queue.values_list("id", "user_id"))
+        if not head:
+            return []
+
+        entry_ids = [entry_id for entry_id, _ in head]
+        user_ids = [user_id for _, user_id in head]
+
+        EventRegistration.objects.bulk_create([
+            EventRegistration(event_id=event_id, user_id=user_id)
+            for user_id in user_ids
+        ])
+        EventWaitlistEntry.objects.filter(id__in=entry_ids).delete()
+        # bulk_create sends no post_save, so count the new rows here
+        adjust_registration_count(event_id, len(user_ids))
+
+        # bulk_create sends no post_save, so invalidate cached pages here
+        bump_on_commit("events", f"event:{event_id}")
+        waitlist_promoted.send(sender=Event, event_id=event_id, user_ids=user_ids)
+
+    return user_ids
+
+
+class EventAnnouncement(VersionedModel):
     event = models.ForeignKey(
         Event,
         on_delete=models.CASCADE,
@@ -88,6 +604,12 @@ class EventAnnouncement(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # event_detail timeline: WHERE event_id = ? ORDER BY created_at DESC
+            models.Index(fields=["event", "created_at"], name="announcement_timeline_idx"),
+        ]
+
     def __str__(self):
         return f"Announcement for {self.event.title}"
 
@@ -109,3 +631,24 @@ class EventVisibilitySettings(models.Model):
     class Meta:
         verbose_name = "Event Visibility Settings"
         verbose_name_plural = "Event Visibility Settings"
+
+
+class EventRecommendation(models.Model):
+    """
+    Precomputed "recommended for you" feed: the top-K upcoming events per
+    user, rebuilt by `manage.py compute_recommendations` (see
+    recommendations.py). Serving is one (user, rank) index range read.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recommendations")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "rank"], name="unique_recommendation_rank"),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} for {self.user}: {self.event_id}"
@@ -0,0 +1,169 @@
+"""
+Full-page cache for anonymous visitors.
+
+Every anonymous visitor sees the same /events/, /events/<id>/,
+/communities/ and /communities/<id>/ pages, so those responses are
+cached (Django cache framework) under:
+
+    path + normalized query string + the generation of every scope the
+    page depends on ("events", "event:42", "tags", ...)
+
+Writes bump the generation of the scopes they touch (see signals.py in
+both apps), which orphans exactly the affected pages. Generations and
+pages live in the "shared" cache (settings.CACHES), never a per-process
+one, so a bump from any web worker or from run_lifecycle_scheduler
+reaches every worker; checks.py refuses a process-local backend. The
+TTL also stops at the next lifecycle transition, so even without the
+scheduler's bump a page never shows an event as "upcoming" after it
+has started.
+"""
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+
+PAGE_CACHE_MAX_TTL = 300  # seconds
+
+# Must be shared across processes (see checks.py)
+PAGE_CACHE_ALIAS = "shared"
+cache = ConnectionProxy(caches, PAGE_CACHE_ALIAS)
+
+GENERATION_PREFIX = "pagecache:gen:"
+PAGE_PREFIX = "pagecache:page:"
+
+
+def generation(scope):
+    key = GENERATION_PREFIX + scope
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, 1, timeout=None)
+        value = cache.get(key, 1)
+    return value
+
+
+def bump(*scopes):
+    for scope in scopes:
+        key = GENERATION_PREFIX + scope
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def bump_on_commit(*scopes):
+    """Invalidate once the write is visible, so no stale page is re-cached."""
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def normalized_query(request):
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+        if value
+    )
+    return urlencode(params)
+
+
+def seconds_until(moment, now=None):
+    if moment is None:
+        return PAGE_CACHE_MAX_TTL
+    now = now or timezone.now()
+    return min(PAGE_CACHE_MAX_TTL, int((moment - now).total_seconds()))
+
+
+def _has_pending_messages(request):
+    if request.COOKIES.get("messages"):
+        return True
+    session = getattr(request, "session", None)
+    return bool(session and session.get("_messages"))
+
+
+def _page_key(request, scopes, kwargs):
+    names = scopes(request, **kwargs)
+    stamp = ",".join(f"{name}={generation(name)}" for name in names)
+    raw_key = f"{request.path}?{normalized_query(request)}|{stamp}"
+    return PAGE_PREFIX + hashlib.sha1(raw_key.encode()).hexdigest()
+
+
+def _cacheable(response):
+    return response.status_code == 200 and not response.cookies
+
+
+def cache_anonymous_page(scopes, ttl=None):
+    """
+    scopes(request, **view_kwargs) -> scope names the page depends on
+    ttl(request, **view_kwargs)    -> seconds to keep it (default max)
+
+    Works on sync and async views alike.
+    """
+
+    def timeout_for(request, kwargs):
+        return ttl(request, **kwargs) if ttl else PAGE_CACHE_MAX_TTL
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if (
+                    request.method != "GET"
+                    or user.is_authenticated
+                    or await sync_to_async(_has_pending_messages)(request)
+                ):
+                    return await view(request, *args, **kwargs)
+
+                key = await sync_to_async(_page_key)(request, scopes, kwargs)
+
+                response = await cache.aget(key)
+                if response is not None:
+                    response["X-Page-Cache"] = "hit"
+                    return response
+
+                response = await view(request, *args, **kwargs)
+
+                if _cacheable(response):
+                    timeout = await sync_to_async(timeout_for)(request, kwargs)
+                    if timeout > 0:
+                        await cache.aset(key, response, timeout)
+                    response["X-Page-Cache"] = "miss"
+
+                return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method != "GET"
+                or request.user.is_authenticated
+                or _has_pending_messages(request)
+            ):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, scopes, kwargs)
+
+            response = cache.get(key)
+            if response is not None:
+                response["X-Page-Cache"] = "hit"
+                return response
+
+            response = view(request, *args, **kwargs)
+
+            if _cacheable(response):
+                timeout = timeout_for(request, kwargs)
+                if timeout > 0:
+                    cache.set(key, response, timeout)
+                response["X-Page-Cache"] = "miss"
+
+            return response
+
+        return wrapper
+
+    return decorator
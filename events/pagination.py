@@ -0,0 +1,215 @@
+from datetime import date, datetime
+
+from django.core import signing
+from django.core.exceptions import BadRequest
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+CURSOR_SALT = "events.cursor"
+
+
+class InvalidCursor(BadRequest):
+    """
+    A cursor that is tampered, stale or minted for another listing.
+    Views that let it propagate answer 400; falling back to page 1 would
+    make "Next" silently start over.
+    """
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset.
+
+    next_cursor / prev_cursor are opaque signed strings (None when there
+    is nothing in that direction).
+    """
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_cursor or self.prev_cursor)
+
+
+def _encode_value(value):
+    # Tagged, so a plain string key is never mistaken for a datetime
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, dict) and len(value) == 1:
+        (tag, text), = value.items()
+        parse = {"dt": parse_datetime, "d": parse_date}.get(tag)
+        try:
+            parsed = parse(text) if parse and isinstance(text, str) else None
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            return parsed
+
+    raise InvalidCursor("Malformed pagination cursor.")
+
+
+def _row_value(row, name):
+    # Model instances, or dicts from a .values() queryset
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def encode_cursor(key, row, ordering, direction):
+    values = [
+        _encode_value(_row_value(row, field.lstrip("-")))
+        for field in ordering
+    ]
+    return signing.dumps(
+        {"k": key, "v": values, "d": direction},
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(cursor, key, ordering):
+    """
+    Returns (values, direction), or (None, None) when there is no
+    cursor. Raises InvalidCursor for a tampered or stale cursor, or one
+    minted for a different listing or sort order.
+    """
+    if not cursor:
+        return None, None
+
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidCursor("Invalid pagination cursor.")
+
+    if not isinstance(data, dict) or data.get("k") != key:
+        raise InvalidCursor("This cursor belongs to a different listing or sort order.")
+
+    values, direction = data.get("v"), data.get("d")
+    if not isinstance(values, list) or len(values) != len(ordering) or direction not in ("n", "p"):
+        raise InvalidCursor("Malformed pagination cursor.")
+
+    return [_decode_value(v) for v in values], direction
+
+
+def _flip(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def _after(name, descending, value):
+    """
+    Rows strictly after `value` in one column, with NULLs where the
+    database sorts them (first ascending on SQLite/MySQL, last on
+    PostgreSQL/Oracle). None means "no rows".
+    """
+    nulls_after = descending != connection.features.nulls_order_largest
+
+    if value is None:
+        return None if nulls_after else Q(**{f"{name}__isnull": False})
+
+    q = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+    if nulls_after:
+        q |= Q(**{f"{name}__isnull": True})
+    return q
+
+
+def _equal(name, value):
+    return Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+
+
+def keyset_q(ordering, values):
+    """
+    Rows strictly *after* `values` in `ordering`, e.g. for
+    ("start_at", "id"):  start_at > v0 OR (start_at = v0 AND id > v1)
+    NULL keys (e.g. an event without start_at) are compared with
+    IS [NOT] NULL instead of dropping the cursor.
+    """
+    q = Q()
+    for i, field in enumerate(ordering):
+        step = _after(field.lstrip("-"), field.startswith("-"), values[i])
+        if step is None:
+            continue
+
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            step &= _equal(prev_field.lstrip("-"), prev_value)
+
+        q |= step
+    return q
+
+
+def _keyset_plan(qs, ordering, cursor, page_size, key):
+    """
+    The page query plus a function that turns its rows into a
+    KeysetPage. Shared by paginate_keyset() and apaginate_keyset(), which
+    only differ in how they fetch the rows.
+    """
+    ordering = tuple(ordering)
+    # Scoped by model: "my:all" or "api:newest" exist for several models
+    key = f"{qs.model._meta.label_lower}:{key}"
+    values, direction = decode_cursor(cursor, key, ordering)
+
+    if values is None:
+        def finish(rows):
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            return KeysetPage(
+                rows,
+                next_cursor=encode_cursor(key, rows[-1], ordering, "n") if has_more else None,
+            )
+
+        return qs.order_by(*ordering)[:page_size + 1], finish
+
+    if direction == "p":
+        # Walk backwards from the cursor, then flip the page round
+        reverse = tuple(_flip(f) for f in ordering)
+
+        def finish(rows):
+            has_more = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            return KeysetPage(
+                rows,
+                next_cursor=encode_cursor(key, rows[-1], ordering, "n") if rows else None,
+                prev_cursor=encode_cursor(key, rows[0], ordering, "p") if has_more else None,
+            )
+
+        return qs.filter(keyset_q(reverse, values)).order_by(*reverse)[:page_size + 1], finish
+
+    def finish(rows):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(key, rows[-1], ordering, "n") if has_more else None,
+            prev_cursor=encode_cursor(key, rows[0], ordering, "p") if rows else None,
+        )
+
+    return qs.filter(keyset_q(ordering, values)).order_by(*ordering)[:page_size + 1], finish
+
+
+def paginate_keyset(qs, ordering, cursor=None, page_size=20, key=""):
+    """
+    Keyset (seek) pagination: every page is one ordered range scan of
+    `page_size + 1` rows starting at the cursor, however deep you go.
+
+    `ordering` must end in a unique column (normally id) so the order is
+    total and cursors are stable.
+    """
+    query, finish = _keyset_plan(qs, ordering, cursor, page_size, key)
+    return finish(list(query))
+
+
+async def apaginate_keyset(qs, ordering, cursor=None, page_size=20, key=""):
+    """paginate_keyset() for async views (async ORM iteration)."""
+    query, finish = _keyset_plan(qs, ordering, cursor, page_size, key)
+    return finish([row async for row in query])
@@ -0,0 +1,154 @@
+"""
+"Recommended for you": tag-based scoring, precomputed per user.
+
+Each upcoming event is a sparse tag vector (idf weights, L2-normalised).
+Each user is a sparse tag vector built from
+
+    - Profile.favourite_tags                     FAVOURITE_WEIGHT each
+    - tags of every event they registered for    +1 per registration
+
+and an event's score is the cosine of the two. Events the user already
+joined or created are left out.
+
+Scoring walks an inverted index (tag -> [(event_id, weight)]), so a user
+costs only the postings of their own tags, and users with identical
+vectors (same favourites, no history: the common case) share one pass.
+compute_recommendations() works through the users in batches: three
+bulk reads per batch, one delete + bulk_create of the top-K rows.
+
+NumPy/SciPy are not dependencies of this project, so the sparse maths is
+plain dicts; with a few dozen tags per user that is the same work a CSR
+matrix-vector product would do.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.db import transaction
+
+from accounts.models import Profile
+
+from .models import Event, EventRecommendation, EventRegistration, lifecycle_q
+
+
+TOP_K = 20
+FAVOURITE_WEIGHT = 2.0
+USER_BATCH_SIZE = 2000
+# Shared results keep this many extra candidates to absorb per-user
+# exclusions before falling back to a private scoring pass
+EXCLUSION_SLACK = 20
+SHARED_CACHE_SIZE = 50_000
+
+
+def normalise(vector):
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    if not norm:
+        return {}
+    return {key: weight / norm for key, weight in vector.items()}
+
+
+class EventIndex:
+    """Inverted tag index over the events that can be recommended."""
+
+    def __init__(self):
+        event_tags = defaultdict(list)
+        for event_id, tag_id in Event.tags.through.objects.filter(
+            lifecycle_q("upcoming", prefix="event__")
+        ).values_list("event_id", "tag_id"):
+            event_tags[event_id].append(tag_id)
+
+        n_events = len(event_tags)
+        document_frequency = Counter(tag for tags in event_tags.values() for tag in tags)
+        idf = {
+            tag: math.log((1 + n_events) / (1 + count)) + 1
+            for tag, count in document_frequency.items()
+        }
+
+        self.postings = defaultdict(list)
+        for event_id, tags in event_tags.items():
+            for tag, weight in normalise({tag: idf[tag] for tag in tags}).items():
+                self.postings[tag].append((event_id, weight))
+
+        self.event_ids = set(event_tags)
+
+    def top(self, user_vector, k):
+        """[(event_id, score), ...] best first, at most k."""
+        scores = {}
+        get = scores.get
+        # Tags in a fixed order so equal scores always rank the same way
+        for tag, user_weight in sorted(user_vector.items()):
+            for event_id, event_weight in self.postings.get(tag, ()):
+                scores[event_id] = get(event_id, 0.0) + user_weight * event_weight
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+
+def load_users(user_ids, index):
+    """(tag vectors, excluded event ids) for one batch of users."""
+    vectors = defaultdict(lambda: defaultdict(float))
+    excluded = defaultdict(set)
+
+    for user_id, tag_id in Profile.favourite_tags.through.objects.filter(
+        profile__user_id__in=user_ids
+    ).values_list("profile__user_id", "tag_id"):
+        vectors[user_id][tag_id] += FAVOURITE_WEIGHT
+
+    for user_id, event_id, tag_id in EventRegistration.objects.filter(
+        user_id__in=user_ids
+    ).values_list("user_id", "event_id", "event__tags"):
+        if tag_id is not None:
+            vectors[user_id][tag_id] += 1
+        if event_id in index.event_ids:
+            excluded[user_id].add(event_id)
+
+    for user_id, event_id in Event.objects.filter(
+        lifecycle_q("upcoming"), created_by_id__in=user_ids
+    ).values_list("created_by_id", "id"):
+        excluded[user_id].add(event_id)
+
+    return vectors, excluded
+
+
+def recommend(vector, excluded, index, shared, top_k=TOP_K):
+    key = tuple(sorted(vector.items()))
+    candidates = shared.get(key)
+    if candidates is None:
+        if len(shared) >= SHARED_CACHE_SIZE:
+            shared.clear()
+        candidates = shared[key] = index.top(normalise(vector), top_k + EXCLUSION_SLACK)
+
+    picked = [item for item in candidates if item[0] not in excluded][:top_k]
+    if len(picked) < top_k and len(candidates) == top_k + EXCLUSION_SLACK:
+        # More exclusions than slack: score this user on their own
+        candidates = index.top(normalise(vector), top_k + len(excluded))
+        picked = [item for item in candidates if item[0] not in excluded][:top_k]
+    return picked
+
+
+def compute_recommendations(user_ids, top_k=TOP_K, batch_size=USER_BATCH_SIZE):
+    """Rebuild EventRecommendation for `user_ids`; returns rows written."""
+    index = EventIndex()
+    shared = {}
+    written = 0
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        vectors, excluded = load_users(batch, index)
+
+        rows = []
+        for user_id in batch:
+            vector = vectors.get(user_id)
+            if not vector:
+                continue
+            picked = recommend(vector, excluded.get(user_id, ()), index, shared, top_k)
+            rows.extend(
+                EventRecommendation(user_id=user_id, event_id=event_id, rank=rank, score=score)
+                for rank, (event_id, score) in enumerate(picked, start=1)
+            )
+
+        with transaction.atomic():
+            EventRecommendation.objects.filter(user_id__in=batch).delete()
+            EventRecommendation.objects.bulk_create(rows, batch_size=1000)
+        written += len(rows)
+
+    return written
@@ -0,0 +1,261 @@
+"""
+SQLite FTS5 full-text search.
+
+Each searchable model gets a standalone FTS5 table whose rowid is the
+model's pk. The tables are created by migrations, kept in sync by
+signals (see watch(), wired up in events/signals.py and
+communities/signals.py) and can be
+rebuilt with `manage.py rebuild_search_index`.
+
+On databases without FTS5 the helpers fall back to icontains filters.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .models import Event, Tag
+
+
+SEARCH_INDEXES = {}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+def to_match_query(text):
+    """
+    Turn free text into a safe FTS5 query: every word becomes a quoted
+    prefix term, AND-ed together. Returns "" when there is nothing to
+    search for.
+    """
+    tokens = TOKEN_RE.findall(text or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class FTSIndex:
+    """
+    columns: the FTS5 columns, in order. Every column except "tags"
+             is copied from the model field of the same name; "tags"
+             holds the space-joined tag names.
+    weights: BM25 weight per column (higher = more important).
+    """
+
+    def __init__(self, model, table, columns, weights):
+        self.model = model
+        self.table = table
+        self.columns = columns
+        self.weights = weights
+
+    # ---------- writing ----------
+
+    def _tag_names(self, pks):
+        names = defaultdict(list)
+        through = self.model.tags.through
+        fk = f"{self.model._meta.model_name}_id"
+
+        for pk, name in through.objects.filter(
+            **{f"{fk}__in": pks}
+        ).values_list(fk, "tag__name"):
+            names[pk].append(name)
+
+        return names
+
+    def _rows(self, objs):
+        tags = self._tag_names([obj.pk for obj in objs])
+        for obj in objs:
+            values = []
+            for column in self.columns:
+                if column == "tags":
+                    values.append(" ".join(tags.get(obj.pk, [])))
+                else:
+                    values.append(getattr(obj, column) or "")
+            yield [obj.pk, *values]
+
+    def _insert(self, cursor, objs):
+        placeholders = ", ".join(["%s"] * (len(self.columns) + 1))
+        cursor.executemany(
+            f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) "
+            f"VALUES ({placeholders})",
+            list(self._rows(objs)),
+        )
+
+    def update(self, objs):
+        if not fts_enabled() or not objs:
+            return
+
+        with connection.cursor() as cursor:
+            self._delete(cursor, [obj.pk for obj in objs])
+            self._insert(cursor, objs)
+
+    def _delete(self, cursor, pks):
+        cursor.execute(
+            f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(pks))})",
+            list(pks),
+        )
+
+    def delete(self, pks):
+        if not fts_enabled() or not pks:
+            return
+
+        with connection.cursor() as cursor:
+            self._delete(cursor, pks)
+
+    def rebuild(self, batch_size=1000):
+        if not fts_enabled():
+            return 0
+
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+            batch = []
+            for obj in self.model.objects.order_by("pk").iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    self._insert(cursor, batch)
+                    total += len(batch)
+                    batch = []
+
+            if batch:
+                self._insert(cursor, batch)
+                total += len(batch)
+
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')")
+
+        return total
+
+    # ---------- querying ----------
+
+    def _bm25(self):
+        weights = ", ".join(str(w) for w in self.weights)
+        return f"bm25({self.table}, {weights})"
+
+    def filter(self, qs, text):
+        """Restrict `qs` to rows matching `text`."""
+        match = to_match_query(text)
+        if not match:
+            return qs
+
+        if not fts_enabled():
+            q = Q()
+            for column in self.columns:
+                if column == "tags":
+                    q |= Q(tags__name__icontains=text)
+                else:
+                    q |= Q(**{f"{column}__icontains": text})
+            return qs.filter(q).distinct()
+
+        return qs.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s",
+                [match],
+            )
+        )
+
+    def annotate_rank(self, qs, text, name="search_rank"):
+        """
+        filter() plus the BM25 rank (lower = better match, as FTS5
+        returns it); call it instead of filter(), not after it. The FTS
+        table is joined once on rowid = pk, so one MATCH both drops the
+        rows that do not match and scores the rest.
+        """
+        match = to_match_query(text)
+        if not match or not fts_enabled():
+            return self.filter(qs, text).annotate(
+                **{name: RawSQL("0", [], output_field=FloatField())}
+            )
+
+        db_table = self.model._meta.db_table
+        pk_column = self.model._meta.pk.column
+        return qs.extra(
+            tables=[self.table],
+            where=[
+                f"{self.table}.rowid = {db_table}.{pk_column}",
+                f"{self.table} MATCH %s",
+            ],
+            params=[match],
+        ).annotate(**{name: RawSQL(self._bm25(), [], output_field=FloatField())})
+
+def register(index):
+    SEARCH_INDEXES[index.table] = index
+    return index
+
+
+def watch(index):
+    """
+    Keep `index` in step with its model: row saves/deletes, tag
+    add/remove/clear from either side, and tag renames/deletes.
+    """
+    model = index.model
+    uid = index.table
+    # Tag -> model reverse accessor, e.g. tag.event_set
+    tag_accessor = f"{model._meta.model_name}_set"
+
+    def reindex(pks):
+        index.update(list(model.objects.filter(pk__in=list(pks))))
+
+    def on_save(sender, instance, **kwargs):
+        index.update([instance])
+
+    def on_delete(sender, instance, **kwargs):
+        index.delete([instance.pk])
+
+    def on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if action == "pre_clear" and reverse:
+            # tag.<model>_set.clear(): remember who loses the tag
+            setattr(
+                instance,
+                f"_cleared_{uid}",
+                list(getattr(instance, tag_accessor).values_list("pk", flat=True)),
+            )
+            return
+
+        if action not in ("post_add", "post_remove", "post_clear"):
+            return
+
+        if not reverse:
+            index.update([instance])
+        elif action == "post_clear":
+            reindex(getattr(instance, f"_cleared_{uid}", []))
+        else:
+            reindex(pk_set or [])
+
+    def before_tag_delete(sender, instance, **kwargs):
+        setattr(
+            instance,
+            f"_tagged_{uid}",
+            list(getattr(instance, tag_accessor).values_list("pk", flat=True)),
+        )
+
+    def on_tag_changed(sender, instance, created=False, **kwargs):
+        if created:
+            return
+
+        pks = getattr(instance, f"_tagged_{uid}", None)
+        if pks is None:
+            pks = getattr(instance, tag_accessor).values_list("pk", flat=True)
+        reindex(pks)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"{uid}_save")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"{uid}_delete")
+    m2m_changed.connect(
+        on_tags_changed, sender=model.tags.through, weak=False, dispatch_uid=f"{uid}_tags"
+    )
+    pre_delete.connect(before_tag_delete, sender=Tag, weak=False, dispatch_uid=f"{uid}_tag_pre_delete")
+    post_save.connect(on_tag_changed, sender=Tag, weak=False, dispatch_uid=f"{uid}_tag_save")
+    post_delete.connect(on_tag_changed, sender=Tag, weak=False, dispatch_uid=f"{uid}_tag_delete")
+
+
+EVENT_INDEX = register(FTSIndex(
+    Event,
+    table="events_event_fts",
+    columns=["title", "interest", "description", "location", "tags"],
+    weights=[10.0, 4.0, 1.0, 3.0, 5.0],
+))
@@ -0,0 +1,147 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import (
+    Event,
+    EventAnnouncement,
+    EventRegistration,
+    EventVisibilitySettings,
+    EventWaitlistEntry,
+    Tag,
+    adjust_registration_count,
+)
+from .lifecycle import lifecycle_changed
+from .page_cache import bump_on_commit
+from .search import EVENT_INDEX, watch
+from .versioning import watch_versions
+from .visibility import invalidate_visibility_settings
+
+
+# 🔎 Keep the FTS index in step with Event rows and their tags
+watch(EVENT_INDEX)
+
+# 🃏 Bump Event.version when the tags on its card change
+watch_versions(Event)
+
+
+# ⚙️ Drop the cached EventVisibilitySettings when an admin edits it
+post_save.connect(
+    invalidate_visibility_settings,
+    sender=EventVisibilitySettings,
+    dispatch_uid="visibility_settings_saved",
+)
+post_delete.connect(
+    invalidate_visibility_settings,
+    sender=EventVisibilitySettings,
+    dispatch_uid="visibility_settings_deleted",
+)
+
+
+# 👥 Event.registration_count follows every EventRegistration insert/delete
+# (views, admin, cascades from a deleted User); adjust_registration_count()
+# also bumps the version. Runs inside the caller's transaction, so row and
+# counter commit together. bulk_create (promote_waitlist) counts itself.
+
+def count_new_registration(sender, instance, created, **kwargs):
+    if created:
+        adjust_registration_count(instance.event_id, 1)
+
+
+def count_removed_registration(sender, instance, **kwargs):
+    adjust_registration_count(instance.event_id, -1)
+
+
+post_save.connect(
+    count_new_registration,
+    sender=EventRegistration,
+    dispatch_uid="event_registration_count_save",
+)
+post_delete.connect(
+    count_removed_registration,
+    sender=EventRegistration,
+    dispatch_uid="event_registration_count_delete",
+)
+
+
+# 🎟 Keep waitlist tickets dense (EventWaitlistEntry.position). Whoever
+# was ahead of a leaver moves up one ticket; matching on id (the queue
+# order, never renumbered) gives the same result whatever order a bulk
+# delete reports its rows in. Leaving from the head moves nobody.
+
+def close_waitlist_gap(sender, instance, **kwargs):
+    EventWaitlistEntry.objects.filter(
+        event_id=instance.event_id,
+        id__lt=instance.id,
+    ).update(ticket=F("ticket") + 1)
+
+
+post_delete.connect(
+    close_waitlist_gap,
+    sender=EventWaitlistEntry,
+    dispatch_uid="event_waitlist_close_gap",
+)
+
+
+# 🗄 Anonymous page cache invalidation (see page_cache.py)
+
+def invalidate_event_pages(sender, instance, **kwargs):
+    bump_on_commit("events", f"event:{instance.pk}")
+
+
+def invalidate_pages_for_event_child(sender, instance, **kwargs):
+    # Registrations change the counts on the list and the detail page
+    bump_on_commit("events", f"event:{instance.event_id}")
+
+
+def invalidate_announcement_pages(sender, instance, **kwargs):
+    # Announcements only appear on the detail page
+    bump_on_commit(f"event:{instance.event_id}")
+
+
+def invalidate_event_tag_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        bump_on_commit("events", f"event:{instance.pk}")
+    elif pk_set:
+        bump_on_commit("events", *(f"event:{pk}" for pk in pk_set))
+    else:
+        # tag.event_set.clear(): every detail page showing tags
+        bump_on_commit("events", "tags")
+
+
+def invalidate_tag_pages(sender, instance, **kwargs):
+    # Tag names show up on every list and detail page
+    bump_on_commit("events", "communities", "tags")
+
+
+def invalidate_list_pages(sender, instance, **kwargs):
+    bump_on_commit("events")
+
+
+def invalidate_lifecycle_pages(sender, event_id, **kwargs):
+    # Scheduler flips are bulk UPDATEs, so post_save never fires for them
+    bump_on_commit("events", f"event:{event_id}")
+
+
+for model, receiver in [
+    (Event, invalidate_event_pages),
+    (EventRegistration, invalidate_pages_for_event_child),
+    (EventAnnouncement, invalidate_announcement_pages),
+    (Tag, invalidate_tag_pages),
+    (EventVisibilitySettings, invalidate_list_pages),
+]:
+    post_save.connect(receiver, sender=model, dispatch_uid=f"page_cache_save_{model.__name__}")
+    post_delete.connect(receiver, sender=model, dispatch_uid=f"page_cache_delete_{model.__name__}")
+
+lifecycle_changed.connect(
+    invalidate_lifecycle_pages,
+    dispatch_uid="page_cache_lifecycle_changed",
+)
+
+m2m_changed.connect(
+    invalidate_event_tag_pages,
+    sender=Event.tags.through,
+    dispatch_uid="page_cache_event_tags",
+)
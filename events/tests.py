@@ -1,3 +1,1283 @@
-from django.test import TestCase
+import json
+import re
+import threading
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.relationships import get_relationships
+from communities.models import Community, CommunityMember
+
+from . import live, page_cache, visibility
+from .checks import check_shared_page_cache
+from .lifecycle import advance_lifecycles, lifecycle_changed, upcoming_boundaries
+from .models import (
+    ALREADY_JOINED,
+    FULL,
+    JOINED,
+    Event,
+    EventAnnouncement,
+    EventRecommendation,
+    EventRegistration,
+    EventVisibilitySettings,
+    EventWaitlistEntry,
+    Tag,
+    adjust_registration_count,
+    join_waitlist,
+    lifecycle_state_at,
+    promote_waitlist,
+    register_user,
+    waitlist_position,
+)
+from .pagination import CURSOR_SALT, InvalidCursor, paginate_keyset
+from .recommendations import compute_recommendations
+from .search import EVENT_INDEX
+from .views import compute_event_lifecycle
+
+
+def make_event(creator, **kwargs):
+    start = timezone.localtime() + timedelta(days=1)
+    fields = {
+        "title": "Flash crowd",
+        "interest": "Tech",
+        "location": "Hall A",
+        "date": start.date(),
+        "start_time": start.time().replace(microsecond=0),
+        "created_by": creator,
+    }
+    fields.update(kwargs)
+    return Event.objects.create(**fields)
+
+
+def run_in_threads(target, args_list):
+    """Start every call at once (barrier) and collect the results."""
+    barrier = threading.Barrier(len(args_list))
+    results = [None] * len(args_list)
+
+    def worker(i, args):
+        try:
+            barrier.wait()
+            results[i] = target(*args)
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(i, args))
+        for i, args in enumerate(args_list)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return results
+
+
+class JoinEventConcurrencyTests(TransactionTestCase):
+    """
+    Stress register_user() from many threads at once; the DB has to be
+    the only thing standing between a capped event and overbooking.
+    """
+
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.users = [User.objects.create_user(f"fan{i}") for i in range(40)]
+
+    def test_flash_crowd_never_overbooks(self):
+        event = make_event(self.creator, max_participants=10)
+
+        results = run_in_threads(
+            register_user, [(event, user) for user in self.users]
+        )
+
+        event.refresh_from_db()
+        self.assertEqual(results.count(JOINED), 10)
+        self.assertEqual(results.count(FULL), 30)
+        self.assertEqual(EventRegistration.objects.filter(event=event).count(), 10)
+        self.assertEqual(event.registration_count, 10)
+
+    def test_double_click_creates_one_registration(self):
+        event = make_event(self.creator)
+        user = self.users[0]
+
+        results = run_in_threads(register_user, [(event, user)] * 16)
+
+        event.refresh_from_db()
+        self.assertEqual(results.count(JOINED), 1)
+        self.assertEqual(results.count(ALREADY_JOINED), 15)
+        self.assertEqual(EventRegistration.objects.filter(event=event).count(), 1)
+        self.assertEqual(event.registration_count, 1)
+
+
+class JoinEventViewTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.user = User.objects.create_user("member")
+        self.client.force_login(self.user)
+
+    def test_join_full_event_is_rejected(self):
+        event = make_event(self.creator, max_participants=1)
+        register_user(event, self.creator)
+
+        response = self.client.get(f"/events/join/{event.id}/", follow=True)
+
+        event.refresh_from_db()
+        self.assertContains(response, "This event is already full.")
+        self.assertEqual(event.registration_count, 1)
+        self.assertFalse(
+            EventRegistration.objects.filter(event=event, user=self.user).exists()
+        )
+
+    def test_join_then_leave_keeps_count_in_sync(self):
+        event = make_event(self.creator, max_participants=5)
+
+        self.client.get(f"/events/join/{event.id}/")
+        self.client.get(f"/events/join/{event.id}/")
+        event.refresh_from_db()
+        self.assertEqual(event.registration_count, 1)
+
+        self.client.get(f"/events/leave/{event.id}/")
+        event.refresh_from_db()
+        self.assertEqual(event.registration_count, 0)
+
+
+class RegistrationDeltaTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.user = User.objects.create_user("member")
+        self.client.force_login(self.user)
+        self.ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+    def test_ajax_join_and_leave_answer_with_json(self):
+        event = make_event(self.creator, max_participants=3)
+
+        joined = self.client.get(f"/events/join/{event.id}/", **self.ajax)
+        again = self.client.get(f"/events/join/{event.id}/", **self.ajax)
+        left = self.client.get(f"/events/leave/{event.id}/", **self.ajax)
+
+        delta = {
+            "event": event.id, "status": "MEMBER", "changed": True, "join_count": 1,
+            "max_participants": 3, "spots_left": 2, "waitlist_position": None, "message": None,
+        }
+        self.assertEqual(joined.json(), delta)
+        self.assertEqual(again.json(), {**delta, "changed": False})
+        self.assertEqual(
+            left.json(), {**delta, "status": None, "join_count": 0, "spots_left": 3}
+        )
+
+    def test_full_event_reports_waitlist_position(self):
+        event = make_event(self.creator, max_participants=1)
+        register_user(event, self.creator)
+
+        data = self.client.get(f"/events/join/{event.id}/", **self.ajax).json()
+
+        self.assertEqual(data["status"], "WAITLISTED")
+        self.assertEqual(data["waitlist_position"], 1)
+        self.assertEqual(data["spots_left"], 0)
+
+    def test_closed_event_is_a_conflict(self):
+        event = make_event(self.creator)
+        Event.objects.filter(pk=event.pk).update(event_state="CANCELLED")
+
+        response = self.client.get(f"/events/join/{event.id}/", **self.ajax)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(EventRegistration.objects.filter(event=event, user=self.user).exists())
+        # The page the script reloads explains why
+        self.assertContains(
+            self.client.get(f"/events/{event.id}/"), "You cannot join this event anymore."
+        )
+
+    def test_plain_click_still_redirects(self):
+        event = make_event(self.creator)
+
+        response = self.client.get(f"/events/join/{event.id}/")
+
+        self.assertRedirects(response, f"/events/{event.id}/", fetch_redirect_response=False)
+
+
+class RegistrationCountCascadeTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.fan = User.objects.create_user("fan")
+
+    def test_deleted_user_frees_the_seat(self):
+        event = make_event(self.creator, max_participants=1)
+        self.assertEqual(register_user(event, self.fan), JOINED)
+
+        self.fan.delete()
+
+        event.refresh_from_db()
+        self.assertEqual(event.registration_count, 0)
+        self.assertEqual(register_user(event, User.objects.create_user("next")), JOINED)
+
+    def test_deleted_user_and_community_keep_member_counts(self):
+        kept = Community.objects.create(name="Kept", interest="x", description="", created_by=self.creator)
+        dropped = Community.objects.create(name="Dropped", interest="x", description="", created_by=self.creator)
+        other = User.objects.create_user("other")
+        for user in (self.fan, other):
+            CommunityMember.objects.create(user=user, community=kept)
+            CommunityMember.objects.create(user=user, community=dropped)
+
+        self.fan.delete()
+        dropped.delete()
+
+        kept.refresh_from_db()
+        self.assertEqual(kept.member_count, 1)
+        self.assertEqual(CommunityMember.objects.filter(user=other).count(), 1)
+
+    def test_admin_style_queryset_delete_is_counted(self):
+        event = make_event(self.creator)
+        for i in range(3):
+            register_user(event, User.objects.create_user(f"u{i}"))
+
+        EventRegistration.objects.filter(event=event, user__username__in=["u0", "u1"]).delete()
+
+        event.refresh_from_db()
+        self.assertEqual(event.registration_count, 1)
+
+
+class ReconcileRegistrationCountsTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.synced = make_event(self.creator, title="synced")
+        self.drifted = make_event(self.creator, title="drifted")
+        self.empty = make_event(self.creator, title="empty")
+
+        for i in range(2):
+            register_user(self.synced, User.objects.create_user(f"s{i}"))
+            register_user(self.drifted, User.objects.create_user(f"d{i}"))
+        Event.objects.filter(pk=self.drifted.pk).update(registration_count=5)
+        Event.objects.filter(pk=self.empty.pk).update(registration_count=3)
+
+    def counts(self):
+        return dict(Event.objects.values_list("title", "registration_count"))
+
+    def test_dry_run_reports_without_writing(self):
+        versions = dict(Event.objects.values_list("id", "version"))
+        out = StringIO()
+
+        call_command("reconcile_registration_counts", "--dry-run", stdout=out)
+
+        self.assertIn(f"event {self.drifted.id}: stored=5 actual=2", out.getvalue())
+        self.assertIn(f"event {self.empty.id}: stored=3 actual=0", out.getvalue())
+        self.assertIn("2 event(s) out of sync.", out.getvalue())
+        self.assertEqual(self.counts(), {"synced": 2, "drifted": 5, "empty": 3})
+        self.assertEqual(dict(Event.objects.values_list("id", "version")), versions)
+
+    def test_repairs_drift_and_bumps_only_drifted_cards(self):
+        versions = dict(Event.objects.values_list("id", "version"))
+        out = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("reconcile_registration_counts", stdout=out)
+
+        self.assertIn("2 event(s) were out of sync", out.getvalue())
+        self.assertEqual(self.counts(), {"synced": 2, "drifted": 2, "empty": 0})
+
+        after = dict(Event.objects.values_list("id", "version"))
+        self.assertEqual(after[self.synced.id], versions[self.synced.id])
+        self.assertEqual(after[self.drifted.id], versions[self.drifted.id] + 1)
+        self.assertEqual(after[self.empty.id], versions[self.empty.id] + 1)
+
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.users = [User.objects.create_user(f"fan{i}") for i in range(6)]
+        self.event = make_event(self.creator, max_participants=2)
+
+        for user in self.users:
+            if register_user(self.event, user) == FULL:
+                join_waitlist(self.event, user)
+
+    def test_full_event_queues_in_order(self):
+        entries = EventWaitlistEntry.objects.filter(event=self.event).order_by("id")
+
+        self.assertEqual([e.user for e in entries], self.users[2:])
+        self.assertEqual([e.position for e in entries], [1, 2, 3, 4])
+
+    def test_leaving_mid_queue_moves_later_entries_up(self):
+        EventWaitlistEntry.objects.filter(user=self.users[3]).delete()
+        self.users[4].delete()  # cascades to their entry
+        latecomer = User.objects.create_user("latecomer")
+        join_waitlist(self.event, latecomer)
+
+        entries = EventWaitlistEntry.objects.filter(event=self.event).order_by("id")
+        self.assertEqual(
+            [(e.user, e.position) for e in entries],
+            [(self.users[2], 1), (self.users[5], 2), (latecomer, 3)],
+        )
+
+    def test_freed_seats_promote_head_of_queue_in_one_batch(self):
+        EventRegistration.objects.filter(event=self.event).delete()
+        self.event.registration_count = 0
+        self.event.save()
+
+        promoted = promote_waitlist(self.event.id)
+
+        self.event.refresh_from_db()
+        self.assertEqual(promoted, [u.id for u in self.users[2:4]])
+        self.assertEqual(self.event.registration_count, 2)
+        self.assertEqual(
+            EventWaitlistEntry.objects.get(event=self.event, user=self.users[4]).position,
+            1
+        )
+
+    def test_new_joiner_cannot_jump_the_queue(self):
+        latecomer = User.objects.create_user("latecomer")
+        self.event.max_participants = 3
+        self.event.save()
+
+        self.assertEqual(register_user(self.event, latecomer), FULL)
+
+
+class VisibilitySettingsCacheTests(TestCase):
+    def setUp(self):
+        visibility.invalidate_visibility_settings()
+
+    def test_second_read_is_served_from_memory(self):
+        EventVisibilitySettings.objects.create(hide_completed_after_days=3)
+        before = visibility.visibility_cache_stats()
+
+        visibility.get_visibility_settings()
+        with self.assertNumQueries(0):
+            settings = visibility.get_visibility_settings()
+
+        after = visibility.visibility_cache_stats()
+        self.assertEqual(settings.hide_completed_after_days, 3)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_admin_edit_invalidates(self):
+        settings = EventVisibilitySettings.objects.create(hide_completed_after_days=3)
+        visibility.get_visibility_settings()
+
+        settings.hide_completed_after_days = 9
+        settings.save()
+
+        self.assertEqual(visibility.get_visibility_settings().hide_completed_after_days, 9)
+
+        settings.delete()
+        self.assertIsNone(visibility.get_visibility_settings())
+
+
+class ListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("browser")
+        self.tags = [Tag.objects.create(name=f"Tag {i}") for i in range(3)]
+        self.client.force_login(self.user)
+        cache.clear()
+        get_relationships(self.user)
+
+    def add_events(self, n):
+        # Commit hooks patch the warm relationship cache, as in production
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(n):
+                event = make_event(self.user)
+                event.tags.set(self.tags)
+                register_user(event, self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        return len(ctx.captured_queries)
+
+    def test_card_count_does_not_change_query_count(self):
+        for url in ["/events/", "/events/my/"]:
+            self.add_events(2)
+            few = self.count_queries(url)
+
+            self.add_events(8)
+            many = self.count_queries(url)
+
+            self.assertEqual(few, many, url)
+
+
+class MyEventsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("power")
+        other = User.objects.create_user("other")
+        self.created = [make_event(self.user, title=f"Mine {i}") for i in range(3)]
+        self.joined = [make_event(other, title=f"Theirs {i}") for i in range(22)]
+        for event in self.joined:
+            register_user(event, self.user)
+        make_event(other, title="Unrelated")
+        self.client.force_login(self.user)
+
+    def test_pages_carry_role_and_lifecycle(self):
+        first = self.client.get("/events/my/")
+        page = first.context["page"]
+        self.assertEqual(len(page.items), 20)
+        self.assertTrue(page.next_cursor)
+
+        second = self.client.get("/events/my/", {"cursor": page.next_cursor})
+        events = page.items + second.context["page"].items
+
+        self.assertEqual(len(events), 25)
+        statuses = {e.title: e.status for e in events}
+        self.assertEqual(statuses["Mine 0"], "CREATOR")
+        self.assertEqual(statuses["Theirs 0"], "MEMBER")
+        self.assertNotIn("Unrelated", statuses)
+        self.assertTrue(all(e.lifecycle == "upcoming" for e in events))
+
+    def test_joined_filter_excludes_own_events(self):
+        response = self.client.get("/events/my/", {"filter": "joined"})
+        titles = {e.title for e in response.context["events"]}
+
+        self.assertFalse(any(t.startswith("Mine") for t in titles))
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        page_cache.cache.clear()
+        self.creator = User.objects.create_user("creator")
+        self.event = make_event(self.creator)
+
+    def test_second_anonymous_hit_only_reads_the_shared_cache(self):
+        self.assertEqual(self.client.get("/events/?sort=newest&q=")["X-Page-Cache"], "miss")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/events/?q=&sort=newest")
+
+        self.assertEqual(response["X-Page-Cache"], "hit")
+        # Generation + page lookups; no application table is touched
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            self.assertIn('"shared_cache"', query["sql"])
+
+    def test_process_local_page_cache_is_refused(self):
+        local = {**settings.CACHES, "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local):
+            self.assertEqual([e.id for e in check_shared_page_cache(None)], ["events.E002"])
+
+    def test_bump_from_another_process_reaches_this_one(self):
+        self.client.get("/events/")
+
+        # What run_lifecycle_scheduler's bump leaves behind: only the
+        # shared generation row changes, nothing in this process
+        other = page_cache.caches.create_connection(page_cache.PAGE_CACHE_ALIAS)
+        other.incr(page_cache.GENERATION_PREFIX + "events")
+
+        self.assertEqual(self.client.get("/events/")["X-Page-Cache"], "miss")
+
+    def test_logged_in_users_bypass_cache(self):
+        self.client.force_login(self.creator)
+
+        response = self.client.get("/events/")
+
+        self.assertNotIn("X-Page-Cache", response)
+
+    def test_registration_invalidates_list_and_detail(self):
+        fan = User.objects.create_user("fan")
+        detail = f"/events/{self.event.id}/"
+        self.client.get("/events/")
+        self.client.get(detail)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            register_user(self.event, fan)
+
+        self.assertEqual(self.client.get("/events/")["X-Page-Cache"], "miss")
+        self.assertEqual(self.client.get(detail)["X-Page-Cache"], "miss")
+
+    def test_ttl_stops_at_next_lifecycle_transition(self):
+        soon = timezone.now() + timedelta(seconds=40)
+        Event.objects.filter(pk=self.event.pk).update(start_at=soon)
+
+        ttl = page_cache.seconds_until(
+            Event.objects.filter(pk=self.event.pk).next_transition()
+        )
+
+        self.assertLessEqual(ttl, 40)
+
+
+class LifecycleSchedulerTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.now = timezone.now()
+
+    def shift(self, event, start, end=None):
+        # Move the clock boundaries without save(), like time passing
+        Event.objects.filter(pk=event.pk).update(start_at=start, end_at=end)
+
+    def test_save_stores_clock_state(self):
+        event = make_event(self.creator)
+        self.assertEqual(event.event_state, "UPCOMING")
+
+        event.event_state = "CANCELLED"
+        event.save()
+        event.refresh_from_db()
+        self.assertEqual(event.event_state, "CANCELLED")
+
+    def test_startup_sweep_recovers_overdue_transitions(self):
+        started = make_event(self.creator, title="started")
+        finished = make_event(self.creator, title="finished")
+        cancelled = make_event(self.creator, title="cancelled", event_state="CANCELLED")
+        future = make_event(self.creator, title="future")
+
+        self.shift(started, self.now - timedelta(hours=1))
+        self.shift(finished, self.now - timedelta(hours=3), self.now - timedelta(hours=2))
+        self.shift(cancelled, self.now - timedelta(hours=3), self.now - timedelta(hours=2))
+
+        seen = []
+
+        def receiver(sender, event_id, old_state, new_state, **kwargs):
+            seen.append((event_id, old_state, new_state))
+
+        lifecycle_changed.connect(receiver)
+        self.addCleanup(lifecycle_changed.disconnect, receiver)
+
+        advance_lifecycles(self.now)
+
+        self.assertCountEqual(seen, [
+            (started.id, "UPCOMING", "ONGOING"),
+            (finished.id, "UPCOMING", "COMPLETED"),
+        ])
+        states = dict(Event.objects.values_list("title", "event_state"))
+        self.assertEqual(states, {
+            "started": "ONGOING",
+            "finished": "COMPLETED",
+            "cancelled": "CANCELLED",
+            "future": "UPCOMING",
+        })
+        self.assertEqual(advance_lifecycles(self.now), [])
+
+    def test_heap_holds_next_boundaries_in_order(self):
+        soon = self.now + timedelta(minutes=5)
+        later = self.now + timedelta(minutes=20)
+        event = make_event(self.creator)
+        self.shift(event, soon, later)
+
+        heap = upcoming_boundaries(self.now, self.now + timedelta(hours=1))
+
+        self.assertEqual(sorted(heap), [soon, later])
+        self.assertEqual(heap[0], soon)
+
+    def test_transition_invalidates_cached_pages(self):
+        cache.clear()
+        event = make_event(self.creator)
+        detail = f"/events/{event.id}/"
+        self.client.get(detail)
+        self.shift(event, self.now - timedelta(minutes=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            advance_lifecycles()
+
+        response = self.client.get(detail)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertContains(response, "ONGOING")
+
+
+def baseline_lifecycle(event, now):
+    """compute_event_lifecycle() as the pre-SQL list view had it."""
+    if event.event_state == "CANCELLED":
+        return "cancelled"
+    if event.end_at and now > event.end_at:
+        return "completed"
+    if now < event.start_at:
+        return "upcoming"
+    return "ongoing"
+
+
+def baseline_visible(event, now, completed_days, cancelled_days):
+    """The pre-SQL list view's per-event visibility loop."""
+    lifecycle = baseline_lifecycle(event, now)
+    if lifecycle in ("upcoming", "ongoing"):
+        return True
+    if lifecycle == "completed":
+        return bool(completed_days) and now - event.end_at <= timedelta(days=completed_days)
+    return bool(cancelled_days) and now - event.start_at <= timedelta(days=cancelled_days)
+
+
+class LifecycleVisibilitySqlTests(TestCase):
+    def setUp(self):
+        creator = User.objects.create_user("creator")
+        self.now = timezone.now()
+
+        def hours(n):
+            return self.now + timedelta(hours=n)
+
+        # title: (start_at, end_at, cancelled)
+        cases = {
+            "upcoming": (hours(2), hours(4), False),
+            "ongoing": (hours(-1), hours(1), False),
+            "ongoing, no end": (hours(-24 * 10), None, False),
+            "completed 1h ago": (hours(-3), hours(-1), False),
+            "completed 2d ago": (hours(-50), hours(-48), False),
+            "completed 5d ago": (hours(-122), hours(-120), False),
+            "cancelled, future": (hours(2), hours(4), True),
+            "cancelled 1d ago": (hours(-24), hours(-22), True),
+            "cancelled 5d ago": (hours(-120), None, True),
+        }
+        for title, (start, end, cancelled) in cases.items():
+            event = make_event(creator, title=title)
+            Event.objects.filter(pk=event.pk).update(
+                start_at=start,
+                end_at=end,
+                event_state="CANCELLED" if cancelled else lifecycle_state_at(start, end, self.now),
+            )
+        self.events = list(Event.objects.all())
+
+    def visible_titles(self, completed_days, cancelled_days):
+        rules = EventVisibilitySettings(
+            hide_completed_after_days=completed_days,
+            hide_cancelled_after_days=cancelled_days,
+        )
+        return set(
+            Event.objects.visible(rules, self.now).values_list("title", flat=True)
+        )
+
+    def test_visible_matches_baseline_rules(self):
+        for completed_days, cancelled_days in [(0, 0), (1, 1), (3, 2), (7, 7)]:
+            expected = {
+                e.title for e in self.events
+                if baseline_visible(e, self.now, completed_days, cancelled_days)
+            }
+            self.assertEqual(
+                self.visible_titles(completed_days, cancelled_days),
+                expected,
+                (completed_days, cancelled_days),
+            )
+
+    def test_zero_day_window_hides_completed_and_cancelled(self):
+        self.assertEqual(
+            self.visible_titles(0, 0), {"upcoming", "ongoing", "ongoing, no end"}
+        )
+
+    def test_no_settings_row_means_zero_days(self):
+        self.assertEqual(
+            set(Event.objects.visible(None, self.now).values_list("title", flat=True)),
+            self.visible_titles(0, 0),
+        )
+
+    def test_lifecycle_from_stored_state_and_time_fallback(self):
+        expected = {e.title: baseline_lifecycle(e, self.now) for e in self.events}
+
+        stored = dict(Event.objects.with_lifecycle(self.now).values_list("title", "lifecycle"))
+        self.assertEqual(stored, expected)
+
+        # Rows from before event_state was stored fall back to the clock
+        Event.objects.exclude(event_state="CANCELLED").update(event_state="")
+        fallback = dict(Event.objects.with_lifecycle(self.now).values_list("title", "lifecycle"))
+        self.assertEqual(fallback, expected)
+
+    def test_missed_sweep_does_not_leave_stale_states(self):
+        # Stored UPCOMING, but both bounds passed and no scheduler ran
+        stale = Event.objects.get(title="completed 1h ago")
+        Event.objects.filter(pk=stale.pk).update(event_state="UPCOMING")
+        stale.refresh_from_db()
+
+        self.assertEqual(compute_event_lifecycle(stale, self.now), "completed")
+        self.assertEqual(
+            Event.objects.with_lifecycle(self.now).get(pk=stale.pk).lifecycle, "completed"
+        )
+        self.assertFalse(Event.objects.for_lifecycle("upcoming", self.now).filter(pk=stale.pk).exists())
+        self.assertTrue(Event.objects.for_lifecycle("completed", self.now).filter(pk=stale.pk).exists())
+
+        self.client.force_login(User.objects.create_user("late"))
+        self.client.get(f"/events/join/{stale.id}/")
+        self.assertFalse(EventRegistration.objects.filter(event=stale).exists())
+
+    def test_for_lifecycle_filters_on_state(self):
+        for lifecycle in ("upcoming", "ongoing", "completed", "cancelled"):
+            self.assertEqual(
+                set(Event.objects.for_lifecycle(lifecycle).values_list("title", flat=True)),
+                {e.title for e in self.events if baseline_lifecycle(e, self.now) == lifecycle},
+                lifecycle,
+            )
+        self.assertEqual(Event.objects.for_lifecycle("all").count(), len(self.events))
+
+
+class CardVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user("creator")
+        self.event = make_event(self.creator, max_participants=5)
+
+    def version(self):
+        return Event.objects.values_list("version", flat=True).get(pk=self.event.pk)
+
+    def test_row_tags_and_counters_bump_version(self):
+        start = self.version()
+
+        self.event.title = "Renamed"
+        self.event.save()
+        self.assertEqual(self.event.version, start + 1)
+
+        tag = Tag.objects.create(name="Jazz")
+        self.event.tags.add(tag)
+        register_user(self.event, User.objects.create_user("fan"))
+        tag.name = "Bebop"
+        tag.save()
+
+        self.assertEqual(self.version(), start + 4)
+
+    def test_cached_card_follows_the_count(self):
+        fan = User.objects.create_user("fan")
+        self.client.force_login(fan)
+        self.assertContains(self.client.get("/events/"), "👥 0/5")
+
+        register_user(self.event, fan)
+
+        self.assertContains(self.client.get("/events/"), "👥 1/5")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.events = [make_event(self.creator, title=f"Gig {i}") for i in range(5)]
+        # Two rows from before start_at was stored
+        Event.objects.filter(pk__in=[self.events[1].pk, self.events[3].pk]).update(start_at=None)
+
+    def walk(self, ordering, page_size=2):
+        pages, cursor = [], None
+        while True:
+            page = paginate_keyset(
+                Event.objects.all(), ordering, cursor=cursor, page_size=page_size, key="t"
+            )
+            pages.append(page)
+            cursor = page.next_cursor
+            if not cursor:
+                return pages
+
+    def test_forward_and_back_with_null_keys(self):
+        for ordering in [("start_at", "id"), ("-start_at", "-id"), ("-start_at", "id")]:
+            expected = list(Event.objects.order_by(*ordering))
+            pages = self.walk(ordering)
+            self.assertEqual([e for page in pages for e in page.items], expected, ordering)
+
+            # Back from the last page retraces the same pages
+            back = [pages[-1]]
+            while back[-1].prev_cursor:
+                back.append(paginate_keyset(
+                    Event.objects.all(), ordering, cursor=back[-1].prev_cursor, page_size=2, key="t"
+                ))
+            self.assertEqual(
+                [page.items for page in reversed(back)], [page.items for page in pages], ordering
+            )
+
+    def test_tampered_and_foreign_cursors_are_rejected(self):
+        cursor = self.walk(("start_at", "id"))[0].next_cursor
+
+        for bad, key, ordering in [
+            (cursor[:-2] + "xx", "t", ("start_at", "id")),
+            (cursor, "other", ("start_at", "id")),
+            (cursor, "t", ("-id",)),
+            # Correctly signed, but the datetime does not parse
+            (
+                signing.dumps(
+                    {"k": "events.event:t", "v": [{"dt": "not a date"}, 1], "d": "n"},
+                    salt=CURSOR_SALT,
+                ),
+                "t",
+                ("start_at", "id"),
+            ),
+        ]:
+            with self.assertRaises(InvalidCursor):
+                paginate_keyset(Event.objects.all(), ordering, cursor=bad, key=key)
+
+    def test_views_answer_400_for_bad_cursors(self):
+        newest = self.client.get("/events/api/", {"sort": "newest", "limit": 2}).json()["next_cursor"]
+
+        response = self.client.get("/events/api/", {"sort": "popular", "cursor": newest})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+        # Same "api:newest" key, but minted for events
+        self.assertEqual(
+            self.client.get("/communities/api/", {"sort": "newest", "cursor": newest}).status_code, 400
+        )
+        self.assertEqual(self.client.get("/events/", {"cursor": "garbage"}).status_code, 400)
+
+    def test_list_page_walks_past_null_start(self):
+        first = self.client.get("/events/api/", {"sort": "upcoming", "limit": 2, "fields": "id"}).json()
+        rest = self.client.get(
+            "/events/api/", {"sort": "upcoming", "limit": 10, "fields": "id", "cursor": first["next_cursor"]}
+        ).json()
+
+        self.assertEqual(
+            [row["id"] for row in first["results"] + rest["results"]],
+            list(Event.objects.order_by("start_at", "id").values_list("id", flat=True)),
+        )
+
+
+class JsonApiTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.tag = Tag.objects.create(name="Jazz")
+        self.events = [make_event(self.creator, title=f"Gig {i}") for i in range(3)]
+        self.events[0].tags.add(self.tag)
+
+    def test_sparse_fields_and_cursor(self):
+        response = self.client.get("/events/api/", {"fields": "title,tags", "limit": 2})
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["results"][0], {"id": self.events[0].id, "title": "Gig 0", "tags": ["Jazz"]})
+        self.assertEqual(len(data["results"]), 2)
+
+        rest = self.client.get("/events/api/", {"fields": "title", "cursor": data["next_cursor"]})
+        self.assertEqual([row["title"] for row in rest.json()["results"]], ["Gig 2"])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/events/api/", {"fields": "title,password"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_integer_tag_is_a_400(self):
+        for url in ["/events/api/", "/communities/api/"]:
+            response = self.client.get(url, {"tag": "abc"})
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn("error", response.json())
+
+        for url in ["/events/", "/communities/"]:
+            self.assertEqual(self.client.get(url, {"tag": "abc"}).status_code, 400, url)
+
+        jazz = self.client.get("/events/api/", {"tag": str(self.tag.id), "fields": "id"}).json()
+        self.assertEqual([row["id"] for row in jazz["results"]], [self.events[0].id])
+
+    def test_unchanged_poll_gets_304_from_one_query(self):
+        etag = self.client.get("/events/api/")["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/events/api/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_counter_change_invalidates_etag(self):
+        url = f"/events/api/{self.events[1].id}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        register_user(self.events[1], User.objects.create_user("fan"))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["registration_count"], 1)
+
+    def test_announcements_newest_first(self):
+        event = self.events[0]
+        for i in range(3):
+            EventAnnouncement.objects.create(event=event, message=f"News {i}", created_by=self.creator)
+
+        response = self.client.get(
+            f"/events/api/{event.id}/announcements/", {"fields": "message,author"}
+        )
+
+        self.assertEqual(
+            response.json()["results"][0],
+            {"id": EventAnnouncement.objects.latest("id").id, "message": "News 2", "author": "creator"},
+        )
+
+
+class AnnouncementTimelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user("creator")
+        self.event = make_event(self.creator)
+        for i in range(25):
+            EventAnnouncement.objects.create(event=self.event, message=f"News {i}", created_by=self.creator)
+
+    def test_detail_shows_newest_page_with_authors_joined(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"/events/{self.event.id}/")
+
+        shown = [ann.message for ann in response.context["announcements"]]
+        self.assertEqual(shown, [f"News {i}" for i in range(24, 4, -1)])
+        self.assertContains(response, "Load older announcements")
+        author_lookups = [q for q in ctx.captured_queries if 'FROM "auth_user"' in q["sql"]]
+        self.assertEqual(author_lookups, [])
+
+    def test_load_older_returns_the_rest_as_a_fragment(self):
+        first = self.client.get(f"/events/{self.event.id}/")
+        cursor = first.context["announcements_page"].next_cursor
+
+        response = self.client.get(f"/events/{self.event.id}/announcements/", {"cursor": cursor})
+
+        self.assertNotContains(response, "<html")
+        self.assertNotContains(response, "Load older announcements")
+        self.assertNotContains(response, "No announcements yet")
+        self.assertEqual(
+            [ann.message for ann in response.context["announcements"]],
+            [f"News {i}" for i in range(4, -1, -1)],
+        )
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.fan = User.objects.create_user("fan")
+        self.jazz, self.rock, self.chess = (
+            Tag.objects.create(name=name) for name in ("Jazz", "Rock", "Chess")
+        )
+
+        self.jazz_night = make_event(self.creator, title="Jazz night")
+        self.jazz_night.tags.set([self.jazz])
+        self.jam = make_event(self.creator, title="Jazz & rock jam")
+        self.jam.tags.set([self.jazz, self.rock])
+        self.chess_club = make_event(self.creator, title="Chess club")
+        self.chess_club.tags.set([self.chess])
+        self.joined = make_event(self.creator, title="Already going")
+        self.joined.tags.set([self.jazz])
+        register_user(self.joined, self.fan)
+
+        self.fan.profile.favourite_tags.set([self.rock])
+
+    def test_scores_favourites_and_history_and_skips_joined(self):
+        compute_recommendations([self.fan.id, self.creator.id])
+
+        ranked = list(
+            EventRecommendation.objects.filter(user=self.fan)
+            .order_by("rank").values_list("event__title", flat=True)
+        )
+        # Rock (favourite) + Jazz (history) beats Jazz alone; chess never matches
+        self.assertEqual(ranked, ["Jazz & rock jam", "Jazz night"])
+        # Creators are not recommended their own events; no tags, no rows
+        self.assertFalse(EventRecommendation.objects.filter(user=self.creator).exists())
+
+    def test_feed_is_one_query_and_hides_stale_rows(self):
+        compute_recommendations([self.fan.id])
+        self.jam.event_state = "CANCELLED"
+        self.jam.save()
+        self.client.force_login(self.fan)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/events/recommended/")
+
+        self.assertEqual([event.title for event in response.context["events"]], ["Jazz night"])
+        event_queries = [q for q in ctx.captured_queries if "events_event" in q["sql"]]
+        self.assertEqual(len(event_queries), 1)
+        self.assertIn("events_eventrecommendation", event_queries[0]["sql"])
+
+
+class AsyncViewsTests(TestCase):
+    """ASGI requests (AsyncClient) are routed to events/async_views.py."""
+
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user("creator")
+        self.fan = User.objects.create_user("fan")
+        self.event = make_event(self.creator, title="Async gig", max_participants=1)
+        register_user(self.event, self.creator)
+        EventAnnouncement.objects.create(event=self.event, message="Doors at 8", created_by=self.creator)
+
+    async def test_anonymous_pages_render_and_cache(self):
+        response = await self.async_client.get("/events/")
+        self.assertContains(response, "Async gig")
+        self.assertEqual(response["X-Page-Cache"], "miss")
+
+        response = await self.async_client.get(f"/events/{self.event.id}/")
+        self.assertContains(response, "Doors at 8")
+        self.assertContains(response, "By creator")
+
+        response = await self.async_client.get("/events/")
+        self.assertEqual(response["X-Page-Cache"], "hit")
+
+    async def test_waitlisted_viewer_sees_position(self):
+        await EventWaitlistEntry.objects.acreate(event=self.event, user=self.fan)
+        await self.async_client.aforce_login(self.fan)
+
+        response = await self.async_client.get(f"/events/{self.event.id}/")
+
+        self.assertEqual(response.context["status"], "WAITLISTED")
+        self.assertEqual(response.context["waitlist_position"], 1)
+
+    async def test_missing_event_is_404(self):
+        response = await self.async_client.get("/events/999999/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+def parse_frame(raw):
+    fields = dict(
+        line.split(": ", 1) for line in raw.decode().strip().splitlines()
+    )
+    return fields["event"], fields["id"], json.loads(fields["data"])
+
+
+class LiveStreamTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+        self.event = make_event(self.creator, max_participants=10)
+        self.hub = live.Hub()
+
+    async def test_hub_fans_out_one_poll_to_every_listener(self):
+        first = self.hub.subscribe(self.event.id)
+        second = self.hub.subscribe(self.event.id)
+
+        await EventAnnouncement.objects.acreate(
+            event_id=self.event.id, message="Doors at 8", created_by_id=self.creator.id
+        )
+        await sync_to_async(adjust_registration_count)(self.event.id, 1)
+        await self.hub.poll()
+        await self.hub.poll()  # overlap window: nothing is sent twice
+
+        received = [
+            [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+            for subscriber in (first, second)
+        ]
+        self.assertEqual([parse_frame(frame)[0] for frame in received[0]], ["announcement", "count"])
+        self.assertEqual(parse_frame(received[0][1])[2]["join_count"], 1)
+        # Encoded once, the same bytes handed to both listeners
+        self.assertIs(received[0][0], received[1][0])
+
+    async def test_slow_listener_is_dropped_not_buffered(self):
+        subscriber = self.hub.subscribe(self.event.id)
+
+        for _ in range(live.QUEUE_SIZE + 1):
+            self.hub.publish(self.event.id, b"x")
+
+        self.assertTrue(subscriber.dropped)
+        self.assertNotIn(self.event.id, self.hub.topics)
+
+    async def test_resume_replays_from_last_event_id(self):
+        old = await EventAnnouncement.objects.acreate(
+            event_id=self.event.id, message="Old", created_by_id=self.creator.id
+        )
+        await EventAnnouncement.objects.filter(pk=old.pk).aupdate(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        last_seen = live.to_event_id(timezone.now() - timedelta(minutes=1))
+        await EventAnnouncement.objects.acreate(
+            event_id=self.event.id, message="Missed", created_by_id=self.creator.id
+        )
+
+        stream = live.stream(self.event.id, last_seen, hub=self.hub)
+        frames = [await anext(stream) for _ in range(3)]
+        await stream.aclose()
+
+        self.assertEqual(frames[0], f"retry: {live.RETRY_MS}\n\n".encode())
+        kind, _, data = parse_frame(frames[1])
+        self.assertEqual((kind, data["message"]), ("announcement", "Missed"))
+        self.assertEqual(parse_frame(frames[2])[0], "count")
+        # Closing the stream unsubscribes it
+        self.assertEqual(self.hub.topics, {})
+
+    async def test_stream_for_missing_event_is_404(self):
+        response = await self.async_client.get("/events/999999/stream/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+def fts_row(index, pk):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(index.columns)} FROM {index.table} WHERE rowid = %s", [pk]
+        )
+        row = cursor.fetchone()
+    return dict(zip(index.columns, row)) if row else None
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator")
+
+    def test_index_follows_event_and_tag_changes(self):
+        event = make_event(self.creator, title="Board games", description="Bring snacks")
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["title"], "Board games")
+
+        event.description = "Bring dice"
+        event.save()
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["description"], "Bring dice")
+
+        tag = Tag.objects.create(name="Strategy")
+        event.tags.add(tag)
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["tags"], "Strategy")
+
+        tag.name = "Tactics"
+        tag.save()
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["tags"], "Tactics")
+
+        event.tags.remove(tag)
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["tags"], "")
+
+        tag.event_set.add(event)
+        tag.delete()
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["tags"], "")
+
+        event_id = event.id
+        event.delete()
+        self.assertIsNone(fts_row(EVENT_INDEX, event_id))
+
+    def test_search_matches_description_location_and_tags(self):
+        by_description = make_event(self.creator, title="One", description="Vintage synths")
+        by_location = make_event(self.creator, title="Two", location="Riverside pier")
+        by_tag = make_event(self.creator, title="Three")
+        by_tag.tags.add(Tag.objects.create(name="Origami"))
+        make_event(self.creator, title="Four")
+
+        for query, event in [("synth", by_description), ("riverside", by_location), ("origami", by_tag)]:
+            results = self.client.get("/events/api/", {"q": query, "fields": "title"}).json()["results"]
+            self.assertEqual([row["id"] for row in results], [event.id], query)
+
+    def test_relevance_order_and_cursor(self):
+        # Column weights: title 10 > tags 5 > description 1
+        in_description = make_event(self.creator, title="Evening", description="Chess")
+        in_title = make_event(self.creator, title="Chess")
+        in_tags = make_event(self.creator, title="Evening")
+        in_tags.tags.add(Tag.objects.create(name="Chess"))
+        # Enough non-matching rows for "chess" to carry a positive IDF
+        for i in range(6):
+            make_event(self.creator, title=f"Poker {i}")
+
+        seen, cursor = [], None
+        while True:
+            params = {"q": "chess", "fields": "title", "limit": 1}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get("/events/api/", params).json()
+            seen += [row["id"] for row in data["results"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [in_title.id, in_tags.id, in_description.id])
+
+    def test_relevance_search_matches_once_per_query(self):
+        hit = make_event(self.creator, title="Chess night")
+        make_event(self.creator, title="Poker night")
+
+        for url in ["/events/", "/events/api/", "/communities/", "/communities/api/"]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {"q": "chess", "sort": "relevance"})
+            self.assertEqual(response.status_code, 200, url)
+
+            matching = [q["sql"] for q in queries.captured_queries if " MATCH " in q["sql"]]
+            self.assertTrue(matching, url)
+            for sql in matching:
+                self.assertEqual(sql.count(" MATCH "), 1, f"{url}: {sql}")
+
+        results = self.client.get("/events/api/", {"q": "chess", "fields": "id"}).json()["results"]
+        self.assertEqual([row["id"] for row in results], [hit.id])
+
+    def test_rebuild_command_repopulates_index(self):
+        event = make_event(self.creator, title="Rebuilt")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {EVENT_INDEX.table}")
+
+        out = StringIO()
+        call_command("rebuild_search_index", EVENT_INDEX.table, stdout=out)
+
+        self.assertIn("indexed 1 row(s)", out.getvalue())
+        self.assertEqual(fts_row(EVENT_INDEX, event.id)["title"], "Rebuilt")
+
+
+class QueryPlanMixin:
+    """
+    Runs EXPLAIN QUERY PLAN on every SELECT a page issues and fails on a
+    full table scan ("SCAN <table>" with no index).
+
+    Allowed:
+    - tiny lookup/singleton tables in SMALL_TABLES
+    - FTS5 virtual tables
+    - an ordered scan that stops at LIMIT (no temp b-tree sort), e.g.
+      ORDER BY id DESC LIMIT 21
+    """
+
+    SMALL_TABLES = {"events_tag", "events_eventvisibilitysettings"}
+
+    SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+    def query_plan(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def full_scans(self, sql):
+        plan = self.query_plan(sql)
+
+        bounded = " LIMIT " in sql and not any("TEMP B-TREE" in line for line in plan)
+
+        scans = []
+        for line in plan:
+            match = self.SCAN_RE.match(line)
+            if match and match.group(1) not in self.SMALL_TABLES and not bounded:
+                scans.append(line)
+        return scans
+
+    def assertNoFullScans(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT"):
+                continue
+            scans = self.full_scans(sql)
+            self.assertFalse(scans, f"{url}: {scans} in\n{sql}")
+
+
+class WaitlistPositionPlanTests(QueryPlanMixin, TestCase):
+    def setUp(self):
+        creator = User.objects.create_user("creator")
+        self.event = make_event(creator, max_participants=1)
+        register_user(self.event, creator)
+        self.fans = [User.objects.create_user(f"fan{i}") for i in range(50)]
+        for fan in self.fans:
+            join_waitlist(self.event, fan)
+
+    def test_position_is_two_index_seeks_not_a_range_count(self):
+        entry = EventWaitlistEntry.objects.get(user=self.fans[-1])
+        sql, params = waitlist_position(entry.id).query.sql_with_params()
+
+        plan = self.query_plan(sql, params)
+
+        self.assertEqual(entry.position, 50)
+        seeks = [line for line in plan if line.startswith("SEARCH")]
+        self.assertEqual(len(seeks), 2, plan)
+        self.assertFalse([line for line in plan if line.startswith("SCAN")], plan)
+        # Equality seeks only: no "id<?" range whose length grows with the queue
+        self.assertFalse([line for line in seeks if "<" in line], plan)
+
+    def test_waitlisted_detail_page_uses_indexes(self):
+        self.client.force_login(self.fans[-1])
+
+        self.assertNoFullScans(f"/events/{self.event.id}/")
+
+
+class EventQueryPlanTests(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("planner")
+        cls.tag = Tag.objects.create(name="Music")
+
+        for i in range(5):
+            event = make_event(cls.user, title=f"Gig {i}", max_participants=10)
+            event.tags.add(cls.tag)
+            register_user(event, cls.user)
+            EventAnnouncement.objects.create(event=event, message="Hi", created_by=cls.user)
+        cls.event = event
+
+    def test_event_pages_use_indexes(self):
+        self.client.force_login(self.user)
+
+        for url in [
+            "/events/",
+            "/events/?sort=popular",
+            "/events/?sort=newest",
+            "/events/?q=gig",
+            f"/events/?tag={self.tag.id}&lifecycle=upcoming",
+            "/events/?role=joined",
+            "/events/?role=not_joined",
+            f"/events/{self.event.id}/",
+            "/events/my/",
+            "/events/my/?filter=joined",
+            "/events/api/?sort=popular",
+            f"/events/api/{self.event.id}/announcements/",
+            f"/events/{self.event.id}/announcements/",
+            "/events/recommended/",
+        ]:
+            self.assertNoFullScans(url)
@@ -11,7 +11,10 @@ from .views import (
     delete_announcement,
     cancel_event,
     delete_event,   # ✅ Phase 4.3
+    event_announcements,
+    recommended_events,
 )
+from .api import event_announcements_api, event_detail_api, event_list_api
 
 urlpatterns = [
     path('', events_list, name='events_list'),
@@ -19,8 +22,14 @@ urlpatterns = [
     path('join/<int:event_id>/', join_event, name='join_event'),
     path('leave/<int:event_id>/', leave_event, name='leave_event'),
     path('my/', my_events, name='my_events'),
+    path('recommended/', recommended_events, name='recommended_events'),
     path('edit/<int:event_id>/', edit_event, name='edit_event'),
     path('<int:event_id>/', event_detail, name='event_detail'),
+    path(
+        '<int:event_id>/announcements/',
+        event_announcements,
+        name='event_announcements'
+    ),
 
     # Phase 3.2 — Announcements
     path(
@@ -41,6 +50,15 @@ urlpatterns = [
         name='cancel_event'
     ),
 
+    # 📡 Read-only JSON API
+    path('api/', event_list_api, name='event_list_api'),
+    path('api/<int:event_id>/', event_detail_api, name='event_detail_api'),
+    path(
+        'api/<int:event_id>/announcements/',
+        event_announcements_api,
+        name='event_announcements_api'
+    ),
+
     # Phase 4.3 — Safe Event Deletion
     path(
         'delete/<int:event_id>/',
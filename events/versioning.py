@@ -0,0 +1,64 @@
+"""
+Card versions for tag changes.
+
+VersionedModel.save() and with_new_version() cover the row and its
+counters; watch_versions() covers the tags shown on each card: tags
+added/removed/cleared from either side, and tag renames/deletes.
+Wired up in events/signals.py and communities/signals.py.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .models import Tag, with_new_version
+
+
+def watch_versions(model):
+    uid = f"{model._meta.label_lower}_versions"
+    # Tag -> model reverse accessor, e.g. tag.event_set
+    tag_accessor = f"{model._meta.model_name}_set"
+
+    def bump(pks):
+        pks = list(pks)
+        if pks:
+            model.objects.filter(pk__in=pks).update(**with_new_version())
+
+    def on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        if action == "pre_clear" and reverse:
+            setattr(
+                instance,
+                f"_cleared_{uid}",
+                list(getattr(instance, tag_accessor).values_list("pk", flat=True)),
+            )
+            return
+
+        if action not in ("post_add", "post_remove", "post_clear"):
+            return
+
+        if not reverse:
+            bump([instance.pk])
+        elif action == "post_clear":
+            bump(getattr(instance, f"_cleared_{uid}", []))
+        else:
+            bump(pk_set or [])
+
+    def before_tag_delete(sender, instance, **kwargs):
+        setattr(
+            instance,
+            f"_tagged_{uid}",
+            list(getattr(instance, tag_accessor).values_list("pk", flat=True)),
+        )
+
+    def on_tag_changed(sender, instance, created=False, **kwargs):
+        if created:
+            return
+
+        pks = getattr(instance, f"_tagged_{uid}", None)
+        if pks is None:
+            pks = getattr(instance, tag_accessor).values_list("pk", flat=True)
+        bump(pks)
+
+    m2m_changed.connect(
+        on_tags_changed, sender=model.tags.through, weak=False, dispatch_uid=f"{uid}_tags"
+    )
+    pre_delete.connect(before_tag_delete, sender=Tag, weak=False, dispatch_uid=f"{uid}_tag_pre_delete")
+    post_save.connect(on_tag_changed, sender=Tag, weak=False, dispatch_uid=f"{uid}_tag_save")
+    post_delete.connect(on_tag_changed, sender=Tag, weak=False, dispatch_uid=f"{uid}_tag_delete")
@@ -1,24 +1,39 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
-from django.http import HttpResponseForbidden
+from django.db import transaction
+from django.http import HttpResponseForbidden, JsonResponse
+from django.db.models import F
 from django.utils import timezone
-from datetime import datetime
 
 from .models import (
     Event,
     EventRegistration,
     Tag,
-    EventAnnouncement
+    EventAnnouncement,
+    ALREADY_JOINED,
+    FULL,
+    EventWaitlistEntry,
+    EventRecommendation,
+    event_bounds,
+    join_waitlist,
+    lifecycle_q,
+    lifecycle_state_at,
+    promote_waitlist,
+    register_user,
+    tag_id_param,
 )
 from .forms import EventForm
+from accounts.relationships import get_relationships
+from notifications.outbox import enqueue_announcement, enqueue_cancellation
+from .page_cache import cache_anonymous_page, seconds_until
+from .pagination import paginate_keyset
+from .search import EVENT_INDEX
+from .visibility import get_visibility_settings
 
 from django.contrib import messages
 
-from .models import EventVisibilitySettings
 
-
-def compute_event_lifecycle(event):
+def compute_event_lifecycle(event, now=None):
     """
     FINAL lifecycle rules (authoritative & fixed):
 
@@ -26,168 +41,145 @@ def compute_event_lifecycle(event):
     1. CANCELLED always wins (manual action)
     2. COMPLETED if event time has passed
     3. UPCOMING / ONGOING by time
-    """
-
-    now = timezone.now()
-
-    start_dt = timezone.make_aware(
-        datetime.combine(event.date, event.start_time)
-    )
 
-    end_dt = None
-    if event.end_time:
-        end_dt = timezone.make_aware(
-            datetime.combine(event.date, event.end_time)
-        )
+    Only CANCELLED is taken from the stored event_state: the clock-driven
+    states are recomputed from start_at / end_at, so the answer does not
+    depend on run_lifecycle_scheduler having swept yet. The SQL version
+    lives in EventQuerySet.with_lifecycle().
+    """
 
-    # ✅ RULE 1: Cancelled ALWAYS wins
     if event.event_state == "CANCELLED":
         return "cancelled"
 
-    # ✅ RULE 2: Completed by time
-    if end_dt and now > end_dt:
-        return "completed"
-
-    # ✅ RULE 3: Time-based
-    if now < start_dt:
-        return "upcoming"
-
-    return "ongoing"
-
-
+    start_dt, end_dt = event.start_at, event.end_at
+    if start_dt is None:
+        start_dt, end_dt = event_bounds(
+            event.date, event.start_time, event.end_time
+        )
 
+    return lifecycle_state_at(start_dt, end_dt, now).lower()
 
 
+EVENTS_PAGE_SIZE = 20
 
+# Every ordering ends in id so keyset cursors are stable
+EVENT_SORT_ORDERINGS = {
+    "upcoming": ("start_at", "id"),
+    "newest": ("-id",),
+    "popular": ("-registration_count", "-id"),
+    # BM25: lower is better
+    "relevance": ("search_rank", "id"),
+}
 
-from django.utils import timezone
-from datetime import timedelta
-from .models import Event, EventRegistration, Tag
-from .models import EventVisibilitySettings  # ✅ REQUIRED
 
+def events_list_ttl(request):
+    # Until the next start/end/hide boundary anywhere in the table
+    return seconds_until(
+        Event.objects.next_transition(get_visibility_settings())
+    )
 
-from datetime import timedelta
-from django.utils import timezone
 
-def events_list(request):
-    query = request.GET.get("q")
-    tag_id = request.GET.get("tag")
-    sort = request.GET.get("sort", "upcoming")
-    role = request.GET.get("role", "all")
-    lifecycle_filter = request.GET.get("lifecycle", "all")
+def build_events_list(params, settings, relationships, now):
+    """
+    The filtered, sorted events list for the GET `params`, shared by
+    events_list and its async twin. Returns (queryset, selections) where
+    selections are the normalised filter values for the template.
+    """
+    query = params.get("q")
+    tag_id = tag_id_param(params.get("tag"))  # InvalidTag -> 400
+    sort = params.get("sort") or ("relevance" if query else "upcoming")
+    role = params.get("role", "all")
+    lifecycle_filter = params.get("lifecycle", "all")
 
-    qs = Event.objects.all()
+    # ⚙️ VISIBILITY SETTINGS (cached in-process, applied in SQL)
+    qs = Event.objects.visible(settings, now).with_lifecycle(now)
 
-    # 🔍 SEARCH
-    if query:
-        qs = qs.filter(title__icontains=query)
+    # 🔍 SEARCH (FTS5 over title, interest, description, location, tags);
+    # a relevance sort matches and ranks in one go in annotate_rank below
+    if query and sort != "relevance":
+        qs = EVENT_INDEX.filter(qs, query)
 
     # 🏷 TAG FILTER
-    if tag_id:
+    if tag_id is not None:
         qs = qs.filter(tags__id=tag_id)
 
-    # ⚙️ VISIBILITY SETTINGS
-    settings = EventVisibilitySettings.objects.first()
-    hide_completed_days = settings.hide_completed_after_days if settings else 0
-    hide_cancelled_days = settings.hide_cancelled_after_days if settings else 0
-
-    now = timezone.now()
-    events = []
-
-    for event in qs:
-        lifecycle = compute_event_lifecycle(event)
-        event.lifecycle = lifecycle
-
-        # 🟢 UPCOMING & ONGOING → ALWAYS VISIBLE
-        if lifecycle in ["upcoming", "ongoing"]:
-            events.append(event)
-            continue
-
-        # 🔵 COMPLETED VISIBILITY
-        if lifecycle == "completed":
-            if hide_completed_days == 0:
-                continue
-
-            if event.end_time:
-                end_dt = timezone.make_aware(
-                    datetime.combine(event.date, event.end_time)
-                )
-                if now - end_dt <= timedelta(days=hide_completed_days):
-                    events.append(event)
-            continue
-
-        # 🔴 CANCELLED VISIBILITY
-        if lifecycle == "cancelled":
-            if hide_cancelled_days == 0:
-                continue
-
-            # Use event date as reference (stable)
-            cancel_dt = timezone.make_aware(
-                datetime.combine(event.date, event.start_time)
-            )
-
-            if now - cancel_dt <= timedelta(days=hide_cancelled_days):
-                events.append(event)
-            continue
-
     # 🔁 LIFECYCLE FILTER (UI)
     if lifecycle_filter != "all":
-        events = [e for e in events if e.lifecycle == lifecycle_filter]
-
-    # 🔃 SORTING
-    if sort == "popular":
-        events.sort(
-            key=lambda e: EventRegistration.objects.filter(event=e).count(),
-            reverse=True
-        )
-    elif sort == "newest":
-        events.sort(key=lambda e: e.id, reverse=True)
-    else:
-        events.sort(key=lambda e: e.date)
-
-    # 👤 USER RELATIONSHIP
-    joined_ids = set()
-    created_ids = set()
+        qs = qs.for_lifecycle(lifecycle_filter)
 
-    if request.user.is_authenticated:
-        joined_ids = set(
-            EventRegistration.objects.filter(user=request.user)
-            .values_list("event_id", flat=True)
-        )
-        created_ids = set(
-            Event.objects.filter(created_by=request.user)
-            .values_list("id", flat=True)
-        )
+    # 👥 ROLE FILTER (cached per-user relationship sets)
+    joined_ids = relationships.joined_events
+    created_ids = relationships.created_events
 
-    # 👥 ROLE FILTER
     if role == "created":
-        events = [e for e in events if e.id in created_ids]
+        qs = qs.filter(id__in=created_ids)
     elif role == "joined":
-        events = [e for e in events if e.id in joined_ids and e.id not in created_ids]
+        qs = qs.filter(id__in=joined_ids - created_ids)
     elif role == "not_joined":
-        events = [e for e in events if e.id not in joined_ids and e.id not in created_ids]
+        qs = qs.exclude(id__in=joined_ids | created_ids)
 
-    # 🎯 DECORATE
+    # 🏷 One batched query for every card's tags
+    qs = qs.prefetch_related("tags")
+
+    # 🔃 SORTING
+    if sort == "relevance" and query:
+        qs = EVENT_INDEX.annotate_rank(qs, query)
+    elif sort not in EVENT_SORT_ORDERINGS or sort == "relevance":
+        sort = "upcoming"
+
+    return qs, {
+        "query": query,
+        "selected_tag": params.get("tag"),
+        "selected_sort": sort,
+        "selected_role": role,
+        "selected_lifecycle": lifecycle_filter,
+    }
+
+
+def decorate_event_cards(events, relationships):
     for event in events:
-        event.join_count = EventRegistration.objects.filter(event=event).count()
-        if event.id in created_ids:
+        event.join_count = event.registration_count
+        if event.id in relationships.created_events:
             event.status = "CREATOR"
-        elif event.id in joined_ids:
+        elif event.id in relationships.joined_events:
             event.status = "MEMBER"
         else:
             event.status = None
 
+
+@cache_anonymous_page(
+    scopes=lambda request: ["events"],
+    ttl=events_list_ttl,
+)
+def events_list(request):
+    # 👤 USER RELATIONSHIP (cached per user, no queries when warm)
+    relationships = get_relationships(request.user)
+
+    qs, selections = build_events_list(
+        request.GET, get_visibility_settings(), relationships, timezone.now()
+    )
+
+    # 📄 KEYSET PAGINATION
+    sort = selections["selected_sort"]
+    page = paginate_keyset(
+        qs,
+        EVENT_SORT_ORDERINGS[sort],
+        cursor=request.GET.get("cursor"),
+        page_size=EVENTS_PAGE_SIZE,
+        key=sort,
+    )
+
+    # 🎯 DECORATE
+    decorate_event_cards(page.items, relationships)
+
     return render(
         request,
         "events/events_list.html",
         {
-            "events": events,
-            "query": query,
+            "events": page.items,
+            "page": page,
             "tags": Tag.objects.all(),
-            "selected_tag": tag_id,
-            "selected_sort": sort,
-            "selected_role": role,
-            "selected_lifecycle": lifecycle_filter,
+            **selections,
         }
     )
 
@@ -202,13 +194,14 @@ def create_event(request):
         if form.is_valid():
             event = form.save(commit=False)
             event.created_by = request.user
-            event.save()
-            form.save_m2m()
+            with transaction.atomic():
+                event.save()
+                form.save_m2m()
 
-            EventRegistration.objects.create(
-                user=request.user,
-                event=event
-            )
+                EventRegistration.objects.create(
+                    user=request.user,
+                    event=event
+                )
 
             return redirect('/events/')
     else:
@@ -237,6 +230,11 @@ def edit_event(request, event_id):
         form = EventForm(request.POST, instance=event)
         if form.is_valid():
             form.save()
+
+            # Raised capacity → promote from the waitlist
+            if "max_participants" in form.changed_data:
+                promote_waitlist(event.id)
+
             return redirect('/events/my/')
     else:
         form = EventForm(instance=event)
@@ -244,6 +242,35 @@ def edit_event(request, event_id):
     return render(request, 'events/edit_event.html', {'form': form, 'event': event})
 
 
+# 🤝 JOIN / LEAVE
+# Plain clicks redirect as before; fetch() clicks (X-Requested-With:
+# XMLHttpRequest) get a small JSON delta so the page can patch the one
+# card/button in place instead of rebuilding the whole list.
+
+def is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+def registration_delta(event_id, status, changed, waitlist_position=None, message=None):
+    join_count, max_participants = get_object_or_404(
+        Event.objects.values_list('registration_count', 'max_participants'),
+        pk=event_id,
+    )
+
+    return JsonResponse({
+        'event': event_id,
+        'status': status,
+        'changed': changed,
+        'join_count': join_count,
+        'max_participants': max_participants,
+        'spots_left': (
+            max(max_participants - join_count, 0) if max_participants else None
+        ),
+        'waitlist_position': waitlist_position,
+        'message': message,
+    })
+
+
 @login_required
 def join_event(request, event_id):
     event = get_object_or_404(Event, id=event_id)
@@ -252,55 +279,99 @@ def join_event(request, event_id):
 
     # ❌ Block join for cancelled or completed events
     if lifecycle in ["cancelled", "completed"]:
+        # Queued for AJAX callers too: their page reloads to show it
         messages.warning(
             request,
             "You cannot join this event anymore."
         )
+        if is_ajax(request):
+            return JsonResponse(
+                {'event': event.id, 'error': "You cannot join this event anymore."},
+                status=409,
+            )
         return redirect(f"/events/{event.id}/")
 
-    # Capacity check
-    if event.max_participants:
-        count = EventRegistration.objects.filter(event=event).count()
-        if count >= event.max_participants:
-            messages.warning(
-                request,
-                "This event is already full."
-            )
-            return redirect(f"/events/{event.id}/")
+    # Capacity check + insert in one atomic step
+    result = register_user(event, request.user)
+    status, position, message = "MEMBER", None, None
 
-    EventRegistration.objects.get_or_create(
-        user=request.user,
-        event=event
-    )
+    # ⏳ Full → join the FIFO waitlist instead
+    if result == FULL:
+        entry = join_waitlist(event, request.user)
+        status, position = "WAITLISTED", entry.position
+        message = f"This event is already full. You are #{position} on the waitlist."
+
+    if is_ajax(request):
+        return registration_delta(
+            event.id, status, changed=result != ALREADY_JOINED,
+            waitlist_position=position, message=message,
+        )
+
+    if message:
+        messages.info(request, message)
     return redirect(f"/events/{event.id}/")
 
 
 
 @login_required
 def leave_event(request, event_id):
-    EventRegistration.objects.filter(
-        user=request.user,
-        event_id=event_id
-    ).delete()
+    with transaction.atomic():
+        # post_delete takes the seat off registration_count
+        removed, _ = EventRegistration.objects.filter(
+            user=request.user,
+            event_id=event_id
+        ).delete()
+
+        # Leaving also takes you off the waitlist
+        dequeued, _ = EventWaitlistEntry.objects.filter(
+            user=request.user,
+            event_id=event_id
+        ).delete()
+
+    # ⏫ Hand the freed seat to the head of the waitlist
+    if removed:
+        promote_waitlist(event_id)
+
+    if is_ajax(request):
+        return registration_delta(event_id, None, changed=bool(removed or dequeued))
     return redirect('/events/')
 
 
+@cache_anonymous_page(
+    scopes=lambda request, event_id: [f"event:{event_id}", "tags"],
+    ttl=lambda request, event_id: seconds_until(
+        Event.objects.filter(pk=event_id).next_transition()
+    ),
+)
 def event_detail(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = get_object_or_404(Event.objects.select_related('created_by'), id=event_id)
 
     # 🔥 FIX: compute lifecycle ONCE
     event.lifecycle = compute_event_lifecycle(event)
 
     status = None
+    waitlist_entry = None
     if request.user.is_authenticated:
-        if event.created_by == request.user:
+        if event.created_by_id == request.user.id:
             status = "CREATOR"
-        elif EventRegistration.objects.filter(user=request.user, event=event).exists():
+        elif EventRegistration.objects.filter(
+            user=request.user, event=event
+        ).exists():
             status = "MEMBER"
-
-    announcements = EventAnnouncement.objects.filter(
-        event=event
-    ).order_by('-created_at')
+        else:
+            waitlist_entry = EventWaitlistEntry.objects.filter(
+                user=request.user,
+                event=event
+            ).first()
+            if waitlist_entry:
+                status = "WAITLISTED"
+
+    announcements = paginate_keyset(
+        announcement_timeline(event.id),
+        ANNOUNCEMENT_ORDERING,
+        page_size=ANNOUNCEMENTS_PAGE_SIZE,
+        key=f"announcements:{event.id}",
+    )
 
     # ✅ Posting announcements ONLY if allowed
     if (
@@ -310,11 +381,14 @@ def event_detail(request, event_id):
     ):
         message = request.POST.get("message")
         if message:
-            EventAnnouncement.objects.create(
-                event=event,
-                message=message,
-                created_by=request.user
-            )
+            with transaction.atomic():
+                announcement = EventAnnouncement.objects.create(
+                    event=event,
+                    message=message,
+                    created_by=request.user
+                )
+                # 🔔 Registrants are told by run_notification_worker
+                enqueue_announcement(announcement)
             return redirect(f"/events/{event.id}/")
 
     return render(
@@ -323,51 +397,131 @@ def event_detail(request, event_id):
         {
             'event': event,
             'status': status,
-            'join_count': EventRegistration.objects.filter(event=event).count(),
-            'announcements': announcements,
+            'join_count': event.registration_count,
+            'is_full': bool(
+                event.max_participants
+                and event.registration_count >= event.max_participants
+            ),
+            'waitlist_position': waitlist_entry.position if waitlist_entry else None,
+            'announcements': announcements.items,
+            'announcements_page': announcements,
+            'can_manage_announcements': can_manage_announcements(event, status),
         }
     )
 
 
+# 📢 ANNOUNCEMENT TIMELINE
+
+ANNOUNCEMENTS_PAGE_SIZE = 20
+# Served by announcement_timeline_idx (event_id, created_at); SQLite
+# index entries end in the rowid, so the id tie-break is covered too
+ANNOUNCEMENT_ORDERING = ("-created_at", "-id")
+
+
+def announcement_timeline(event_id):
+    """Announcements newest first, author joined in the same query."""
+    return EventAnnouncement.objects.filter(
+        event_id=event_id
+    ).select_related('created_by')
+
+
+def can_manage_announcements(event, status):
+    return status == "CREATOR" and event.lifecycle not in ("completed", "cancelled")
+
+
+def event_announcements(request, event_id):
+    """
+    "Load older": the next page of the timeline as a bare HTML fragment
+    (announcement cards + the next "load older" button), to append under
+    the ones already shown.
+    """
+    event = get_object_or_404(Event, id=event_id)
+    event.lifecycle = compute_event_lifecycle(event)
+
+    status = "CREATOR" if event.created_by_id == request.user.id else None
+
+    announcements = paginate_keyset(
+        announcement_timeline(event.id),
+        ANNOUNCEMENT_ORDERING,
+        cursor=request.GET.get('cursor'),
+        page_size=ANNOUNCEMENTS_PAGE_SIZE,
+        key=f"announcements:{event.id}",
+    )
+
+    return render(
+        request,
+        'events/_announcements.html',
+        {
+            'event': event,
+            'announcements': announcements.items,
+            'announcements_page': announcements,
+            'can_manage_announcements': can_manage_announcements(event, status),
+        }
+    )
+
+
+MY_EVENTS_ORDERING = ("-start_at", "-id")
+
+
 @login_required
 def my_events(request):
     filter_by = request.GET.get('filter', 'all')
 
-    created_events = Event.objects.filter(created_by=request.user)
-    joined_events = Event.objects.filter(
-        eventregistration__user=request.user
+    # 🎯 One query per page: role, count and lifecycle come back annotated
+    events = (
+        Event.objects
+        .involving(request.user)
+        .with_role(request.user)
+        .with_lifecycle()
+        .annotate(join_count=F('registration_count'))
     )
 
     if filter_by == 'created':
-        events = created_events
+        events = events.filter(created_by=request.user)
     elif filter_by == 'joined':
-        events = joined_events.exclude(created_by=request.user)
+        events = events.filter(is_member=True).exclude(created_by=request.user)
     else:
-        events = (created_events | joined_events).distinct()
+        filter_by = 'all'
+
+    page = paginate_keyset(
+        events.prefetch_related('tags'),
+        MY_EVENTS_ORDERING,
+        cursor=request.GET.get('cursor'),
+        page_size=EVENTS_PAGE_SIZE,
+        key=f"my:{filter_by}",
+    )
 
-    joined_ids = set(
-        EventRegistration.objects.filter(user=request.user)
-        .values_list('event_id', flat=True)
+    return render(
+        request,
+        'events/my_events.html',
+        {
+            'events': page.items,
+            'page': page,
+            'selected_filter': filter_by
+        }
     )
 
-    for event in events:
-        event.join_count = EventRegistration.objects.filter(event=event).count()
 
-        if event.created_by == request.user:
-            event.status = "CREATOR"
-        elif event.id in joined_ids:
-            event.status = "MEMBER"
-        else:
-            event.status = None
+# ✨ RECOMMENDED FOR YOU
 
-        event.lifecycle = compute_event_lifecycle(event)
+@login_required
+def recommended_events(request):
+    """
+    Reads the precomputed top-K (compute_recommendations) in one
+    (user, rank) index range scan joined to the events.
+    """
+    recommendations = (
+        EventRecommendation.objects
+        .filter(lifecycle_q("upcoming", prefix="event__"), user=request.user)
+        .select_related('event')
+        .order_by('rank')
+    )
 
     return render(
         request,
-        'events/my_events.html',
+        'events/recommended.html',
         {
-            'events': events,
-            'selected_filter': filter_by
+            'events': [recommendation.event for recommendation in recommendations],
         }
     )
 
@@ -452,7 +606,10 @@ def cancel_event(request, event_id):
 
         event.event_state = "CANCELLED"
         event.cancellation_reason = reason if reason else None
-        event.save()
+        with transaction.atomic():
+            event.save()
+            # 🔔 Fan-out to every registrant happens off the request
+            enqueue_cancellation(event)
 
         messages.success(
             request,
@@ -0,0 +1,65 @@
+"""
+Process-local cache for the EventVisibilitySettings singleton.
+
+The row is read on every events_list request but almost never changes,
+so each worker keeps it in memory:
+- post_save / post_delete bump the version and drop the cached copy in
+  the process that made the change (see events/signals.py)
+- other worker processes pick the change up after VISIBILITY_SETTINGS_TTL
+"""
+import threading
+import time
+
+from .models import EventVisibilitySettings
+
+
+VISIBILITY_SETTINGS_TTL = 30  # seconds
+
+_MISSING = object()
+
+_lock = threading.Lock()
+_state = {
+    "value": _MISSING,
+    "version": 0,
+    "loaded_at": 0.0,
+}
+_stats = {"hits": 0, "misses": 0}
+
+
+def get_visibility_settings():
+    """The settings row (or None when there is none), from memory when fresh."""
+    now = time.monotonic()
+
+    with _lock:
+        value = _state["value"]
+        if value is not _MISSING and now - _state["loaded_at"] < VISIBILITY_SETTINGS_TTL:
+            _stats["hits"] += 1
+            return value
+
+        _stats["misses"] += 1
+        version = _state["version"]
+
+    value = EventVisibilitySettings.objects.first()
+
+    with _lock:
+        # Don't store a row that was invalidated while we were reading it
+        if _state["version"] == version:
+            _state["value"] = value
+            _state["loaded_at"] = now
+
+    return value
+
+
+def invalidate_visibility_settings(**kwargs):
+    with _lock:
+        _state["version"] += 1
+        _state["value"] = _MISSING
+
+
+def visibility_cache_stats():
+    with _lock:
+        return {
+            **_stats,
+            "version": _state["version"],
+            "cached": _state["value"] is not _MISSING,
+        }
@@ -0,0 +1,6 @@
+from django.contrib import admin
+from .models import Notification, NotificationCounter, OutboxMessage
+
+admin.site.register(OutboxMessage)
+admin.site.register(Notification)
+admin.site.register(NotificationCounter)
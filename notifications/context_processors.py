@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .outbox import unread_count
+
+
+def unread_notifications(request):
+    """
+    Navbar badge. Lazy, so pages that never show it (and anonymous
+    visitors) cost nothing; otherwise one primary key lookup on
+    NotificationCounter.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {"unread_notifications": 0}
+    return {"unread_notifications": SimpleLazyObject(lambda: unread_count(user))}
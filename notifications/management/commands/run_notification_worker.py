@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notifications.outbox import CHUNK_SIZE, deliver, pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Fan pending outbox messages (announcements, cancellations) out "
+        "to every registrant's inbox in chunked bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox and exit (e.g. from cron).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Registrants per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+
+    def drain(self, chunk_size):
+        delivered = 0
+        for outbox_id in list(pending().values_list("id", flat=True)):
+            created = deliver(outbox_id, chunk_size)
+            self.stdout.write(f"outbox {outbox_id}: {created} notification(s)")
+            delivered += 1
+        return delivered
+
+    def handle(self, *args, **options):
+        while True:
+            delivered = self.drain(options["chunk_size"])
+
+            if options["once"]:
+                return
+
+            if not delivered:
+                close_old_connections()
+                time.sleep(options["interval"])
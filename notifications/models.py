@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+from events.models import Event
+
+
+ANNOUNCEMENT = "ANNOUNCEMENT"
+CANCELLATION = "CANCELLATION"
+
+KIND_CHOICES = [
+    (ANNOUNCEMENT, "New announcement"),
+    (CANCELLATION, "Event cancelled"),
+]
+
+
+class OutboxMessage(models.Model):
+    """
+    A notification waiting to be fanned out to an event's registrants.
+
+    Written in the same transaction as the announcement / cancellation,
+    so it exists exactly when the change does. run_notification_worker
+    delivers it in chunks; `delivered_through` is the last registrant
+    user id handed a copy, which makes every chunk resumable.
+    """
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_through = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Worker queue: WHERE processed_at IS NULL ORDER BY id
+            models.Index(fields=["processed_at", "id"], name="outbox_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for event {self.event_id}"
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Inbox: WHERE user_id = ? ORDER BY id DESC
+            models.Index(fields=["user", "id"], name="notification_inbox_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Unread notifications per user, kept in step by the worker and the
+    mark-read views so the navbar badge is a primary key lookup instead
+    of a COUNT over the inbox.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter"
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread} unread"
@@ -0,0 +1,148 @@
+"""
+Transactional outbox for event notifications.
+
+The request that posts an announcement or cancels an event only adds
+one OutboxMessage row (enqueue(), same transaction as the change).
+run_notification_worker later copies it into every registrant's inbox
+with deliver(): chunks of CHUNK_SIZE registrants, each chunk one
+transaction that
+
+    1. reads the next registrants by (event, user) index range scan,
+    2. bulk_creates their Notification rows,
+    3. bumps their NotificationCounter rows (F() + 1),
+    4. advances OutboxMessage.delivered_through.
+
+A crash between chunks resumes at the next user id; no one is notified
+twice and the creator's request never waits for the fan-out.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from events.models import EventRegistration
+
+from .models import (
+    ANNOUNCEMENT,
+    CANCELLATION,
+    Notification,
+    NotificationCounter,
+    OutboxMessage,
+)
+
+
+CHUNK_SIZE = 1000
+
+
+def enqueue(event, kind, message):
+    """Call inside the transaction that makes the change."""
+    return OutboxMessage.objects.create(event=event, kind=kind, message=message)
+
+
+def enqueue_announcement(announcement):
+    return enqueue(
+        announcement.event,
+        ANNOUNCEMENT,
+        f"{announcement.event.title}: {announcement.message}",
+    )
+
+
+def enqueue_cancellation(event):
+    message = f"{event.title} has been cancelled."
+    if event.cancellation_reason:
+        message += f" Reason: {event.cancellation_reason}"
+    return enqueue(event, CANCELLATION, message)
+
+
+def deliver_chunk(outbox_id, chunk_size=CHUNK_SIZE):
+    """
+    Deliver the next chunk of one message. Returns (notifications
+    created, whether the message is now fully delivered).
+    """
+    with transaction.atomic():
+        outbox = (
+            OutboxMessage.objects.select_for_update()
+            .select_related("event")
+            .filter(pk=outbox_id, processed_at__isnull=True)
+            .first()
+        )
+        if outbox is None:
+            return 0, True
+
+        user_ids = list(
+            EventRegistration.objects.filter(
+                event_id=outbox.event_id,
+                user_id__gt=outbox.delivered_through,
+            )
+            .order_by("user_id")
+            .values_list("user_id", flat=True)[:chunk_size]
+        )
+
+        if len(user_ids) < chunk_size:
+            outbox.processed_at = timezone.now()
+        if user_ids:
+            outbox.delivered_through = user_ids[-1]
+
+        # The creator is the one who made the change
+        recipients = [pk for pk in user_ids if pk != outbox.event.created_by_id]
+        if recipients:
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=user_id,
+                        event_id=outbox.event_id,
+                        kind=outbox.kind,
+                        message=outbox.message,
+                    )
+                    for user_id in recipients
+                ],
+                batch_size=chunk_size,
+            )
+            NotificationCounter.objects.bulk_create(
+                [NotificationCounter(user_id=user_id) for user_id in recipients],
+                ignore_conflicts=True,
+                batch_size=chunk_size,
+            )
+            NotificationCounter.objects.filter(user_id__in=recipients).update(
+                unread=F("unread") + 1
+            )
+
+        outbox.save(update_fields=["delivered_through", "processed_at"])
+
+    return len(recipients), outbox.processed_at is not None
+
+
+def deliver(outbox_id, chunk_size=CHUNK_SIZE):
+    """Fan one message out completely; returns notifications created."""
+    total, done = 0, False
+    while not done:
+        created, done = deliver_chunk(outbox_id, chunk_size)
+        total += created
+    return total
+
+
+def pending():
+    return OutboxMessage.objects.filter(processed_at__isnull=True).order_by("id")
+
+
+# 🔔 Unread counter
+
+def unread_count(user):
+    return (
+        NotificationCounter.objects.filter(user=user)
+        .values_list("unread", flat=True)
+        .first()
+    ) or 0
+
+
+def mark_read(user, notifications):
+    """Mark `notifications` (a queryset of the user's) read, keep the counter in step."""
+    with transaction.atomic():
+        marked = notifications.filter(user=user, read_at__isnull=True).update(
+            read_at=timezone.now()
+        )
+        if marked:
+            NotificationCounter.objects.filter(user=user).update(
+                unread=Greatest(F("unread") - marked, 0)
+            )
+    return marked
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event, EventRegistration
+
+from .models import CANCELLATION, Notification, NotificationCounter, OutboxMessage
+from .outbox import deliver, deliver_chunk, unread_count
+
+
+def make_event(creator, **kwargs):
+    start = timezone.localtime() + timedelta(days=1)
+    return Event.objects.create(
+        title="Launch party",
+        interest="Tech",
+        location="Hall A",
+        date=start.date(),
+        start_time=start.time().replace(microsecond=0),
+        created_by=creator,
+        **kwargs
+    )
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user("creator", password="pw")
+        self.event = make_event(self.creator)
+        self.fans = [User.objects.create_user(f"fan{i}", password="pw") for i in range(5)]
+        EventRegistration.objects.bulk_create(
+            [EventRegistration(user=user, event=self.event) for user in [self.creator, *self.fans]]
+        )
+
+    def test_cancel_only_enqueues(self):
+        self.client.force_login(self.creator)
+
+        self.client.post(f"/events/cancel/{self.event.id}/", {"cancellation_reason": "Rain"})
+
+        outbox = OutboxMessage.objects.get()
+        self.assertEqual(outbox.kind, CANCELLATION)
+        self.assertIn("Reason: Rain", outbox.message)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_announcement_fans_out_in_resumable_chunks(self):
+        self.client.force_login(self.creator)
+        self.client.post(f"/events/{self.event.id}/", {"message": "Doors at 8"})
+        outbox = OutboxMessage.objects.get()
+
+        created, done = deliver_chunk(outbox.id, chunk_size=2)
+        self.assertEqual((created, done), (1, False))  # creator + fan0; creator skipped
+
+        self.assertEqual(deliver(outbox.id, chunk_size=2), 4)
+        self.assertEqual(deliver(outbox.id), 0)  # already processed
+
+        self.assertEqual(
+            set(Notification.objects.values_list("user__username", flat=True)),
+            {f"fan{i}" for i in range(5)},
+        )
+        self.assertEqual(unread_count(self.fans[0]), 1)
+        self.assertEqual(unread_count(self.creator), 0)
+
+    def test_badge_reads_counter_and_mark_read_keeps_it_in_step(self):
+        self.client.force_login(self.creator)
+        self.client.post(f"/events/{self.event.id}/", {"message": "One"})
+        self.client.post(f"/events/{self.event.id}/", {"message": "Two"})
+        call_command("run_notification_worker", "--once", stdout=StringIO())
+
+        fan = self.fans[0]
+        self.client.force_login(fan)
+        response = self.client.get("/notifications/")
+        self.assertEqual(str(response.context["unread_notifications"]), "2")
+        self.assertEqual(NotificationCounter.objects.get(user=fan).unread, 2)
+
+        first = Notification.objects.filter(user=fan).first()
+        self.client.post(f"/notifications/{first.id}/open/")
+        self.client.post(f"/notifications/{first.id}/open/")  # already read: no double decrement
+        self.assertEqual(unread_count(fan), 1)
+
+        self.client.post("/notifications/read/")
+        self.assertEqual(unread_count(fan), 0)
+        self.assertFalse(Notification.objects.filter(user=fan, read_at__isnull=True).exists())
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import inbox, mark_all_read, open_notification
+
+urlpatterns = [
+    path('', inbox, name='notifications'),
+    path('read/', mark_all_read, name='mark_all_notifications_read'),
+    path('<int:notification_id>/open/', open_notification, name='open_notification'),
+]
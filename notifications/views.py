@@ -0,0 +1,50 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+
+from events.pagination import paginate_keyset
+
+from .models import Notification
+from .outbox import mark_read
+
+
+NOTIFICATIONS_PAGE_SIZE = 20
+
+
+# 🔔 INBOX
+
+@login_required
+def inbox(request):
+    page = paginate_keyset(
+        Notification.objects.filter(user=request.user).select_related('event'),
+        ("-id",),
+        cursor=request.GET.get('cursor'),
+        page_size=NOTIFICATIONS_PAGE_SIZE,
+        key="inbox",
+    )
+
+    return render(
+        request,
+        'notifications/inbox.html',
+        {
+            'notifications': page.items,
+            'page': page,
+        }
+    )
+
+
+@login_required
+@require_POST
+def open_notification(request, notification_id):
+    notification = get_object_or_404(
+        Notification, id=notification_id, user=request.user
+    )
+    mark_read(request.user, Notification.objects.filter(pk=notification.pk))
+    return redirect(f"/events/{notification.event_id}/")
+
+
+@login_required
+@require_POST
+def mark_all_read(request):
+    mark_read(request.user, Notification.objects.all())
+    return redirect('/notifications/')